@@ -8,55 +8,148 @@ import sys
 import platform
 import datetime
 import traceback
-from flask import Flask, request, jsonify, render_template
+import time
+import queue
+import threading
+import atexit
+import mmap
+import codecs
+from collections import deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Início da importação do app (referência do relatório de inicialização)
+APP_IMPORT_START = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, render_template, send_file, stream_with_context
 from flask_cors import CORS
-from inference import Translator
+from inference import (Translator, clean_sentence, shared_artifacts, keras_import_status, artifact_hashes,
+                       MODEL_ARTIFACTS, ForkUnsafeBackendError, SentenceSplitter, iter_sentences)
+from corrections_store import CorrectionsStore, DEFAULT_PAGE_SIZE, move_database
+from translation_jobs import TranslationJobs, FORMATS as JOB_FORMATS, DEFAULT_CHUNK_RECORDS
 import glob
 
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos nas estatísticas de uso
+    fcntl = None
+
+class StartupTimer:
+    """Tempo de inicialização por fase, exposto em /api/status → startup.
+
+    As fases síncronas da importação do app são marcadas em sequência com
+    `mark`; o trabalho tirado do caminho crítico (diagnóstico da pasta de
+    modelos) é registrado com `record_background` quando termina, e marcos
+    posteriores (primeira resposta, primeiro modelo carregado) com
+    `milestone`, uma única vez cada.
+    """
+
+    def __init__(self, start):
+        self.lock = threading.Lock()
+        self.start = start
+        self.last_mark = start
+        self.phases = []
+        self.background = {}
+        self.milestones = {}
+        self.app_import_ms = None
+        # Tempo entre a criação do processo (interpretador, site-packages) e o início da importação do app
+        process_age = self._process_age_seconds()
+        if process_age is None:
+            self.process_start_offset_ms = None
+        else:
+            self.process_start_offset_ms = max(0.0, (process_age - (time.perf_counter() - start)) * 1000)
+
+    @staticmethod
+    def _process_age_seconds():
+        """Idade do processo; no Linux via /proc (resolução de 10 ms, o create_time do psutil tem 1 s)"""
+        try:
+            with open('/proc/self/stat', 'r') as f:
+                start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+            with open('/proc/uptime', 'r') as f:
+                uptime = float(f.read().split()[0])
+            return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+        except Exception:
+            pass
+        try:
+            import psutil
+            return time.time() - psutil.Process(os.getpid()).create_time()
+        except Exception:
+            return None
+
+    def _elapsed_ms(self, now=None):
+        return ((now if now is not None else time.perf_counter()) - self.start) * 1000
+
+    def mark(self, phase):
+        """Encerra a fase atual da inicialização síncrona"""
+        now = time.perf_counter()
+        with self.lock:
+            self.phases.append((phase, (now - self.last_mark) * 1000))
+            self.last_mark = now
+
+    def finish(self):
+        with self.lock:
+            self.app_import_ms = self._elapsed_ms(self.last_mark)
+
+    def record_background(self, task, duration_ms):
+        with self.lock:
+            self.background[task] = {'ms': round(duration_ms, 1), 'finished_at_ms': round(self._elapsed_ms(), 1)}
+
+    def milestone(self, name):
+        """Registra a primeira ocorrência de um marco, relativo ao início da importação do app"""
+        if name in self.milestones:
+            return
+        elapsed_ms = self._elapsed_ms()
+        with self.lock:
+            self.milestones.setdefault(name, elapsed_ms)
+
+    def _since_process_start(self, elapsed_ms):
+        if self.process_start_offset_ms is None or elapsed_ms is None:
+            return None
+        return round(self.process_start_offset_ms + elapsed_ms, 1)
+
+    def report(self):
+        with self.lock:
+            phases = list(self.phases)
+            background = dict(self.background)
+            milestones = dict(self.milestones)
+            app_import_ms = self.app_import_ms
+        return {
+            'process_start_to_app_import_ms': round(self.process_start_offset_ms, 1) if self.process_start_offset_ms is not None else None,
+            'app_import_ms': round(app_import_ms, 1) if app_import_ms is not None else None,
+            'phases': [{'phase': phase, 'ms': round(ms, 1)} for phase, ms in phases],
+            'background': background,
+            'milestones': {
+                name: {'since_app_import_ms': round(ms, 1), 'since_process_start_ms': self._since_process_start(ms)}
+                for name, ms in milestones.items()
+            },
+            'keras': keras_import_status(),
+            'tensorflow_loaded': 'tensorflow' in sys.modules
+        }
+
+startup_timer = StartupTimer(APP_IMPORT_START)
+startup_timer.mark('imports')
+
 app = Flask(__name__)
 CORS(app)  # Habilitar CORS para todas as rotas
 
+@app.after_request
+def record_first_response(response):
+    startup_timer.milestone('first_response')
+    return response
+
 # Diretório para armazenar as correções
 CORRECTIONS_DIR = os.path.join(os.path.dirname(__file__), "corrections")
+# Banco SQLite das correções (arquivos JSON em CORRECTIONS_DIR são importados para ele). Fica fora
+# de CORRECTIONS_DIR: o WAL e os checkpoints mudariam o mtime que o índice de correções observa
+CORRECTIONS_DB = os.environ.get('CORRECTIONS_DB', os.path.join(os.path.dirname(__file__), "data", "corrections.db"))
+# Local do banco em versões anteriores, movido para CORRECTIONS_DB na inicialização
+LEGACY_CORRECTIONS_DB = os.path.join(CORRECTIONS_DIR, "corrections.db")
+# Intervalo mínimo entre verificações de correções gravadas por outros processos ou colocadas no diretório
+CORRECTIONS_CHECK_INTERVAL = float(os.environ.get('CORRECTIONS_CHECK_INTERVAL', '2'))  # segundos
 
-# Verificar versão do TensorFlow e Keras
-try:
-    import tensorflow as tf
-    import keras
-    print(f"[INFO] TensorFlow versão: {tf.__version__}")
-    print(f"[INFO] Keras versão: {keras.__version__}")
-    
-    # Verificar se estamos no ambiente Render
-    render_env = os.environ.get('RENDER') == 'true' or '/opt/render' in os.getcwd()
-    print(f"[INFO] Ambiente Render detectado: {render_env}")
-    
-    # Definir função de fallback para tradução
-    global fallback_translation
-    def fallback_translation(text, model_id):
-        """Função de fallback para tradução quando o carregamento do modelo falha"""
-        print(f"[DEBUG] Usando função de fallback para tradução com modelo {model_id}")
-        
-        # Obter informações do modelo da lista de modelos disponíveis
-        models = get_available_models()
-        model_info = next((m for m in models if m["id"] == model_id), None)
-        
-        if not model_info:
-            return jsonify({
-                'success': False,
-                'error': f'Modelo {model_id} não encontrado'
-            }), 404
-            
-        # Informar que estamos usando o fallback
-        return jsonify({
-            'success': True,
-            'translated_text': f"[FALLBACK] Tradução para '{text}' não disponível. Serviço de tradução em manutenção.",
-            'source_language': model_info.get('source_language', 'desconhecido'),
-            'target_language': model_info.get('target_language', 'desconhecido'),
-            'from_correction': False,
-            'is_fallback': True
-        })
-except Exception as e:
-    print(f"[AVISO] Não foi possível determinar as versões de TensorFlow/Keras: {e}")
+# Verificar se estamos no ambiente Render. O TensorFlow/Keras não é importado aqui:
+# só na primeira carga de um modelo Keras (inference.import_keras), que registra as versões
+render_env = os.environ.get('RENDER') == 'true' or '/opt/render' in os.getcwd()
+print(f"[INFO] Ambiente Render detectado: {render_env}")
 
 # Verificar estrutura da pasta de modelos no início
 def check_models_directory():
@@ -117,61 +210,474 @@ def check_models_directory():
     
     print("[DEBUG] ===== FIM DA VERIFICAÇÃO DE DIRETÓRIOS DE MODELOS =====\n")
 
-# Executar verificação na inicialização
-check_models_directory()
+# Diagnóstico da pasta de modelos fora do caminho crítico: numa thread em segundo plano
+# (STARTUP_DIAGNOSTICS=false desliga)
+STARTUP_DIAGNOSTICS = os.environ.get('STARTUP_DIAGNOSTICS', 'true').lower() == 'true'
+
+def run_startup_diagnostics():
+    start_time = time.perf_counter()
+    check_models_directory()
+    startup_timer.record_background('check_models_directory', (time.perf_counter() - start_time) * 1000)
+
+if STARTUP_DIAGNOSTICS:
+    threading.Thread(target=run_startup_diagnostics, name="startup-diagnostics", daemon=True).start()
+startup_timer.mark('config')
+
+class CorrectionsIndex:
+    """Índice em memória das correções, com busca O(1) por (modelId, sourceText sem espaços nas pontas).
+
+    Os dados vêm do banco de correções (CorrectionsStore). O índice é
+    construído uma vez na inicialização e atualizado no próprio lugar quando
+    `save_correction` grava uma correção. No máximo a cada `check_interval`
+    segundos uma busca confere se outro processo gravou no banco ou se
+    arquivos JSON foram colocados no diretório de correções (estes são
+    importados para o banco) e aplica só as linhas novas, sem reconstruir.
+    Havendo mais de uma correção para a mesma chave, vale a mais recente.
+    """
+
+    def __init__(self, store, directory, check_interval=CORRECTIONS_CHECK_INTERVAL):
+        self.store = store
+        self.directory = directory
+        self.check_interval = check_interval
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.directory_mtime_ns = None
+        self.data_version = None
+        self.last_rowid = 0
+        self.last_check = 0.0
+        self.rebuilds = 0
+        self.refreshes = 0
+        self.last_rebuild_ms = None
+        self.last_rebuild_at = None
+
+    @staticmethod
+    def make_key(model_id, source_text):
+        return (model_id or '', (source_text or '').strip())
+
+    def _directory_mtime(self):
+        try:
+            return os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _insert(self, correction):
+        key = self.make_key(correction.get('modelId'), correction.get('sourceText', ''))
+        current = self.entries.get(key)
+        if current is None or correction.get('timestamp', '') >= current.get('timestamp', ''):
+            self.entries[key] = correction
+
+    def rebuild(self):
+        """Importa arquivos JSON novos do diretório e relê o índice inteiro a partir do banco"""
+        start_time = time.perf_counter()
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            # mtime lido antes da varredura: mudanças durante ela são vistas na próxima verificação
+            directory_mtime_ns = self._directory_mtime()
+            self.store.import_directory(self.directory)
+            self.data_version = self.store.data_version()
+            corrections, self.last_rowid = self.store.rows_since(0)
+            self.entries = {}
+            for correction in corrections:
+                self._insert(correction)
+            self.directory_mtime_ns = directory_mtime_ns
+            self.last_check = time.monotonic()
+            self.rebuilds += 1
+            self.last_rebuild_ms = round((time.perf_counter() - start_time) * 1000, 3)
+            self.last_rebuild_at = datetime.datetime.now().isoformat()
+        print(f"[DEBUG] Índice de correções reconstruído: {len(self.entries)} entradas em {self.last_rebuild_ms} ms")
+
+    def refresh(self, force=False):
+        """Aplica as correções novas no banco e no diretório (no máximo uma vez por intervalo, salvo `force`)"""
+        if not force and time.monotonic() - self.last_check < self.check_interval:
+            return
+        with self.lock:
+            if not force and time.monotonic() - self.last_check < self.check_interval:
+                return
+            self.last_check = time.monotonic()
+            imported = 0
+            directory_mtime_ns = self._directory_mtime()
+            if directory_mtime_ns != self.directory_mtime_ns:
+                imported = self.store.import_directory(self.directory)
+                self.directory_mtime_ns = directory_mtime_ns
+            # data_version muda quando outra conexão grava; gravações deste processo já estão no índice
+            data_version = self.store.data_version()
+            if imported or data_version != self.data_version:
+                self.data_version = data_version
+                corrections, self.last_rowid = self.store.rows_since(self.last_rowid)
+                for correction in corrections:
+                    self._insert(correction)
+                self.refreshes += 1
+
+    def lookup(self, text, model_id):
+        self.refresh()
+        return self.entries.get(self.make_key(model_id, text))
+
+    def add(self, correction):
+        """Atualiza o índice com uma correção recém-gravada por este processo"""
+        with self.lock:
+            self._insert(correction)
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'stored': self.store.count(),
+            'database': self.store.db_path,
+            'check_interval_seconds': self.check_interval,
+            'rebuilds': self.rebuilds,
+            'refreshes': self.refreshes,
+            'last_rebuild_ms': self.last_rebuild_ms,
+            'last_rebuild_at': self.last_rebuild_at
+        }
+
+# Banco de correções; na primeira execução os arquivos JSON existentes são migrados para ele
+move_database(LEGACY_CORRECTIONS_DB, CORRECTIONS_DB)
+corrections_store = CorrectionsStore(CORRECTIONS_DB)
+corrections_store.migrate_directory(CORRECTIONS_DIR)
+
+# Índice de correções construído uma vez na inicialização
+corrections_index = CorrectionsIndex(corrections_store, CORRECTIONS_DIR)
+corrections_index.rebuild()
+startup_timer.mark('corrections')
 
 def find_correction(text, model_id):
     """Encontra uma correção para um texto e modelo específicos"""
-    # Certificar-se de que o diretório de correções existe
-    os.makedirs(CORRECTIONS_DIR, exist_ok=True)
-    
-    # Normalizar o texto para comparação
-    text = text.strip()
-    
-    # Procurar em todos os arquivos de correção
-    for filename in os.listdir(CORRECTIONS_DIR):
-        if filename.endswith('.json'):
-            filepath = os.path.join(CORRECTIONS_DIR, filename)
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    correction = json.load(f)
-                    
-                    # Verificar se a correção se aplica
-                    if correction.get('modelId') == model_id and correction.get('sourceText', '').strip() == text:
-                        return correction
-            except Exception as e:
-                print(f"Erro ao ler correção {filepath}: {e}")
-    
-    return None
+    return corrections_index.lookup(text, model_id)
 
-# Dicionário para armazenar tradutores carregados
-loaded_translators = {}
+# Orçamento de memória residente para modelos carregados (MB); 0 = sem limite
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get('MODEL_MEMORY_BUDGET_MB', '0'))
 
-def get_available_models():
-    """Encontra todos os modelos disponíveis na pasta models"""
-    models_dir = os.path.join(os.path.dirname(__file__), "models")
-    available_models = []
-    
-    if os.path.exists(models_dir):
-        # Encontrar todas as pastas dentro do diretório models
-        model_dirs = [f for f in glob.glob(os.path.join(models_dir, "*")) if os.path.isdir(f)]
+# Pool de processos de inferência (inference_pool.py): INFERENCE_POOL_WORKERS processos (0 = a
+# inferência roda na thread da requisição, como antes); segmento de memória compartilhada por processo
+INFERENCE_POOL_WORKERS = int(os.environ.get('INFERENCE_POOL_WORKERS', '0'))
+INFERENCE_POOL_BUFFER_MB = float(os.environ.get('INFERENCE_POOL_BUFFER_MB', '8'))
+INFERENCE_POOL_TIMEOUT = float(os.environ.get('INFERENCE_POOL_TIMEOUT', '120'))
+inference_pool = None
+inference_pool_lock = threading.Lock()
+
+def get_inference_pool():
+    """Pool de inferência do processo, iniciado no primeiro carregamento de modelo (None se desabilitado)"""
+    global inference_pool
+    if INFERENCE_POOL_WORKERS <= 0:
+        return None
+    with inference_pool_lock:
+        if inference_pool is None:
+            from inference_pool import InferencePool
+            inference_pool = InferencePool(INFERENCE_POOL_WORKERS, INFERENCE_POOL_BUFFER_MB, INFERENCE_POOL_TIMEOUT)
+        return inference_pool
+
+def process_rss_mb():
+    """Memória residente do processo em MB, ou None sem psutil"""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+# Amostra de uso de CPU sem bloquear: psutil.cpu_percent(interval=None) mede desde a
+# chamada anterior, e amostras mais próximas que CPU_SAMPLE_SECONDS reaproveitam a última
+CPU_SAMPLE_SECONDS = 1.0
+cpu_sample = {'time': None, 'value': 0.0}
+cpu_sample_lock = threading.Lock()
+
+def sample_cpu_percent():
+    """Uso de CPU (%) no último intervalo de ~1 s, sem segurar a thread da requisição"""
+    import psutil
+    with cpu_sample_lock:
+        now = time.monotonic()
+        if cpu_sample['time'] is None:
+            # Primeira amostra do processo: não há referência anterior, mede um intervalo curto
+            cpu_sample['value'] = psutil.cpu_percent(interval=0.1)
+        elif now - cpu_sample['time'] >= CPU_SAMPLE_SECONDS:
+            cpu_sample['value'] = psutil.cpu_percent(interval=None)
+        else:
+            return cpu_sample['value']
+        cpu_sample['time'] = time.monotonic()
+        return cpu_sample['value']
+
+class ModelManager:
+    """Tradutores carregados, com orçamento de memória e despejo LRU.
+
+    O custo de cada modelo é o delta de RSS do processo medido durante o seu
+    carregamento (aproximado quando dois modelos carregam ao mesmo tempo).
+    Antes de carregar um modelo, os menos usados recentemente são
+    descarregados até caber a estimativa do novo modelo (o delta medido da
+    última vez ou a média dos já medidos); depois do carregamento o orçamento
+    é conferido de novo com o valor real. Cada acesso via `get` atualiza
+    `last_used` (também no próprio Translator) e o contador de acessos.
+    """
+
+    def __init__(self, budget_mb=MODEL_MEMORY_BUDGET_MB):
+        self.budget_mb = budget_mb
+        self.entries = OrderedDict()
+        self.lock = threading.RLock()
+        self.known_memory_mb = {}
+        self.reserved_mb = 0
+        self.evictions = 0
+        self.swaps = 0
+        self.on_evict = None
+        self.on_swap = None
+
+    def __contains__(self, model_id):
+        return model_id in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, model_id):
+        """Retorna o tradutor carregado (ou None), registrando o acesso"""
+        with self.lock:
+            entry = self.entries.get(model_id)
+            if entry is None:
+                return None
+            entry['hits'] += 1
+            entry['last_used'] = datetime.datetime.now().isoformat()
+            entry['translator'].last_used = entry['last_used']
+            self.entries.move_to_end(model_id)
+            return entry['translator']
+
+    def peek(self, model_id):
+        """Tradutor carregado (ou None), sem registrar acesso; para tarefas internas"""
+        with self.lock:
+            entry = self.entries.get(model_id)
+            return entry['translator'] if entry is not None else None
+
+    def items(self):
+        with self.lock:
+            return [(model_id, entry['translator']) for model_id, entry in self.entries.items()]
+
+    def used_mb(self):
+        with self.lock:
+            return sum(entry['memory_mb'] or 0 for entry in self.entries.values())
+
+    def estimate_mb(self, model_id):
+        if model_id in self.known_memory_mb:
+            return self.known_memory_mb[model_id]
+        measured = [mb for mb in self.known_memory_mb.values() if mb]
+        return sum(measured) / len(measured) if measured else 0
+
+    def _evict(self, model_id):
+        """Retira um modelo das entradas (com o lock); o on_evict é chamado depois, em _release"""
+        entry = self.entries.pop(model_id)
+        self.evictions += 1
+        return (model_id, entry['translator'])
+
+    def _select_victims(self, required_mb, keep=None):
+        """Retira modelos LRU até `required_mb` caber no orçamento (com o lock); retorna os retirados"""
+        victims = []
+        if self.budget_mb <= 0:
+            return victims
+        for model_id in list(self.entries):
+            if self.used_mb() + self.reserved_mb + required_mb <= self.budget_mb:
+                break
+            if model_id != keep:
+                print(f"[DEBUG] Orçamento de memória ({self.budget_mb} MB) excedido, descarregando {model_id} (LRU)")
+                victims.append(self._evict(model_id))
+        return victims
+
+    def _release(self, victims):
+        """Libera os recursos dos modelos retirados, fora do lock: get/peek não esperam o despejo"""
+        if self.on_evict is not None:
+            for model_id, translator in victims:
+                self.on_evict(model_id, translator)
+
+    def ensure_capacity(self, required_mb, keep=None):
+        """Descarrega modelos LRU até `required_mb` caber no orçamento"""
+        with self.lock:
+            victims = self._select_victims(required_mb, keep)
+        self._release(victims)
+
+    def reserve(self, required_mb, keep=None):
+        """Abre espaço e reserva `required_mb` para uma carga que ainda não está no gerenciador.
+
+        Retorna False, sem descarregar nada, se nem descarregando todos os
+        outros modelos (exceto `keep`) a reserva caberia no orçamento.
+        """
+        if self.budget_mb <= 0:
+            return True
+        with self.lock:
+            kept = self.entries.get(keep)
+            kept_mb = (kept['memory_mb'] or 0) if kept is not None else 0
+            if kept_mb + self.reserved_mb + required_mb > self.budget_mb:
+                return False
+            victims = self._select_victims(required_mb, keep)
+            self.reserved_mb += required_mb
+        self._release(victims)
+        return True
+
+    def release_reservation(self, required_mb):
+        if self.budget_mb <= 0:
+            return
+        with self.lock:
+            self.reserved_mb = max(0, self.reserved_mb - required_mb)
+
+    def add(self, model_id, translator, memory_mb=None):
+        with self.lock:
+            victims = [self._evict(model_id)] if model_id in self.entries else []
+            now = datetime.datetime.now().isoformat()
+            translator.last_used = now
+            self.entries[model_id] = {
+                'translator': translator,
+                'memory_mb': round(memory_mb, 1) if memory_mb is not None else None,
+                'loaded_at': now,
+                'last_used': now,
+                'hits': 0
+            }
+            if memory_mb is not None:
+                self.known_memory_mb[model_id] = max(memory_mb, 0)
+            victims += self._select_victims(0, keep=model_id)
+        self._release(victims)
+
+    def swap(self, model_id, translator, expected, memory_mb=None):
+        """Troca atomicamente a instância no ar de um modelo por uma nova versão.
+
+        Só troca se a instância atual ainda for `expected` (o modelo pode ter
+        sido descarregado ou trocado enquanto a nova versão carregava). Acessos,
+        `loaded_at` e a posição LRU são mantidos; quem já pegou a instância
+        antiga termina a requisição com ela.
+        """
+        with self.lock:
+            entry = self.entries.get(model_id)
+            if entry is None or entry['translator'] is not expected:
+                return False
+            translator.last_used = entry['last_used']
+            entry['translator'] = translator
+            entry['reloads'] = entry.get('reloads', 0) + 1
+            entry['reloaded_at'] = datetime.datetime.now().isoformat()
+            if memory_mb is not None:
+                entry['memory_mb'] = round(memory_mb, 1)
+                self.known_memory_mb[model_id] = max(memory_mb, 0)
+            self.swaps += 1
+        if self.on_swap is not None:
+            self.on_swap(model_id, expected)
+        return True
+
+    def remove(self, model_id):
+        """Descarrega um modelo; retorna False se ele não estava carregado"""
+        with self.lock:
+            entry = self.entries.pop(model_id, None)
+        if entry is None:
+            return False
+        if self.on_evict is not None:
+            self.on_evict(model_id, entry['translator'])
+        return True
+
+    def model_state(self, model_id):
+        with self.lock:
+            entry = self.entries.get(model_id)
+            if entry is None:
+                return {'loaded': False, 'memory_mb': self.known_memory_mb.get(model_id)}
+            return {
+                'loaded': True,
+                'memory_mb': entry['memory_mb'],
+                'loaded_at': entry['loaded_at'],
+                'last_used': entry['last_used'],
+                'hits': entry['hits'],
+                'reloads': entry.get('reloads', 0),
+                'reloaded_at': entry.get('reloaded_at')
+            }
+
+    def stats(self):
+        with self.lock:
+            return {
+                'budget_mb': self.budget_mb or None,
+                'used_mb': round(self.used_mb(), 1),
+                'reserved_mb': round(self.reserved_mb, 1),
+                'loaded': list(self.entries),
+                'evictions': self.evictions,
+                'swaps': self.swaps,
+                'process_rss_mb': round(process_rss_mb() or 0, 1) or None
+            }
+
+# Tradutores carregados, com orçamento de memória (MODEL_MEMORY_BUDGET_MB)
+loaded_translators = ModelManager()
+
+# Intervalo mínimo entre verificações de mudança na pasta de modelos
+MODEL_REGISTRY_CHECK_INTERVAL = float(os.environ.get('MODEL_REGISTRY_CHECK_INTERVAL', '2'))  # segundos
+
+class ModelRegistry:
+    """Catálogo dos modelos da pasta models, com busca O(1) por id.
+
+    A pasta é varrida (e os config.json lidos) uma vez; depois só é varrida de
+    novo quando o mtime da pasta ou de algum config.json muda, verificação
+    feita no máximo a cada `check_interval` segundos, ou quando `refresh` é
+    chamado explicitamente (POST /api/models/refresh). Quem consulta recebe
+    cópias, então pode alterar os dicionários livremente.
+    """
+
+    def __init__(self, models_dir, check_interval=MODEL_REGISTRY_CHECK_INTERVAL):
+        self.models_dir = models_dir
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.models = []
+        self.by_id = {}
+        self.signature = None
+        self.last_check = 0.0
+        self.scans = 0
+        self.last_scan_ms = None
+        self.last_scan_at = None
+
+    def _signature(self):
+        """mtimes da pasta de modelos, de cada subpasta e de cada config.json"""
+        try:
+            entries = [os.stat(self.models_dir).st_mtime_ns]
+            with os.scandir(self.models_dir) as it:
+                for entry in sorted(it, key=lambda e: e.name):
+                    if not entry.is_dir():
+                        continue
+                    try:
+                        config_mtime = os.stat(os.path.join(entry.path, "config.json")).st_mtime_ns
+                    except FileNotFoundError:
+                        config_mtime = None
+                    entries.append((entry.name, entry.stat().st_mtime_ns, config_mtime))
+            return tuple(entries)
+        except FileNotFoundError:
+            return None
+
+    def _scan(self):
+        """Encontra todos os modelos disponíveis na pasta models"""
+        models_dir = self.models_dir
+        available_models = []
+    
+        if os.path.exists(models_dir):
+            # Encontrar todas as pastas dentro do diretório models
+            model_dirs = [f for f in glob.glob(os.path.join(models_dir, "*")) if os.path.isdir(f)]
         
-        for model_dir in model_dirs:
-            model_name = os.path.basename(model_dir)
-            config_path = os.path.join(model_dir, "config.json")
+            for model_dir in model_dirs:
+                model_name = os.path.basename(model_dir)
+                config_path = os.path.join(model_dir, "config.json")
             
-            # Se não houver config.json, tente verificar outros arquivos
-            if not os.path.exists(config_path):
-                try:
-                    # Tentativa de identificar fonte e destino a partir do nome do modelo
-                    parts = model_name.split("_")
-                    if len(parts) >= 2:
-                        source_lang = parts[0]
-                        target_lang = parts[1]
-                    else:
-                        source_lang = "desconhecido"
-                        target_lang = "desconhecido"
+                # Se não houver config.json, tente verificar outros arquivos
+                if not os.path.exists(config_path):
+                    try:
+                        # Tentativa de identificar fonte e destino a partir do nome do modelo
+                        parts = model_name.split("_")
+                        if len(parts) >= 2:
+                            source_lang = parts[0]
+                            target_lang = parts[1]
+                        else:
+                            source_lang = "desconhecido"
+                            target_lang = "desconhecido"
                     
+                        available_models.append({
+                            "id": model_name,
+                            "path": model_dir,
+                            "source_language": source_lang,
+                            "target_language": target_lang,
+                            "display_name": f"{source_lang.capitalize()} → {target_lang.capitalize()}"
+                        })
+                        continue
+                    except Exception as e:
+                        print(f"Erro ao processar modelo {model_dir}: {e}")
+                        continue
+            
+                # Se o config.json existir, extraia as informações dele
+                try:
+                    with open(config_path, 'r') as f:
+                        config = json.load(f)
+                
+                    source_lang = config.get("source_language", "desconhecido")
+                    target_lang = config.get("target_language", "desconhecido")
+                
                     available_models.append({
                         "id": model_name,
                         "path": model_dir,
@@ -179,67 +685,130 @@ def get_available_models():
                         "target_language": target_lang,
                         "display_name": f"{source_lang.capitalize()} → {target_lang.capitalize()}"
                     })
-                    continue
                 except Exception as e:
                     print(f"Erro ao processar modelo {model_dir}: {e}")
-                    continue
-            
-            # Se o config.json existir, extraia as informações dele
+    
+        # Verificar também se há modelo english_snejag_translator baixado pelo download_model.py
+        downloaded_model_path = os.path.join(models_dir, "english_snejag_translator")
+        if os.path.exists(downloaded_model_path):
             try:
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
+                config_path = os.path.join(downloaded_model_path, "config.json")
+                if os.path.exists(config_path):
+                    with open(config_path, 'r') as f:
+                        config = json.load(f)
                 
-                source_lang = config.get("source_language", "desconhecido")
-                target_lang = config.get("target_language", "desconhecido")
+                    source_lang = config.get("source_language", "English")
+                    target_lang = config.get("target_language", "Snejag")
                 
-                available_models.append({
-                    "id": model_name,
-                    "path": model_dir,
-                    "source_language": source_lang,
-                    "target_language": target_lang,
-                    "display_name": f"{source_lang.capitalize()} → {target_lang.capitalize()}"
-                })
+                    available_models.append({
+                        "id": "english_snejag_translator",
+                        "path": downloaded_model_path,
+                        "source_language": source_lang,
+                        "target_language": target_lang,
+                        "display_name": f"{source_lang.capitalize()} → {target_lang.capitalize()}"
+                    })
+                    print(f"Modelo english_snejag_translator encontrado em: {downloaded_model_path}")
             except Exception as e:
-                print(f"Erro ao processar modelo {model_dir}: {e}")
-    
-    # Verificar também se há modelo english_snejag_translator baixado pelo download_model.py
-    downloaded_model_path = os.path.join(os.path.dirname(__file__), "models", "english_snejag_translator")
-    if os.path.exists(downloaded_model_path):
-        try:
-            config_path = os.path.join(downloaded_model_path, "config.json")
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                
-                source_lang = config.get("source_language", "English")
-                target_lang = config.get("target_language", "Snejag")
-                
-                available_models.append({
-                    "id": "english_snejag_translator",
-                    "path": downloaded_model_path,
-                    "source_language": source_lang,
-                    "target_language": target_lang,
-                    "display_name": f"{source_lang.capitalize()} → {target_lang.capitalize()}"
-                })
-                print(f"Modelo english_snejag_translator encontrado em: {downloaded_model_path}")
-        except Exception as e:
-            print(f"Erro ao processar modelo baixado: {e}")
+                print(f"Erro ao processar modelo baixado: {e}")
     
-    return available_models
+        return available_models
+
+    def refresh(self, force=True):
+        """Varre a pasta de novo se algo mudou (ou sempre, com force=True)"""
+        with self.lock:
+            self.last_check = time.monotonic()
+            signature = self._signature()
+            if not force and signature == self.signature and self.scans:
+                return False
+            start_time = time.perf_counter()
+            models = self._scan()
+            by_id = {}
+            for model in models:
+                by_id.setdefault(model["id"], model)
+            self.models, self.by_id, self.signature = models, by_id, signature
+            self.scans += 1
+            self.last_scan_ms = round((time.perf_counter() - start_time) * 1000, 3)
+            self.last_scan_at = datetime.datetime.now().isoformat()
+        print(f"[DEBUG] Catálogo de modelos atualizado: {len(by_id)} modelos em {self.last_scan_ms} ms")
+        return True
+
+    def _maybe_refresh(self):
+        if not self.scans or time.monotonic() - self.last_check >= self.check_interval:
+            self.refresh(force=False)
+
+    def list(self):
+        self._maybe_refresh()
+        return [dict(model) for model in self.models]
+
+    def get(self, model_id):
+        self._maybe_refresh()
+        model = self.by_id.get(model_id)
+        return dict(model) if model else None
+
+    def stats(self):
+        return {
+            'models': len(self.by_id),
+            'scans': self.scans,
+            'last_scan_ms': self.last_scan_ms,
+            'last_scan_at': self.last_scan_at,
+            'check_interval_seconds': self.check_interval
+        }
+
+model_registry = ModelRegistry(os.path.join(os.path.dirname(__file__), "models"))
+
+def get_available_models():
+    """Lista os modelos disponíveis (do catálogo em memória)"""
+    return model_registry.list()
+
+# Carregamentos em andamento por modelo: chamadas concorrentes esperam o mesmo Future
+model_loading_futures = {}
+model_loading_lock = threading.Lock()
 
 def get_or_load_translator(model_id):
-    """Retorna um tradutor carregado ou carrega um novo se necessário"""
+    """Retorna um tradutor carregado ou carrega um novo se necessário.
+
+    O carregamento é single-flight por modelo: a primeira chamada carrega e as
+    chamadas concorrentes esperam o mesmo Future, recebendo a mesma instância
+    (ou o mesmo resultado de falha) em vez de carregar o modelo de novo.
+    """
     print(f"[DEBUG] Solicitado carregamento do modelo: {model_id}")
     
-    if model_id in loaded_translators:
+    translator = loaded_translators.get(model_id)
+    if translator is not None:
         print(f"[DEBUG] Modelo {model_id} já está carregado, retornando instância existente")
-        return loaded_translators[model_id]
+        return translator
+    
+    with model_loading_lock:
+        # Outra thread pode ter terminado o carregamento enquanto esperávamos o lock
+        translator = loaded_translators.get(model_id)
+        if translator is not None:
+            return translator
+        future = model_loading_futures.get(model_id)
+        is_loader = future is None
+        if is_loader:
+            future = Future()
+            model_loading_futures[model_id] = future
     
+    if not is_loader:
+        print(f"[DEBUG] Modelo {model_id} já está sendo carregado por outra requisição, aguardando...")
+        return future.result()
+    
+    try:
+        translator = load_translator(model_id)
+        future.set_result(translator)
+        return translator
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with model_loading_lock:
+            model_loading_futures.pop(model_id, None)
+
+def load_translator(model_id):
+    """Carrega o tradutor de um modelo (use get_or_load_translator, que evita carregamentos duplicados)"""
     # Encontrar o modelo na lista de modelos disponíveis
     print(f"[DEBUG] Buscando informações do modelo {model_id} na lista de modelos disponíveis")
-    models = get_available_models()
-    print(f"[DEBUG] Modelos disponíveis: {[m['id'] for m in models]}")
-    model_info = next((m for m in models if m["id"] == model_id), None)
+    model_info = model_registry.get(model_id)
     
     if not model_info:
         print(f"[DEBUG] ERRO: Modelo {model_id} não encontrado na lista de modelos disponíveis")
@@ -336,18 +905,29 @@ def get_or_load_translator(model_id):
             except Exception as e:
                 print(f"[DEBUG] Erro ao tentar usar caminhos alternativos: {str(e)}")
         
-        translator = Translator(model_info["path"])
+        # Abrir espaço no orçamento de memória antes de carregar
+        loaded_translators.ensure_capacity(loaded_translators.estimate_mb(model_id))
+        rss_before = process_rss_mb()
+        
+        translator = Translator(model_info["path"], inference_pool=get_inference_pool())
         
         print(f"[DEBUG] Chamando método load_model()...")
         success = translator.load_model()
         
         if success:
-            print(f"[DEBUG] Modelo {model_id} carregado com sucesso!")
-            loaded_translators[model_id] = translator
+            rss_after = process_rss_mb()
+            memory_mb = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            print(f"[DEBUG] Modelo {model_id} carregado com sucesso! (memória: {memory_mb if memory_mb is None else round(memory_mb, 1)} MB)")
+            translation_cache.invalidate_model(model_id)
+            loaded_translators.add(model_id, translator, memory_mb)
+            startup_timer.milestone('first_model_loaded')
             return translator
         else:
             print(f"[DEBUG] ERRO: Falha ao carregar modelo {model_id} - método load_model() retornou False")
             return None
+    except ForkUnsafeBackendError as e:
+        print(f"[INFO] {model_id} fica para os workers: {e}")
+        return None
     except Exception as e:
         import traceback
         print(f"[DEBUG] ERRO: Exceção ao carregar tradutor {model_id}: {e}")
@@ -369,7 +949,7 @@ def get_or_load_translator(model_id):
                     # Tentar modelos alternativos
                     for alt_model_id in ["english_snejag_translator_2", "english-snejag-translator_3"]:
                         print(f"[DEBUG] Tentando modelo alternativo: {alt_model_id}")
-                        alt_model = next((m for m in get_available_models() if m["id"] == alt_model_id), None)
+                        alt_model = model_registry.get(alt_model_id)
                         
                         if alt_model:
                             print(f"[DEBUG] Modelo alternativo {alt_model_id} encontrado, tentando carregar...")
@@ -380,7 +960,8 @@ def get_or_load_translator(model_id):
                                 if alt_success:
                                     print(f"[DEBUG] Modelo alternativo {alt_model_id} carregado com sucesso!")
                                     # Guardar o tradutor alternativo sob o ID original para manter compatibilidade
-                                    loaded_translators[model_id] = alt_translator
+                                    translation_cache.invalidate_model(model_id)
+                                    loaded_translators.add(model_id, alt_translator)
                                     return alt_translator
                             except Exception as alt_e:
                                 print(f"[DEBUG] Erro ao carregar modelo alternativo {alt_model_id}: {alt_e}")
@@ -392,6 +973,747 @@ def get_or_load_translator(model_id):
         
         return None
 
+# Configuração do escalonador de micro-lotes (requisições concorrentes do mesmo modelo)
+BATCHING_ENABLED = os.environ.get('BATCHING_ENABLED', 'true').lower() == 'true'
+BATCH_WINDOW_MS = float(os.environ.get('BATCH_WINDOW_MS', '5'))
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', '16'))
+
+def percentile(values, pct):
+    """Percentil por posição numa lista ordenada (0 se vazia)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+class BatchScheduler:
+    """Agrupa requisições concorrentes de um modelo numa única passada do modelo.
+
+    Cada requisição entra numa fila; uma thread dedicada espera até
+    `window_ms` (ou até `max_batch_size` itens) depois do primeiro item,
+    chama `translate_batch` uma vez e devolve cada resultado à thread que
+    está aguardando. Com o servidor ocioso (fila vazia e nenhum lote em
+    execução) o primeiro item é despachado sem esperar a janela. Com o pool de inferência há uma thread coletora por
+    processo do pool, para até um lote em execução em cada processo.
+    """
+
+    def __init__(self, model_id, translator, window_ms=BATCH_WINDOW_MS, max_batch_size=BATCH_MAX_SIZE):
+        self.model_id = model_id
+        self.translator = translator
+        self.window_seconds = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.running = True
+        
+        # Métricas para ajustar a janela (vazão x latência p99)
+        self.batches = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.immediate_dispatches = 0
+        self.batch_size_counts = {}
+        self.wait_times_ms = deque(maxlen=1000)
+        self.inference_times_ms = deque(maxlen=1000)
+        
+        parallel = translator.inference_pool.size if translator.pool_key is not None else 1
+        self.threads = [threading.Thread(target=self._run, name=f"batch-{model_id}-{index}", daemon=True)
+                        for index in range(parallel)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, text):
+        """Enfileira um texto e bloqueia até a tradução do lote ficar pronta"""
+        future = self.enqueue(text)
+        if future is None:
+            # Escalonador já encerrado (modelo recarregado/descarregado): traduzir diretamente
+            return self.translator.translate(text)
+        return future.result()
+
+    def enqueue(self, text):
+        """Enfileira um texto sem bloquear; retorna o Future da tradução, ou None se o escalonador foi encerrado"""
+        future = Future()
+        with self.lock:
+            if not self.running:
+                return None
+            self.queue.put((text, time.perf_counter(), future))
+        return future
+
+    def stop(self):
+        """Encerra a thread; itens ainda na fila são processados antes da saída"""
+        with self.lock:
+            self.running = False
+            for _ in self.threads:
+                self.queue.put(None)
+
+    def _collect_batch(self, first_item):
+        batch = [first_item]
+        # Nada mais na fila nem em execução: esperar a janela só aumentaria a latência
+        if self.queue.empty() and self.in_flight == 0:
+            self.immediate_dispatches += 1
+            return batch
+        deadline = time.perf_counter() + self.window_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self.queue.put(None)  # Reenfileirar o sinal de parada para depois deste lote
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                if not self.running:
+                    break
+                continue
+            
+            batch = self._collect_batch(item)
+            dispatch_time = time.perf_counter()
+            with self.lock:
+                self.in_flight += 1
+            try:
+                translations = self.translator.translate_batch([text for text, _, _ in batch])
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, _, future), translated_text in zip(batch, translations):
+                    future.set_result(translated_text)
+            inference_ms = (time.perf_counter() - dispatch_time) * 1000
+            
+            with self.lock:
+                self.in_flight -= 1
+                self.batches += 1
+                self.requests += len(batch)
+                self.batch_size_counts[len(batch)] = self.batch_size_counts.get(len(batch), 0) + 1
+                self.wait_times_ms.extend((dispatch_time - enqueued) * 1000 for _, enqueued, _ in batch)
+                self.inference_times_ms.append(inference_ms)
+
+    def stats(self):
+        """Profundidade da fila, distribuição de tamanhos de lote e tempos de espera"""
+        with self.lock:
+            wait_times = list(self.wait_times_ms)
+            inference_times = list(self.inference_times_ms)
+            return {
+                'queue_depth': self.queue.qsize(),
+                'window_ms': self.window_seconds * 1000,
+                'max_batch_size': self.max_batch_size,
+                'batches': self.batches,
+                'requests': self.requests,
+                'avg_batch_size': round(self.requests / self.batches, 2) if self.batches else 0,
+                'immediate_dispatches': self.immediate_dispatches,
+                'batch_size_distribution': {str(size): count for size, count in sorted(self.batch_size_counts.items())},
+                'wait_ms': {
+                    'avg': round(sum(wait_times) / len(wait_times), 3) if wait_times else 0,
+                    'p50': round(percentile(wait_times, 50), 3),
+                    'p99': round(percentile(wait_times, 99), 3),
+                    'max': round(max(wait_times), 3) if wait_times else 0
+                },
+                'inference_ms': {
+                    'avg': round(sum(inference_times) / len(inference_times), 3) if inference_times else 0,
+                    'p99': round(percentile(inference_times, 99), 3)
+                }
+            }
+
+# Escalonadores de micro-lotes por modelo
+batch_schedulers = {}
+batch_schedulers_lock = threading.Lock()
+
+def get_batch_scheduler(model_id, translator):
+    """Retorna o escalonador do modelo, recriando-o se a instância do tradutor mudou.
+
+    Retorna None para uma instância que já não está no ar (modelo recarregado
+    ou descarregado): a requisição em andamento termina nela, sem escalonador.
+    """
+    # Consultado fora do lock dos escalonadores: o gerenciador chama stop_batch_scheduler com o próprio lock
+    is_live = loaded_translators.peek(model_id) is translator
+    with batch_schedulers_lock:
+        scheduler = batch_schedulers.get(model_id)
+        if scheduler is not None and scheduler.translator is translator:
+            return scheduler
+        if not is_live:
+            return None
+        if scheduler is not None:
+            scheduler.stop()
+        scheduler = BatchScheduler(model_id, translator)
+        batch_schedulers[model_id] = scheduler
+        return scheduler
+
+def stop_batch_scheduler(model_id, translator=None):
+    """Encerra o escalonador de um modelo descarregado (ou só o de uma instância específica)"""
+    with batch_schedulers_lock:
+        scheduler = batch_schedulers.get(model_id)
+        if scheduler is None or (translator is not None and scheduler.translator is not translator):
+            return
+        batch_schedulers.pop(model_id)
+    scheduler.stop()
+
+def run_translation(model_id, translator, text):
+    """Traduz um texto passando pelo escalonador de micro-lotes, se habilitado"""
+    if BATCHING_ENABLED:
+        scheduler = get_batch_scheduler(model_id, translator)
+        if scheduler is not None:
+            return scheduler.submit(text)
+    return translator.translate(text)
+
+# Configuração do cache de resultados de tradução
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.environ.get('TRANSLATION_CACHE_MAX_ENTRIES', '2048'))
+TRANSLATION_CACHE_MAX_BYTES = int(os.environ.get('TRANSLATION_CACHE_MAX_BYTES', str(4 * 1024 * 1024)))
+TRANSLATION_CACHE_TTL = float(os.environ.get('TRANSLATION_CACHE_TTL', '0'))  # segundos; 0 = sem expiração
+
+class TranslationCache:
+    """Cache LRU de traduções, limitado por número de entradas e por bytes.
+
+    A chave é (modelo, fingerprint dos arquivos do modelo, texto normalizado
+    como em `clean_sentence`), de modo que textos que só diferem em caixa ou
+    pontuação compartilham a mesma entrada.
+    """
+
+    # Custo aproximado de uma entrada além dos próprios textos (tupla, floats, nó do dicionário)
+    ENTRY_OVERHEAD_BYTES = 200
+
+    def __init__(self, max_entries=TRANSLATION_CACHE_MAX_ENTRIES, max_bytes=TRANSLATION_CACHE_MAX_BYTES, ttl=TRANSLATION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def make_key(model_id, fingerprint, text):
+        return (model_id, fingerprint, clean_sentence(text))
+
+    def get(self, model_id, fingerprint, text):
+        """Retorna a tradução em cache ou None"""
+        if not self.enabled:
+            return None
+        key = self.make_key(model_id, fingerprint, text)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            translated_text, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return translated_text
+
+    def put(self, model_id, fingerprint, text, translated_text):
+        if not self.enabled:
+            return
+        key = self.make_key(model_id, fingerprint, text)
+        size = len(key[2].encode('utf-8')) + len(translated_text.encode('utf-8')) + self.ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (translated_text, size, expires_at)
+            self.current_bytes += size
+            while len(self.entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                oldest_key = next(iter(self.entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.current_bytes -= size
+
+    def invalidate_model(self, model_id):
+        """Remove todas as entradas de um modelo (recarregado ou descarregado)"""
+        with self.lock:
+            keys = [key for key in self.entries if key[0] == model_id]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+translation_cache = TranslationCache()
+
+def release_model_resources(model_id, translator=None):
+    """Chamado quando um modelo é descarregado (manualmente ou por despejo LRU) ou trocado por nova versão.
+
+    A cópia no pool de inferência não é liberada aqui: itens ainda na fila do
+    escalonador antigo e requisições em andamento terminam na instância antiga,
+    e o finalizador dela libera o pool quando a última referência sai.
+    """
+    stop_batch_scheduler(model_id, translator)
+    translation_cache.invalidate_model(model_id)
+
+loaded_translators.on_evict = release_model_resources
+loaded_translators.on_swap = release_model_resources
+
+# Estatísticas de uso por modelo, mantidas em memória e gravadas periodicamente
+STATS_DIR = os.path.join(os.path.dirname(__file__), "stats")
+USAGE_STATS_FILE = os.environ.get('USAGE_STATS_FILE', os.path.join(STATS_DIR, "model_usage.json"))
+USAGE_FLUSH_INTERVAL = float(os.environ.get('USAGE_FLUSH_INTERVAL', '30'))  # segundos
+
+class UsageStats:
+    """Contadores de uso por modelo (sucesso/falha, uso diário e soma das latências).
+
+    As requisições só atualizam os contadores em memória, sob um lock; uma
+    thread em segundo plano grava stats/model_usage.json (ou USAGE_STATS_FILE) a cada
+    `flush_interval` segundos, e também no encerramento do processo, de forma
+    atômica (arquivo temporário + os.replace). O formato do arquivo continua
+    compatível com o anterior: {modelo: {"success": n, "failure": n, ...}}.
+    
+    Cada gravação soma ao arquivo só os incrementos do processo desde a
+    gravação anterior (`pending`), sob um lock de arquivo, de modo que vários
+    processos (workers do modo pre-fork) podem gravar no mesmo arquivo sem
+    perder as contagens uns dos outros.
+    """
+
+    def __init__(self, stats_file=USAGE_STATS_FILE, flush_interval=USAGE_FLUSH_INTERVAL):
+        self.stats_file = stats_file
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.models = self._load()
+        self.pending = {}
+        self.dirty = False
+        self.flushes = 0
+        self.last_flush_at = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _load(self):
+        try:
+            with open(self.stats_file, 'r') as f:
+                models = json.load(f)
+            return models if isinstance(models, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[DEBUG] Erro ao ler estatísticas de uso {self.stats_file}: {e}")
+            return {}
+
+    @staticmethod
+    def _model_entry(models, model_id):
+        entry = models.setdefault(model_id, {})
+        entry.setdefault('success', 0)
+        entry.setdefault('failure', 0)
+        entry.setdefault('daily_usage', {})
+        entry.setdefault('latency_ms_sum', 0.0)
+        entry.setdefault('latency_count', 0)
+        return entry
+
+    def record(self, model_id, success, latency_ms=None):
+        """Registra uma tradução; `daily_usage` conta as bem-sucedidas por dia"""
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        with self.lock:
+            for models in (self.models, self.pending):
+                entry = self._model_entry(models, model_id)
+                if success:
+                    entry['success'] += 1
+                    entry['daily_usage'][today] = entry['daily_usage'].get(today, 0) + 1
+                else:
+                    entry['failure'] += 1
+                if latency_ms is not None:
+                    entry['latency_ms_sum'] += latency_ms
+                    entry['latency_count'] += 1
+            self.dirty = True
+
+    @staticmethod
+    def _merge(models, increments):
+        """Soma os incrementos (mesmo formato do arquivo) aos contadores"""
+        for model_id, counters in increments.items():
+            entry = models.setdefault(model_id, {})
+            for key, value in counters.items():
+                if isinstance(value, dict):
+                    daily = entry.setdefault(key, {})
+                    for day, count in value.items():
+                        daily[day] = daily.get(day, 0) + count
+                else:
+                    entry[key] = entry.get(key, 0) + value
+        return models
+
+    def translations_today(self):
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        with self.lock:
+            return sum(entry.get('daily_usage', {}).get(today, 0) for entry in self.models.values())
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.models))
+
+    def flush(self):
+        """Soma ao arquivo os incrementos desde a última gravação e relê os totais de todos os processos"""
+        with self.lock:
+            if not self.dirty:
+                return False
+            increments, self.pending = self.pending, {}
+            self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.stats_file), exist_ok=True)
+            with open(f"{self.stats_file}.lock", 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                models = self._merge(self._load(), increments)
+                temp_file = f"{self.stats_file}.{os.getpid()}.tmp"
+                with open(temp_file, 'w') as f:
+                    f.write(json.dumps(models, indent=2))
+                os.replace(temp_file, self.stats_file)
+            with self.lock:
+                # Os incrementos que chegaram durante a gravação continuam pendentes
+                self.models = self._merge(models, self.pending)
+            self.flushes += 1
+            self.last_flush_at = datetime.datetime.now().isoformat()
+            return True
+        except Exception as e:
+            print(f"[DEBUG] Erro ao gravar estatísticas de uso: {e}")
+            with self.lock:
+                self._merge(self.pending, increments)
+                self.dirty = True
+            return False
+
+    def _run(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def start(self):
+        # Também reinicia a thread num worker do modo pre-fork (threads não atravessam o fork)
+        if self.thread is None or not self.thread.is_alive():
+            if self.thread is None:
+                atexit.register(self.stop)
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="usage-stats-flush", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.flush()
+
+    def stats(self):
+        with self.lock:
+            models = {
+                model_id: {
+                    'success': entry.get('success', 0),
+                    'failure': entry.get('failure', 0),
+                    'avg_latency_ms': round(entry['latency_ms_sum'] / entry['latency_count'], 3)
+                    if entry.get('latency_count') else None
+                }
+                for model_id, entry in self.models.items()
+            }
+            dirty = self.dirty
+        return {
+            'models': models,
+            'translations_today': self.translations_today(),
+            'flush_interval_seconds': self.flush_interval,
+            'pending_flush': dirty,
+            'flushes': self.flushes,
+            'last_flush_at': self.last_flush_at
+        }
+
+usage_stats = UsageStats()
+usage_stats.start()
+startup_timer.mark('usage_stats')
+
+# Modelos carregados na inicialização: PRELOAD_MODELS (ids separados por vírgula ou "all")
+# ou, se a variável não estiver definida, o arquivo preload_models.json (lista de ids)
+PRELOAD_MODELS_FILE = os.environ.get('PRELOAD_MODELS_FILE', os.path.join(os.path.dirname(__file__), "preload_models.json"))
+PRELOAD_WORKERS = int(os.environ.get('PRELOAD_WORKERS', '2'))
+
+def get_preload_model_ids():
+    """Lista de modelos a pré-carregar, da variável de ambiente ou do arquivo de configuração"""
+    value = os.environ.get('PRELOAD_MODELS')
+    if value is None and os.path.exists(PRELOAD_MODELS_FILE):
+        try:
+            with open(PRELOAD_MODELS_FILE, 'r') as f:
+                config = json.load(f)
+            value = config.get('models', []) if isinstance(config, dict) else config
+        except Exception as e:
+            print(f"[DEBUG] Erro ao ler {PRELOAD_MODELS_FILE}: {e}")
+            value = None
+    if not value:
+        return []
+    model_ids = [m.strip() for m in value.split(',')] if isinstance(value, str) else [str(m).strip() for m in value]
+    if model_ids == ['all']:
+        return [model['id'] for model in get_available_models()]
+    return [model_id for model_id in model_ids if model_id]
+
+class ModelPreloader:
+    """Carrega uma lista de modelos em segundo plano, num pool de threads.
+
+    O servidor começa a aceitar requisições imediatamente; o estado de cada
+    modelo (pending, loading, ready, failed) e o tempo de carregamento ficam
+    disponíveis em /api/ready.
+    """
+
+    def __init__(self, max_workers=PRELOAD_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self.lock = threading.Lock()
+        self.models = {}
+        self.started_at = None
+
+    def start(self, model_ids, wait=False):
+        if not model_ids:
+            return
+        self.started_at = datetime.datetime.now().isoformat()
+        with self.lock:
+            for model_id in model_ids:
+                self.models[model_id] = {'state': 'pending', 'load_ms': None, 'error': None}
+        print(f"[DEBUG] Pré-carregando {len(model_ids)} modelos com {self.max_workers} threads: {model_ids}")
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="model-preload")
+        for model_id in model_ids:
+            executor.submit(self._load, model_id)
+        executor.shutdown(wait=wait)
+
+    def _update(self, model_id, **fields):
+        with self.lock:
+            self.models[model_id].update(fields)
+
+    def _load(self, model_id):
+        self._update(model_id, state='loading')
+        start_time = time.perf_counter()
+        try:
+            translator = get_or_load_translator(model_id)
+            error = None if translator else 'Falha ao carregar o modelo'
+        except Exception as e:
+            translator, error = None, str(e)
+        load_ms = round((time.perf_counter() - start_time) * 1000, 1)
+        self._update(model_id, state='ready' if translator else 'failed', load_ms=load_ms, error=error)
+        print(f"[DEBUG] Pré-carregamento de {model_id}: {'pronto' if translator else 'falhou'} em {load_ms} ms")
+
+    def status(self):
+        with self.lock:
+            models = {model_id: dict(state) for model_id, state in self.models.items()}
+        return {
+            'ready': all(state['state'] == 'ready' for state in models.values()),
+            'started_at': self.started_at,
+            'models': models
+        }
+
+model_preloader = ModelPreloader()
+
+def start_model_preload():
+    model_preloader.start(get_preload_model_ids())
+
+# Intervalo de verificação de mudanças nos arquivos dos modelos carregados (segundos; 0 desliga)
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', '5'))
+# Texto traduzido como teste antes de pôr uma nova versão no ar (a chave "smoke_test_text" do config.json tem prioridade)
+MODEL_RELOAD_SMOKE_TEXT = os.environ.get('MODEL_RELOAD_SMOKE_TEXT', 'hello')
+
+class ModelReloader:
+    """Recarrega sem indisponibilidade os modelos carregados cujos arquivos mudaram no disco.
+
+    A cada `interval` segundos compara mtime e tamanho dos artefatos
+    (model.keras, config.json, tokenizadores) de cada modelo carregado. Uma
+    mudança só é considerada depois de os arquivos ficarem estáveis por uma
+    verificação inteira (cópia em andamento) e só dispara a recarga se o
+    SHA-256 de algum artefato diferir do da instância no ar, de modo que um
+    `touch` não recarrega nada. A nova versão é carregada e aquecida em segundo
+    plano, passa por uma tradução de teste e só então é trocada atomicamente no
+    ModelManager; requisições em andamento terminam na instância antiga. Se
+    algo falhar, a versão antiga continua no ar até os arquivos mudarem de novo.
+    """
+
+    def __init__(self, interval=MODEL_RELOAD_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.watched = {}
+        self.reloading = set()
+        self.models = {}
+        self.checks = 0
+        self.reloads = 0
+        self.failures = 0
+        self.deferrals = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def _signature(model_path):
+        """mtime e tamanho de cada artefato do modelo"""
+        signature = []
+        for artifact in MODEL_ARTIFACTS:
+            try:
+                stat = os.stat(os.path.join(model_path, artifact))
+                signature.append((artifact, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((artifact, None, None))
+        return tuple(signature)
+
+    @staticmethod
+    def changed_artifacts(translator):
+        """Artefatos cujo SHA-256 no disco difere do da instância carregada"""
+        current = artifact_hashes(translator.model_path)
+        return [artifact for artifact in MODEL_ARTIFACTS
+                if current.get(artifact) != translator.artifact_hashes.get(artifact)]
+
+    def check(self):
+        """Verifica uma vez todos os modelos carregados; retorna os ids recarregados"""
+        with self.lock:
+            self.checks += 1
+        reloaded = []
+        for model_id, translator in loaded_translators.items():
+            signature = self._signature(translator.model_path)
+            watched = self.watched.get(model_id)
+            if watched is None or watched['translator'] is not translator:
+                # Instância nova: confirma pelo hash que os arquivos não mudaram depois do carregamento
+                self.watched[model_id] = {'translator': translator, 'signature': signature, 'pending': None}
+            elif signature == watched['signature']:
+                continue
+            elif signature != watched['pending']:
+                # Arquivos mudando: espera ficarem estáveis até a próxima verificação
+                watched['pending'] = signature
+                continue
+            else:
+                watched['signature'], watched['pending'] = signature, None
+            changed = self.changed_artifacts(translator)
+            if changed and self.reload(model_id, translator, changed):
+                reloaded.append(model_id)
+        return reloaded
+
+    def _update(self, model_id, **fields):
+        with self.lock:
+            self.models.setdefault(model_id, {'reloads': 0, 'failures': 0}).update(fields)
+
+    def reload(self, model_id, current=None, changed=None):
+        """Carrega, aquece e testa a nova versão de um modelo e a troca pela atual.
+
+        Retorna True se a troca aconteceu.
+        """
+        current = current or loaded_translators.peek(model_id)
+        if current is None:
+            return False
+        with self.lock:
+            if model_id in self.reloading:
+                return False
+            self.reloading.add(model_id)
+        # A nova versão fica carregada ao lado da atual até a troca: reservar o tamanho dela no orçamento
+        required_mb = loaded_translators.estimate_mb(model_id)
+        if not loaded_translators.reserve(required_mb, keep=model_id):
+            print(f"[DEBUG] Recarga de {model_id} adiada: {required_mb:.0f} MB para a nova versão não cabem "
+                  f"no orçamento de memória ({loaded_translators.budget_mb} MB)")
+            with self.lock:
+                self.deferrals += 1
+                self.reloading.discard(model_id)
+            self._update(model_id, state='deferred', error="sem memória no orçamento para a nova versão")
+            # Nova tentativa na próxima verificação em que os arquivos estiverem estáveis
+            watched = self.watched.get(model_id)
+            if watched is not None and watched['translator'] is current:
+                watched['signature'] = None
+            return False
+        print(f"[DEBUG] Recarregando {model_id} em segundo plano (artefatos alterados: {changed or 'recarga manual'})")
+        self._update(model_id, state='reloading', changed=changed, started_at=datetime.datetime.now().isoformat(), error=None)
+        start_time = time.perf_counter()
+        candidate = None
+        try:
+            candidate = Translator(current.model_path, inference_path=current.requested_inference_path,
+                                   length_bucketing=current.requested_length_bucketing,
+                                   tflite_quantization=current.requested_tflite_quantization,
+                                   inference_pool=current.inference_pool)
+            # load_model já faz o aquecimento do caminho de inferência
+            candidate.load_model()
+            smoke_text = candidate.config.get('smoke_test_text') or MODEL_RELOAD_SMOKE_TEXT
+            smoke_translation = candidate.translate_batch([smoke_text])
+            if len(smoke_translation) != 1 or not isinstance(smoke_translation[0], str):
+                raise ValueError(f"tradução de teste inválida: {smoke_translation!r}")
+            # O tamanho já conhecido do modelo continua valendo: um delta de RSS medido enquanto
+            # outras requisições alocam memória não é confiável
+            if not loaded_translators.swap(model_id, candidate, current):
+                raise RuntimeError("o modelo foi descarregado ou trocado durante a recarga; nova versão descartada")
+        except Exception as e:
+            if candidate is not None:
+                candidate.release_pool_model()
+            reload_ms = round((time.perf_counter() - start_time) * 1000, 1)
+            print(f"[DEBUG] Recarga de {model_id} falhou, versão anterior continua no ar: {e}")
+            with self.lock:
+                self.failures += 1
+                self.reloading.discard(model_id)
+                entry = self.models[model_id]
+                entry.update(state='failed', error=str(e), reload_ms=reload_ms)
+                entry['failures'] += 1
+            return False
+        finally:
+            loaded_translators.release_reservation(required_mb)
+        
+        reload_ms = round((time.perf_counter() - start_time) * 1000, 1)
+        print(f"[DEBUG] {model_id} recarregado em {reload_ms} ms: fingerprint {current.fingerprint} → {candidate.fingerprint}")
+        with self.lock:
+            self.reloads += 1
+            self.reloading.discard(model_id)
+            entry = self.models[model_id]
+            entry.update(state='ready', reload_ms=reload_ms, reloaded_at=datetime.datetime.now().isoformat(),
+                         previous_fingerprint=current.fingerprint, fingerprint=candidate.fingerprint,
+                         previous_model_date=current.config.get('model_date'),
+                         model_date=candidate.config.get('model_date'),
+                         smoke_translation=smoke_translation[0])
+            entry['reloads'] += 1
+        self.watched[model_id] = {'translator': candidate, 'signature': self._signature(candidate.model_path), 'pending': None}
+        return True
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"[DEBUG] Erro na verificação de mudanças dos modelos: {e}")
+
+    def start(self):
+        if self.interval > 0 and (self.thread is None or not self.thread.is_alive()):
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'enabled': self.thread is not None and self.thread.is_alive(),
+                'interval_seconds': self.interval,
+                'checks': self.checks,
+                'reloads': self.reloads,
+                'failures': self.failures,
+                'deferrals': self.deferrals,
+                'reloading': sorted(self.reloading),
+                'models': {model_id: dict(state) for model_id, state in self.models.items()}
+            }
+
+model_reloader = ModelReloader()
+model_reloader.start()
+
 @app.route('/')
 def home():
     """Página principal do aplicativo"""
@@ -418,18 +1740,29 @@ def api_models():
     """Retorna a lista de modelos disponíveis"""
     models = get_available_models()
     
-    # Adicionar informação sobre se o modelo está carregado
+    # Adicionar o estado do gerenciador de modelos (carregado, memória, último uso, acessos)
     for model in models:
-        model["loaded"] = model["id"] in loaded_translators
+        model.update(loaded_translators.model_state(model["id"]))
     
     return jsonify(models)
 
+@app.route('/api/models/refresh', methods=['POST'])
+def api_refresh_models():
+    """Força uma nova varredura da pasta de modelos"""
+    model_registry.refresh()
+    return jsonify({
+        "success": True,
+        "models": [model["id"] for model in model_registry.list()],
+        "registry": model_registry.stats()
+    })
+
 @app.route('/api/models/<model_id>/status', methods=['GET'])
 def api_model_status(model_id):
     """Verifica o status de um modelo específico"""
     is_loaded = model_id in loaded_translators
     
     return jsonify({
+        **loaded_translators.model_state(model_id),
         "id": model_id,
         "loaded": is_loaded,
         "status": "loaded" if is_loaded else "not_loaded"
@@ -459,6 +1792,29 @@ def api_load_model(model_id):
             "error": f"Falha ao carregar o modelo {model_id}"
         }), 500
 
+@app.route('/api/models/<model_id>/reload', methods=['POST'])
+def api_reload_model(model_id):
+    """Recarrega um modelo carregado a partir do disco, sem tirá-lo do ar"""
+    if model_id not in loaded_translators:
+        return jsonify({
+            "success": False,
+            "error": "Modelo não está carregado"
+        }), 400
+    
+    reloaded = model_reloader.reload(model_id)
+    state = model_reloader.stats()['models'].get(model_id, {})
+    if reloaded:
+        return jsonify({
+            "success": True,
+            "message": f"Modelo {model_id} recarregado com sucesso",
+            "reload": state
+        })
+    return jsonify({
+        "success": False,
+        "error": state.get('error') or f"Recarga do modelo {model_id} já em andamento",
+        "reload": state
+    }), 409 if model_id in model_reloader.reloading else 503 if state.get('state') == 'deferred' else 500
+
 @app.route('/api/models/<model_id>/unload', methods=['POST'])
 def api_unload_model(model_id):
     """Descarrega um modelo da memória"""
@@ -469,9 +1825,9 @@ def api_unload_model(model_id):
             "error": "Modelo não está carregado"
         }), 400
     
-    # Descarregar o modelo
+    # Descarregar o modelo (o gerenciador encerra o escalonador e invalida o cache)
     try:
-        del loaded_translators[model_id]
+        loaded_translators.remove(model_id)
         return jsonify({
             "success": True,
             "message": f"Modelo {model_id} descarregado com sucesso"
@@ -520,6 +1876,7 @@ def api_download_model():
         if success:
             # Configurar para inferência
             setup_success = setup_model_for_inference(path)
+            model_registry.refresh()
             return jsonify({
                 "success": True,
                 "message": "Modelo baixado com sucesso",
@@ -541,6 +1898,52 @@ def api_download_model():
             "error": f"Erro ao baixar modelo: {str(e)}"
         }), 500
 
+def translation_result(translator, translated_text, from_cache):
+    """Corpo da resposta de /api/translate para uma tradução feita pelo modelo (ou servida do cache)"""
+    return {
+        'success': True,
+        'translated_text': translated_text,
+        'source_language': translator.source_language,
+        'target_language': translator.target_language,
+        'from_correction': False,
+        'from_cache': from_cache
+    }
+
+def translation_error(model_id, text, error):
+    """Salva os detalhes de um erro de tradução em errors/ e retorna o corpo da resposta 500"""
+    error_traceback = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+    print(f"[DEBUG] ERRO durante a tradução: {error}")
+    print(f"[DEBUG] Traceback da tradução: {error_traceback}")
+    
+    # Salvar informações detalhadas do erro
+    try:
+        error_data = {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "model_id": model_id,
+            "text_sample": text[:100] + "..." if len(text) > 100 else text,
+            "error_type": type(error).__name__,
+            "error_message": str(error),
+            "traceback": error_traceback
+        }
+        
+        error_dir = os.path.join(os.path.dirname(__file__), "errors")
+        os.makedirs(error_dir, exist_ok=True)
+        error_file = os.path.join(error_dir, f"translation_error_{model_id}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(error_file, "w") as f:
+            json.dump(error_data, f, indent=2, default=str)
+        print(f"[DEBUG] Detalhes do erro salvos em {error_file}")
+    except Exception as error_log_error:
+        print(f"[DEBUG] Erro ao salvar detalhes do erro: {str(error_log_error)}")
+    
+    # Retornar erro detalhado para o frontend
+    return {
+        'success': False,
+        'error': f"Erro ao traduzir o texto: {str(error)}",
+        'error_type': type(error).__name__,
+        'model_id': model_id,
+        'diagnostic_url': '/diagnostic'
+    }
+
 @app.route('/api/translate', methods=['POST'])
 def api_translate():
     """Traduz o texto usando o modelo especificado"""
@@ -575,6 +1978,7 @@ def api_translate():
                 'source_language': correction.get('sourceLang', 'desconhecido'),
                 'target_language': correction.get('targetLang', 'desconhecido'),
                 'from_correction': True,
+                'from_cache': False,
                 'original_translation': correction.get('originalTranslation', '')
             })
         print(f"[DEBUG] Nenhuma correção encontrada para este texto e modelo.")
@@ -641,7 +2045,7 @@ def api_translate():
             # Tenta o modelo alternativo silenciosamente
             alt_translator = None
             try:
-                alt_model_info = next((m for m in get_available_models() if m["id"] == alt_model_id), None)
+                alt_model_info = model_registry.get(alt_model_id)
                 if alt_model_info:
                     alt_translator = get_or_load_translator(alt_model_id)
                     if alt_translator:
@@ -661,6 +2065,7 @@ def api_translate():
                         'source_language': alt_translator.source_language,
                         'target_language': alt_translator.target_language,
                         'from_correction': False,
+                        'from_cache': False,
                         'used_alternative_model': True,
                         'original_model': model_id,
                         'actual_model': alt_model_id,
@@ -710,103 +2115,26 @@ def api_translate():
         
         # Realizar a tradução
         print(f"[DEBUG] Tradutor carregado com sucesso. Realizando tradução...")
+        translate_start = time.perf_counter()
         try:
-            translated_text = translator.translate(text)
-            print(f"[DEBUG] Tradução realizada com sucesso: '{translated_text}'")
+            translated_text = translation_cache.get(model_id, translator.fingerprint, text)
+            from_cache = translated_text is not None
+            if from_cache:
+                print(f"[DEBUG] Tradução servida do cache: '{translated_text}'")
+            else:
+                translated_text = run_translation(model_id, translator, text)
+                translation_cache.put(model_id, translator.fingerprint, text, translated_text)
+                print(f"[DEBUG] Tradução realizada com sucesso: '{translated_text}'")
             
             # Registrar sucesso para análises futuras
-            try:
-                # Salvar estatística de uso bem-sucedido
-                stats_dir = os.path.join(os.path.dirname(__file__), "stats")
-                os.makedirs(stats_dir, exist_ok=True)
-                stats_file = os.path.join(stats_dir, f"model_usage.json")
-                
-                # Carregar estatísticas existentes ou criar novas
-                stats = {}
-                if os.path.exists(stats_file):
-                    try:
-                        with open(stats_file, "r") as f:
-                            stats = json.load(f)
-                    except:
-                        stats = {}
-                
-                # Atualizar estatísticas
-                if model_id not in stats:
-                    stats[model_id] = {"success": 0, "failure": 0}
-                stats[model_id]["success"] = stats[model_id]["success"] + 1
-                
-                # Salvar estatísticas atualizadas
-                with open(stats_file, "w") as f:
-                    json.dump(stats, f, indent=2)
-            except Exception as stats_error:
-                print(f"[DEBUG] Erro ao atualizar estatísticas: {str(stats_error)}")
+            usage_stats.record(model_id, True, (time.perf_counter() - translate_start) * 1000)
             
-            return jsonify({
-                'success': True,
-                'translated_text': translated_text,
-                'source_language': translator.source_language,
-                'target_language': translator.target_language,
-                'from_correction': False
-            })
+            return jsonify(translation_result(translator, translated_text, from_cache))
         except Exception as e:
-            print(f"[DEBUG] ERRO durante a tradução: {e}")
-            print(f"[DEBUG] Traceback da tradução: {traceback.format_exc()}")
-            
             # Registrar falha para análises futuras
-            try:
-                # Salvar estatística de uso com falha
-                stats_dir = os.path.join(os.path.dirname(__file__), "stats")
-                os.makedirs(stats_dir, exist_ok=True)
-                stats_file = os.path.join(stats_dir, f"model_usage.json")
-                
-                # Carregar estatísticas existentes ou criar novas
-                stats = {}
-                if os.path.exists(stats_file):
-                    try:
-                        with open(stats_file, "r") as f:
-                            stats = json.load(f)
-                    except:
-                        stats = {}
-                
-                # Atualizar estatísticas
-                if model_id not in stats:
-                    stats[model_id] = {"success": 0, "failure": 0}
-                stats[model_id]["failure"] = stats[model_id]["failure"] + 1
-                
-                # Salvar estatísticas atualizadas
-                with open(stats_file, "w") as f:
-                    json.dump(stats, f, indent=2)
-            except Exception as stats_error:
-                print(f"[DEBUG] Erro ao atualizar estatísticas: {str(stats_error)}")
+            usage_stats.record(model_id, False, (time.perf_counter() - translate_start) * 1000)
             
-            # Salvar informações detalhadas do erro
-            try:
-                error_data = {
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "model_id": model_id,
-                    "text_sample": text[:100] + "..." if len(text) > 100 else text,
-                    "error_type": type(e).__name__,
-                    "error_message": str(e),
-                    "traceback": traceback.format_exc()
-                }
-                
-                error_dir = os.path.join(os.path.dirname(__file__), "errors")
-                os.makedirs(error_dir, exist_ok=True)
-                error_file = os.path.join(error_dir, f"translation_error_{model_id}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-                with open(error_file, "w") as f:
-                    json.dump(error_data, f, indent=2, default=str)
-                print(f"[DEBUG] Detalhes do erro salvos em {error_file}")
-            except Exception as error_log_error:
-                print(f"[DEBUG] Erro ao salvar detalhes do erro: {str(error_log_error)}")
-            
-            # Retornar erro detalhado para o frontend
-            return jsonify({
-                'success': False,
-                'error': f"Erro ao traduzir o texto: {str(e)}",
-                'error_type': type(e).__name__,
-                'model_id': model_id,
-                'diagnostic_url': '/diagnostic'
-            }), 500
+            return jsonify(translation_error(model_id, text, e)), 500
             
     except Exception as e:
         print(f"[DEBUG] ERRO ao traduzir com modelo {model_id}: {e}")
@@ -841,6 +2169,419 @@ def api_translate():
         print(f"[DEBUG] Tentando usar método de fallback para a tradução...")
         return fallback_translation(text, model_id)
 
+# Limite de textos aceitos por requisição de tradução em lote
+MAX_BATCH_TEXTS = int(os.environ.get('MAX_BATCH_TEXTS', '256'))
+
+@app.route('/api/translate/batch', methods=['POST'])
+def api_translate_batch():
+    """Traduz uma lista de textos com uma única passada do modelo"""
+    data = request.json
+
+    if not data or 'texts' not in data or 'model' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'Parâmetros inválidos. É necessário fornecer "texts" e "model".'
+        }), 400
+
+    texts = data['texts']
+    model_id = data['model']
+    use_corrections = data.get('use_corrections', True)
+
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return jsonify({
+            'success': False,
+            'error': 'O parâmetro "texts" deve ser uma lista de strings.'
+        }), 400
+
+    if len(texts) > MAX_BATCH_TEXTS:
+        return jsonify({
+            'success': False,
+            'error': f'Número máximo de textos por lote excedido ({len(texts)} > {MAX_BATCH_TEXTS}).'
+        }), 413
+
+    print(f"[DEBUG] Solicitação de tradução em lote: {len(texts)} textos, modelo {model_id}")
+    start_time = time.perf_counter()
+    results = [None] * len(texts)
+
+    # Aplicar correções item a item; o restante vai para o modelo
+    pending = []
+    for index, text in enumerate(texts):
+        item_start = time.perf_counter()
+        correction = find_correction(text, model_id) if use_corrections else None
+        if correction:
+            results[index] = {
+                'index': index,
+                'text': text,
+                'translated_text': correction['correctedTranslation'],
+                'from_correction': True,
+                'from_cache': False,
+                'original_translation': correction.get('originalTranslation', ''),
+                'time_ms': round((time.perf_counter() - item_start) * 1000, 3)
+            }
+        else:
+            pending.append(index)
+
+    translator = None
+    inference_time_ms = 0.0
+    if pending:
+        translator = get_or_load_translator(model_id)
+        if not translator:
+            return jsonify({
+                'success': False,
+                'error': f'Erro ao carregar modelo {model_id}.'
+            }), 500
+
+        # Itens já traduzidos antes são servidos do cache
+        uncached = []
+        for index in pending:
+            item_start = time.perf_counter()
+            cached_text = translation_cache.get(model_id, translator.fingerprint, texts[index])
+            if cached_text is None:
+                uncached.append(index)
+                continue
+            results[index] = {
+                'index': index,
+                'text': texts[index],
+                'translated_text': cached_text,
+                'from_correction': False,
+                'from_cache': True,
+                'time_ms': round((time.perf_counter() - item_start) * 1000, 3)
+            }
+            usage_stats.record(model_id, True, results[index]['time_ms'])
+        pending = uncached
+
+    if pending:
+        try:
+            inference_start = time.perf_counter()
+            translations = translator.translate_batch([texts[i] for i in pending])
+            inference_time_ms = (time.perf_counter() - inference_start) * 1000
+        except Exception as e:
+            print(f"[DEBUG] ERRO durante a tradução em lote: {e}")
+            print(f"[DEBUG] Traceback da tradução: {traceback.format_exc()}")
+            for _ in pending:
+                usage_stats.record(model_id, False)
+            return jsonify({
+                'success': False,
+                'error': f"Erro ao traduzir os textos: {str(e)}",
+                'error_type': type(e).__name__,
+                'model_id': model_id
+            }), 500
+
+        # O custo da passada única é dividido igualmente entre os itens do lote
+        per_item_ms = inference_time_ms / len(pending)
+        for index, translated_text in zip(pending, translations):
+            translation_cache.put(model_id, translator.fingerprint, texts[index], translated_text)
+            results[index] = {
+                'index': index,
+                'text': texts[index],
+                'translated_text': translated_text,
+                'from_correction': False,
+                'from_cache': False,
+                'time_ms': round(per_item_ms, 3)
+            }
+            usage_stats.record(model_id, True, per_item_ms)
+
+    total_time_ms = (time.perf_counter() - start_time) * 1000
+    total_seconds = total_time_ms / 1000
+
+    return jsonify({
+        'success': True,
+        'model_id': model_id,
+        'source_language': translator.source_language if translator else None,
+        'target_language': translator.target_language if translator else None,
+        'results': results,
+        'count': len(results),
+        'model_batch_size': len(pending),
+        'from_correction_count': sum(1 for r in results if r['from_correction']),
+        'from_cache_count': sum(1 for r in results if r['from_cache']),
+        'inference_time_ms': round(inference_time_ms, 3),
+        'total_time_ms': round(total_time_ms, 3),
+        'throughput_per_second': round(len(results) / total_seconds, 2) if total_seconds > 0 else None
+    })
+
+# Tradução de documentos por SSE: o primeiro lote tem um trecho, para o primeiro evento sair logo,
+# e os seguintes dobram até STREAM_BATCH_SIZE; texto puro no corpo é lido em blocos de STREAM_READ_BYTES
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', '16'))
+STREAM_READ_BYTES = 64 * 1024
+
+def sse_event(event, data):
+    """Formata um evento Server-Sent Events com dados em JSON"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def read_stream(stream, size=STREAM_READ_BYTES):
+    """Lê um corpo de requisição em blocos de bytes"""
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+def text_chunks(text, size=STREAM_READ_BYTES):
+    """Divide um texto já na memória em pedaços, para só um pedaço de trechos pendentes por vez"""
+    return (text[start:start + size] for start in range(0, len(text), size))
+
+def translate_segments(model_id, translator, texts, use_corrections):
+    """Traduz um lote de trechos: correções e cache primeiro, uma passada do modelo para o restante"""
+    results = [None] * len(texts)
+    pending = []
+    for index, text in enumerate(texts):
+        correction = find_correction(text, model_id) if use_corrections else None
+        if correction:
+            results[index] = {
+                'translated_text': correction['correctedTranslation'],
+                'from_correction': True,
+                'from_cache': False
+            }
+            continue
+        cached_text = translation_cache.get(model_id, translator.fingerprint, text)
+        if cached_text is not None:
+            results[index] = {'translated_text': cached_text, 'from_correction': False, 'from_cache': True}
+        else:
+            pending.append(index)
+    
+    if pending:
+        translations = translator.translate_batch([texts[index] for index in pending])
+        for index, translated_text in zip(pending, translations):
+            translation_cache.put(model_id, translator.fingerprint, texts[index], translated_text)
+            results[index] = {'translated_text': translated_text, 'from_correction': False, 'from_cache': False}
+    return results
+
+class DocumentStream:
+    """Tradução de um documento em eventos SSE: `start`, um `segment` por trecho e `done` (ou `error`).
+
+    O documento é empurrado em pedaços: `feed` recebe o próximo pedaço (bytes,
+    com `encoding`, ou str) e gera os eventos dos lotes que já estão completos;
+    `finish` gera os do resto e o `done`. Nenhum dos dois espera pelo corpo da
+    requisição, então o servidor ASGI lê o corpo no loop e só entrega ao
+    executor pedaços que já chegaram. Só os trechos de um pedaço e o resto de
+    frase ainda sem fim ficam na memória.
+    """
+
+    def __init__(self, model_id, translator, use_corrections=True, encoding=None):
+        self.model_id = model_id
+        self.translator = translator
+        self.use_corrections = use_corrections
+        # Decodificação incremental: caracteres multibyte podem ficar na fronteira dos pedaços
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors='replace') if encoding else None
+        self.sentences = SentenceSplitter()
+        self.pending = deque()
+        self.index = 0
+        self.batch_size = 1
+        self.failed = False
+        self.start_time = time.perf_counter()
+
+    def start(self):
+        return sse_event('start', {
+            'model_id': self.model_id,
+            'source_language': self.translator.source_language,
+            'target_language': self.translator.target_language
+        })
+
+    def feed(self, chunk):
+        if self.decoder is not None:
+            chunk = self.decoder.decode(chunk)
+        yield from self._events(chunk, final=False)
+
+    def finish(self):
+        tail = self.decoder.decode(b'', final=True) if self.decoder is not None else ''
+        yield from self._events(tail, final=True)
+        if not self.failed:
+            yield sse_event('done', {
+                'success': True,
+                'segments': self.index,
+                'total_time_ms': round((time.perf_counter() - self.start_time) * 1000, 3)
+            })
+
+    def _events(self, text, final):
+        if self.failed:
+            return
+        batch = []
+        try:
+            sentences = self.sentences.feed(text)
+            if final:
+                sentences += self.sentences.close()
+            self.pending.extend(self.translator.split_segments(sentences))
+            # Lotes completos; no fim do documento, também o último lote incompleto
+            while len(self.pending) >= self.batch_size or (final and self.pending):
+                batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+                batch_start = time.perf_counter()
+                results = translate_segments(self.model_id, self.translator, batch, self.use_corrections)
+                per_item_ms = (time.perf_counter() - batch_start) * 1000 / len(batch)
+                for text, result in zip(batch, results):
+                    usage_stats.record(self.model_id, True, per_item_ms)
+                    yield sse_event('segment', dict(result, index=self.index, text=text))
+                    self.index += 1
+                batch = []
+                self.batch_size = min(self.batch_size * 2, max(1, STREAM_BATCH_SIZE))
+        except Exception as e:
+            print(f"[DEBUG] ERRO durante a tradução do documento: {e}")
+            print(f"[DEBUG] Traceback da tradução: {traceback.format_exc()}")
+            self.failed = True
+            for _ in batch:
+                usage_stats.record(self.model_id, False)
+            yield sse_event('error', {
+                'success': False,
+                'error': f"Erro ao traduzir o documento: {str(e)}",
+                'error_type': type(e).__name__,
+                'model_id': self.model_id,
+                'segments': self.index
+            })
+
+def stream_translation_events(model_id, translator, chunks, use_corrections=True, encoding=None):
+    """Eventos SSE de um documento que chega por um iterável de pedaços (lidos conforme a tradução avança)"""
+    stream = DocumentStream(model_id, translator, use_corrections, encoding)
+    yield stream.start()
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+        if stream.failed:
+            return
+    yield from stream.finish()
+
+@app.route('/api/translate/stream', methods=['POST'])
+def api_translate_stream():
+    """Traduz um documento de qualquer tamanho, enviando cada trecho por SSE assim que o seu lote termina.
+
+    Aceita JSON ({"text", "model"}) ou o texto puro no corpo com ?model=, lido em blocos.
+    """
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        model_id = data.get('model')
+        text = data.get('text')
+        use_corrections = data.get('use_corrections', True)
+        chunks = text_chunks(text) if isinstance(text, str) else None
+        encoding = None
+    else:
+        model_id = request.args.get('model')
+        use_corrections = request.args.get('use_corrections', 'true').lower() != 'false'
+        chunks = read_stream(request.stream)
+        encoding = request.mimetype_params.get('charset', 'utf-8')
+    
+    if not model_id or chunks is None:
+        return jsonify({
+            'success': False,
+            'error': 'Parâmetros inválidos. É necessário fornecer "text" e "model" (ou o texto no corpo e ?model=).'
+        }), 400
+    
+    translator = get_or_load_translator(model_id)
+    if not translator:
+        return jsonify({
+            'success': False,
+            'error': f'Erro ao carregar modelo {model_id}.'
+        }), 500
+    
+    print(f"[DEBUG] Tradução de documento por SSE com o modelo {model_id}")
+    events = stream_translation_events(model_id, translator, chunks, use_corrections, encoding)
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Tarefas de tradução de arquivos (translation_jobs.py): pasta das tarefas e registros por bloco
+JOBS_DIR = os.environ.get('JOBS_DIR', os.path.join(os.path.dirname(__file__), "jobs"))
+JOB_CHUNK_RECORDS = int(os.environ.get('JOB_CHUNK_RECORDS', str(DEFAULT_CHUNK_RECORDS)))
+JOB_MIMETYPES = {'tsv': 'text/tab-separated-values', 'txt': 'text/plain', 'json': 'application/json'}
+
+def translate_documents(model_id, texts, use_corrections=True):
+    """Traduz um bloco de registros de uma tarefa; registros longos são divididos em trechos e remontados"""
+    translator = get_or_load_translator(model_id)
+    if not translator:
+        raise RuntimeError(f"Erro ao carregar modelo {model_id}.")
+    
+    start_time = time.perf_counter()
+    pieces = [list(translator.split_segments(iter_sentences([text]))) for text in texts]
+    flat = [piece for record in pieces for piece in record]
+    # Passadas de até STREAM_BATCH_SIZE trechos: a memória da inferência não cresce com o tamanho dos registros
+    batch_size = max(1, STREAM_BATCH_SIZE)
+    results = []
+    for start in range(0, len(flat), batch_size):
+        results.extend(translate_segments(model_id, translator, flat[start:start + batch_size], use_corrections))
+    per_item_ms = (time.perf_counter() - start_time) * 1000 / len(texts) if texts else 0
+    
+    translations = []
+    position = 0
+    for record in pieces:
+        translations.append(" ".join(result['translated_text'] for result in results[position:position + len(record)]))
+        position += len(record)
+        usage_stats.record(model_id, True, per_item_ms)
+    return translations
+
+translation_jobs = TranslationJobs(JOBS_DIR, translate_documents, JOB_CHUNK_RECORDS)
+
+def job_response(job, status=200):
+    return jsonify({
+        'success': True,
+        'job': translation_jobs.public(job),
+        'status_url': f"/api/jobs/{job['id']}",
+        'download_url': f"/api/jobs/{job['id']}/download"
+    }), status
+
+@app.route('/api/jobs', methods=['POST'])
+def api_create_job():
+    """Cria uma tarefa de tradução de arquivo (TSV, TXT ou JSON) processada em segundo plano.
+
+    O arquivo vem num formulário multipart (campo "file") ou direto no corpo, com
+    os parâmetros na URL (?model=...&filename=...).
+    """
+    upload = request.files.get('file')
+    params = request.form if upload is not None else request.args
+    model_id = params.get('model')
+    job_format = params.get('format') or None
+    use_corrections = params.get('use_corrections', 'true').lower() != 'false'
+    try:
+        column = int(params.get('column', '0'))
+    except ValueError:
+        column = -1
+    
+    if not model_id or column < 0 or (job_format is not None and job_format not in JOB_FORMATS):
+        return jsonify({
+            'success': False,
+            'error': f'Parâmetros inválidos. É necessário fornecer "model" e o arquivo; '
+                     f'"format" deve ser um de {", ".join(JOB_FORMATS)} e "column" um inteiro >= 0.'
+        }), 400
+    
+    if model_registry.get(model_id) is None:
+        return jsonify({'success': False, 'error': f'Modelo {model_id} não encontrado.'}), 404
+    
+    filename = upload.filename if upload is not None else params.get('filename', 'documento.txt')
+    chunks = read_stream(upload.stream if upload is not None else request.stream)
+    job = translation_jobs.create(model_id, filename, chunks, job_format, column, use_corrections)
+    print(f"[DEBUG] Tarefa {job['id']} criada: {filename} ({job['input_bytes']} bytes, {job['format']}), modelo {model_id}")
+    return job_response(job, 202)
+
+@app.route('/api/jobs', methods=['GET'])
+def api_list_jobs():
+    """Lista as tarefas de tradução de arquivos"""
+    return jsonify({'success': True, 'jobs': [translation_jobs.public(job) for job in translation_jobs.list()]})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job_status(job_id):
+    """Estado e progresso de uma tarefa"""
+    job = translation_jobs.load(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Tarefa {job_id} não encontrada.'}), 404
+    return job_response(job)
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+def api_job_download(job_id):
+    """Arquivo traduzido de uma tarefa concluída"""
+    job = translation_jobs.load(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Tarefa {job_id} não encontrada.'}), 404
+    if job['status'] != 'completed':
+        return jsonify({
+            'success': False,
+            'error': f"A tarefa ainda não foi concluída (estado: {job['status']}).",
+            'job': translation_jobs.public(job)
+        }), 409
+    return send_file(job['output_path'], mimetype=JOB_MIMETYPES[job['format']], as_attachment=True,
+                     download_name=job['result_filename'])
+
+@app.route('/api/jobs/<job_id>/resume', methods=['POST'])
+def api_job_resume(job_id):
+    """Recoloca na fila uma tarefa que falhou, a partir do último bloco concluído"""
+    job = translation_jobs.requeue(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Tarefa {job_id} não encontrada.'}), 404
+    return job_response(job, 202)
+
 def fallback_translation(text, model_id):
     """Método de fallback para quando o modelo não pode ser carregado ou há erro na tradução"""
     print(f"[DEBUG] Ativando tradução de fallback para o modelo {model_id}")
@@ -929,14 +2670,16 @@ def save_correction():
     # Certificar-se de que o diretório de correções existe
     os.makedirs(CORRECTIONS_DIR, exist_ok=True)
     
-    # Criar um nome de arquivo baseado no timestamp
-    filename = f"{correction['timestamp'].replace(':', '-').replace('.', '-')}.json"
-    filepath = os.path.join(CORRECTIONS_DIR, filename)
+    # ID baseado no timestamp, que também é o nome do arquivo da correção
+    correction_id = correction['timestamp'].replace(':', '-').replace('.', '-')
+    filepath = os.path.join(CORRECTIONS_DIR, f"{correction_id}.json")
     
     try:
-        # Salvar a correção no arquivo
+        # Salvar a correção no arquivo (layout lido por ferramentas externas) e no banco
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(correction, f, ensure_ascii=False, indent=2)
+        correction = corrections_store.add(correction, correction_id)
+        corrections_index.add(correction)
         
         return jsonify({
             'success': True,
@@ -952,72 +2695,55 @@ def save_correction():
 
 @app.route('/api/corrections', methods=['GET'])
 def get_corrections():
-    """Obtém todas as correções salvas"""
+    """Obtém as correções salvas, da mais recente para a mais antiga.
+
+    Sem `limit` nem cursor (`after`/`cursor`) retorna todas, como antes da
+    paginação; com algum deles, uma página e o `next_cursor` da seguinte.
+    """
     try:
-        # Certificar-se de que o diretório de correções existe
-        os.makedirs(CORRECTIONS_DIR, exist_ok=True)
-        
         # Verificar se há filtros
         model_id = request.args.get('model_id')
         source_lang = request.args.get('source_lang')
         target_lang = request.args.get('target_lang')
         since_time = request.args.get('since')  # Timestamp ISO para filtrar por data
+        # next_cursor da página anterior ("cursor" continua aceito como sinônimo)
+        after = request.args.get('after') or request.args.get('cursor')
+        try:
+            if 'limit' in request.args:
+                limit = int(request.args['limit'])
+            else:
+                limit = DEFAULT_PAGE_SIZE if after else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Parâmetro "limit" inválido.'
+            }), 400
         
-        # Obter todos os arquivos de correção
-        corrections = []
-        for filename in os.listdir(CORRECTIONS_DIR):
-            if filename.endswith('.json'):
-                filepath = os.path.join(CORRECTIONS_DIR, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        correction = json.load(f)
-                        
-                        # Adicionar ID para facilitar rastreamento
-                        if 'id' not in correction:
-                            correction['id'] = os.path.splitext(filename)[0]
-                        
-                        # Aplicar filtros, se houver
-                        if model_id and correction.get('modelId') != model_id:
-                            continue
-                        if source_lang and correction.get('sourceLang') != source_lang:
-                            continue 
-                        if target_lang and correction.get('targetLang') != target_lang:
-                            continue
-                        # Filtrar por timestamp, se fornecido
-                        if since_time and correction.get('timestamp', '') <= since_time:
-                            continue
-                            
-                        corrections.append(correction)
-                except Exception as e:
-                    print(f"Erro ao ler correção {filepath}: {e}")
-        
-        # Ordenar por timestamp, do mais recente para o mais antigo
-        corrections.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        # Arquivos JSON colocados no diretório por fora entram no banco antes da consulta
+        corrections_index.refresh(force=True)
         
-        # Obter estatísticas das correções
-        stats = {
-            'total': len(corrections),
-            'models': {},
-            'languages': {}
-        }
+        # Filtros e ordenação executados no banco, usando os índices
+        try:
+            corrections, next_cursor = corrections_store.query(
+                model_id=model_id, source_lang=source_lang, target_lang=target_lang,
+                since=since_time, limit=limit, after=after
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
-        for correction in corrections:
-            # Estatísticas por modelo
-            model_id = correction.get('modelId', 'desconhecido')
-            if model_id not in stats['models']:
-                stats['models'][model_id] = 0
-            stats['models'][model_id] += 1
-            
-            # Estatísticas por idioma
-            lang_pair = f"{correction.get('sourceLang', '?')} → {correction.get('targetLang', '?')}"
-            if lang_pair not in stats['languages']:
-                stats['languages'][lang_pair] = 0
-            stats['languages'][lang_pair] += 1
+        # Estatísticas de todas as correções que atendem aos filtros, não só da página
+        stats = corrections_store.stats(
+            model_id=model_id, source_lang=source_lang, target_lang=target_lang, since=since_time
+        )
         
         return jsonify({
             'success': True,
             'corrections': corrections,
-            'stats': stats
+            'stats': stats,
+            'next_cursor': next_cursor
         })
     except Exception as e:
         print(f"Erro ao obter correções: {e}")
@@ -1026,18 +2752,15 @@ def get_corrections():
             'error': f'Erro ao obter correções: {str(e)}'
         }), 500
 
-import threading
-import time
-
 # Variável global para controlar o thread de auto-ping
 keep_alive_thread = None
 
 # Função de ping para manter servidor ativo
-def ping_server():
+def ping_server(port=5000):
     """Função simples de ping para manter servidor ativo"""
     try:
         import requests
-        response = requests.get('http://localhost:5000/api/status', timeout=5)
+        response = requests.get(f'http://localhost:{port}/api/status', timeout=5)
         return response.status_code == 200
     except:
         return False
@@ -1062,9 +2785,30 @@ def api_status():
         'auto_ping': keep_alive_thread is not None and keep_alive_thread.is_alive(),
         'server': 'Render.com' if is_render else 'Local',
         'working_directory': os.getcwd(),
-        'models_directory': os.path.join(os.path.dirname(__file__), "models")
+        'models_directory': os.path.join(os.path.dirname(__file__), "models"),
+        'batching': {
+            'enabled': BATCHING_ENABLED,
+            'models': {model_id: scheduler.stats() for model_id, scheduler in list(batch_schedulers.items())}
+        },
+        'translation_cache': translation_cache.stats(),
+        'corrections_index': corrections_index.stats(),
+        'usage': usage_stats.stats(),
+        'model_registry': model_registry.stats(),
+        'model_manager': loaded_translators.stats(),
+        'shared_artifacts': shared_artifacts.stats(),
+        'model_reloader': model_reloader.stats(),
+        'translation_jobs': translation_jobs.stats(),
+        'inference_pool': inference_pool.stats() if inference_pool is not None else None,
+        'workers': worker_stats.report() if worker_stats is not None else None,
+        'startup': startup_timer.report()
     })
 
+@app.route('/api/ready', methods=['GET'])
+def api_ready():
+    """Prontidão para o balanceador: 200 só quando todos os modelos pré-carregados estão prontos"""
+    status = model_preloader.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.route('/api/debug/render', methods=['GET'])
 def render_debug():
     """Endpoint para diagnóstico específico do ambiente Render"""
@@ -1106,8 +2850,7 @@ def diagnostic_page():
         # Tentar obter estatísticas do modelo
         try:
             if is_loaded:
-                translator = loaded_translators[model_id]
-                last_used = getattr(translator, 'last_used', 'N/A')
+                last_used = loaded_translators.model_state(model_id).get('last_used', 'N/A')
                 model_stats.append({
                     'id': model_id,
                     'status': 'loaded',
@@ -1136,7 +2879,7 @@ def diagnostic_page():
     try:
         import psutil
         # Obter métricas do sistema
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = sample_cpu_percent()
         memory = psutil.virtual_memory()
         memory_used_mb = round(memory.used / (1024 * 1024), 1)
         
@@ -1160,19 +2903,7 @@ def diagnostic_page():
             temperature = round(45.0 + (cpu_percent / 100) * 25, 1)  # Estimativa baseada em CPU
         
         # Contar traduções do dia atual
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
-        stats_file = os.path.join(os.path.dirname(__file__), 'stats', 'model_usage.json')
-        translations_today = 0
-        
-        if os.path.exists(stats_file):
-            try:
-                with open(stats_file, 'r') as f:
-                    stats = json.load(f)
-                    for model_id, model_stats in stats.items():
-                        if 'daily_usage' in model_stats and today in model_stats['daily_usage']:
-                            translations_today += model_stats['daily_usage'][today]
-            except:
-                pass
+        translations_today = usage_stats.translations_today()
         
         system_info = {
             'cpu_usage': round(cpu_percent, 1),
@@ -1200,7 +2931,7 @@ def get_system_metrics():
         import datetime
         
         # Obter métricas do sistema
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = sample_cpu_percent()
         memory = psutil.virtual_memory()
         memory_used_mb = round(memory.used / (1024 * 1024), 1)
         
@@ -1258,19 +2989,7 @@ def get_system_metrics():
             temperature = round(45.0 + (cpu_percent / 100) * 25, 1)  # Estimativa baseada em CPU
         
         # Contar traduções do dia atual
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
-        stats_file = os.path.join(os.path.dirname(__file__), 'stats', 'model_usage.json')
-        translations_today = 0
-        
-        if os.path.exists(stats_file):
-            try:
-                with open(stats_file, 'r') as f:
-                    stats = json.load(f)
-                    for model_id, model_stats in stats.items():
-                        if 'daily_usage' in model_stats and today in model_stats['daily_usage']:
-                            translations_today += model_stats['daily_usage'][today]
-            except:
-                pass
+        translations_today = usage_stats.translations_today()
         
         return jsonify({
             'success': True,
@@ -1306,15 +3025,24 @@ def get_system_metrics():
             'error': str(e)
         }), 500
 
+def auto_ping_requested():
+    """Auto-ping em produção (Render) ou ativado manualmente com ENABLE_AUTO_PING=true"""
+    is_render = (os.environ.get('RENDER') == 'true' or 
+                 os.environ.get('RUNNING_ON_RENDER') or
+                 os.environ.get('IS_RENDER') or
+                 'render.com' in os.environ.get('HOST', '') or
+                 'onrender.com' in os.environ.get('HOSTNAME', ''))
+    return bool(is_render) or os.environ.get('ENABLE_AUTO_PING') == 'true'
+
 # Função para iniciar thread de auto-ping (manter servidor ativo)
-def start_auto_ping():
+def start_auto_ping(port=5000):
     """Inicia um thread para fazer auto-ping e manter o servidor ativo"""
     def run_ping_loop():
         print("🔄 Iniciando thread de auto-ping para evitar inatividade")
         while True:
             try:
                 # Usar o endpoint de status para ping interno
-                ping_server()
+                ping_server(port)
                 time.sleep(25)  # Intervalo de 25 segundos (menor que o limite de 30s)
             except Exception as e:
                 print(f"Erro no auto-ping: {e}")
@@ -1325,6 +3053,189 @@ def start_auto_ping():
     keep_alive_thread.start()
     print("✅ Thread de auto-ping iniciada com sucesso!")
 
+class WorkerStats:
+    """Requisições e memória de cada worker do modo pre-fork (gunicorn.conf.py).
+
+    A tabela (pid, requisições) fica num mmap anônimo criado no processo
+    mestre antes do fork e, portanto, compartilhado por todos os workers. O
+    mestre atribui uma linha a cada worker em pre_fork; o worker só escreve na
+    sua. A memória de cada processo é lida com psutil na hora do relatório.
+    """
+
+    FIELDS = 2
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.master_pid = os.getpid()
+        self.buffer = mmap.mmap(-1, slots * self.FIELDS * 8)
+        self.table = memoryview(self.buffer).cast('q')
+        self.slot = None
+        self.lock = threading.Lock()
+
+    def claim(self, used_slots):
+        """No mestre: primeira linha livre (zerada) para o worker que vai nascer, ou None"""
+        for slot in range(self.slots):
+            if slot not in used_slots:
+                self.table[slot * self.FIELDS] = 0
+                self.table[slot * self.FIELDS + 1] = 0
+                return slot
+        return None
+
+    def register(self, slot):
+        """No worker, logo após o fork"""
+        self.slot = slot
+        if slot is not None:
+            self.table[slot * self.FIELDS] = os.getpid()
+
+    def release(self, slot):
+        if slot is not None:
+            self.table[slot * self.FIELDS] = 0
+
+    def record(self):
+        if self.slot is not None:
+            with self.lock:
+                self.table[self.slot * self.FIELDS + 1] += 1
+
+    # Campos de /proc/<pid>/smaps_rollup (kB) usados no relatório
+    SMAPS_FIELDS = {'Rss': 'rss', 'Pss': 'pss', 'Pss_File': 'pss_file', 'Anonymous': 'anonymous',
+                    'Private_Clean': 'uss', 'Private_Dirty': 'uss'}
+
+    @classmethod
+    def process_memory(cls, pid):
+        """Memória de um processo em MB: rss, pss, uss, anonymous (páginas anônimas, inclusive as
+        herdadas do mestre) e pss_file (páginas de arquivos, como bibliotecas). Fora do Linux, só rss."""
+        memory = dict.fromkeys(('rss', 'pss', 'uss', 'anonymous', 'pss_file'))
+        try:
+            with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+                for line in f:
+                    name, _, value = line.partition(':')
+                    if name in cls.SMAPS_FIELDS and value.strip().endswith('kB'):
+                        key = cls.SMAPS_FIELDS[name]
+                        memory[key] = (memory[key] or 0) + int(value.split()[0]) / 1024
+        except OSError:
+            import psutil
+            memory['rss'] = psutil.Process(pid).memory_info().rss / (1024 * 1024)
+        return {key: round(value, 1) if value is not None else None for key, value in memory.items()}
+
+    def report(self):
+        """Requisições e memória por worker e a economia em relação a N processos independentes.
+
+        Um processo independente teria uma cópia própria de todas as suas
+        páginas anônimas (os modelos herdados do mestre incluídos) e dividiria
+        as de arquivos (bibliotecas) com os demais: a estimativa é a soma de
+        anonymous + pss_file dos workers. Com o pre-fork, mestre e workers
+        ocupam juntos a soma das PSS.
+        """
+        workers = []
+        for slot in range(self.slots):
+            pid = self.table[slot * self.FIELDS]
+            if not pid:
+                continue
+            entry = {'slot': slot, 'pid': pid, 'requests': self.table[slot * self.FIELDS + 1]}
+            try:
+                entry['memory_mb'] = self.process_memory(pid)
+            except Exception as e:
+                entry['memory_mb'] = None
+                entry['error'] = str(e)
+            workers.append(entry)
+        try:
+            master_memory = self.process_memory(self.master_pid)
+        except Exception:
+            master_memory = None
+        
+        report = {
+            'master_pid': self.master_pid,
+            'current_pid': os.getpid(),
+            'master_memory_mb': master_memory,
+            'workers': workers,
+            'requests': sum(worker['requests'] for worker in workers),
+            'independent_processes_mb': None,
+            'prefork_total_mb': None,
+            'saved_mb': None
+        }
+        memories = [worker['memory_mb'] for worker in workers]
+        complete = all(m and None not in (m['pss'], m['anonymous'], m['pss_file']) for m in memories)
+        if workers and master_memory and master_memory['pss'] is not None and complete:
+            independent = sum(m['anonymous'] + m['pss_file'] for m in memories)
+            total = master_memory['pss'] + sum(m['pss'] for m in memories)
+            report.update(independent_processes_mb=round(independent, 1), prefork_total_mb=round(total, 1),
+                          saved_mb=round(independent - total, 1))
+        return report
+
+# Criado por prepare_prefork no processo mestre do gunicorn; None no servidor de desenvolvimento
+worker_stats = None
+
+@app.after_request
+def count_worker_request(response):
+    if worker_stats is not None:
+        worker_stats.record()
+    return response
+
+def prepare_prefork(workers):
+    """No processo mestre do gunicorn, antes do primeiro fork (hook when_ready de gunicorn.conf.py).
+
+    Carrega e aquece os modelos de pré-carregamento de forma síncrona, para
+    que pesos e tokenizadores sejam herdados copy-on-write pelos workers.
+    Modelos que precisariam do runtime do TensorFlow (Keras, TFLite) não são
+    carregados aqui (ver inference.ForkUnsafeBackendError) e ficam para cada
+    worker. Em seguida para as threads do mestre, para nenhum lock ficar
+    preso no fork, e congela os objetos já alocados (gc.freeze) para a coleta
+    de lixo dos workers não tocar nas páginas herdadas.
+    """
+    global worker_stats
+    import gc
+    import inference
+    
+    worker_stats = WorkerStats(max(2 * workers, 4))
+    model_ids = get_preload_model_ids()
+    # Com o pool de inferência os modelos ficam nos processos do pool de cada worker, iniciado depois do fork
+    if INFERENCE_POOL_WORKERS <= 0:
+        inference.set_prefork_parent(True)
+        try:
+            model_preloader.start(model_ids, wait=True)
+        finally:
+            inference.set_prefork_parent(False)
+    deferred = [model_id for model_id in model_ids if loaded_translators.peek(model_id) is None]
+    shared = [model_id for model_id in model_ids if model_id not in deferred]
+    print(f"[INFO] Pre-fork: {len(shared)} de {len(model_ids)} modelos compartilhados pelos workers: {shared} "
+          f"(RSS do mestre: {process_rss_mb() or 0:.0f} MB)")
+    if not model_ids:
+        print(f"[INFO] ATENÇÃO: pre-fork: nenhum modelo de pré-carregamento (PRELOAD_MODELS / preload_models.json): "
+              f"0 modelos compartilhados, cada um dos {workers} workers carrega a própria cópia de cada modelo usado")
+    elif deferred:
+        print(f"[INFO] ATENÇÃO: pre-fork: {deferred} não puderam ser carregados no mestre e terão uma cópia em cada um "
+              f"dos {workers} workers; use INFERENCE_PATH=numpy com model_numpy.npz extraído "
+              f"(scripts/export_numpy.py) ou WEB_CONCURRENCY=1")
+    
+    for component in (model_reloader, usage_stats):
+        component.stop()
+        if component.thread is not None:
+            component.thread.join(timeout=30)
+    corrections_store.close()
+    gc.collect()
+    gc.freeze()
+    return deferred
+
+def after_fork(slot=None, deferred=()):
+    """No worker, logo após o fork (hook post_fork): recria o que não atravessa o fork"""
+    corrections_store.connect()
+    with batch_schedulers_lock:
+        batch_schedulers.clear()
+    if worker_stats is not None:
+        worker_stats.register(slot)
+    usage_stats.start()
+    model_reloader.start()
+    translation_jobs.start()
+    if deferred:
+        model_preloader.start(list(deferred))
+    # Um só worker faz o auto-ping (o ping passa pelo socket do gunicorn, na porta de PORT)
+    if slot in (None, 0) and auto_ping_requested():
+        print("🔄 Ambiente de produção detectado, ativando auto-ping...")
+        start_auto_ping(int(os.environ.get('PORT', '5000')))
+
+startup_timer.mark('routes')
+startup_timer.finish()
+
 if __name__ == '__main__':
     # Certificar-se de que os diretórios necessários existam
     base_dir = os.path.dirname(__file__)
@@ -1346,15 +3257,15 @@ if __name__ == '__main__':
     for model in models:
         print(f" - {model['display_name']} ({model['id']})")
     
-    # Iniciar thread de auto-ping se estiver no ambiente de produção (Render)
-    is_render = (os.environ.get('RENDER') == 'true' or 
-                 os.environ.get('RUNNING_ON_RENDER') or
-                 os.environ.get('IS_RENDER') or
-                 'render.com' in os.environ.get('HOST', '') or
-                 'onrender.com' in os.environ.get('HOSTNAME', ''))
+    # Pré-carregar modelos e retomar as tarefas de tradução de arquivos em segundo plano;
+    # com o reloader do modo debug só o processo filho (WERKZEUG_RUN_MAIN) atende requisições
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_model_preload()
+        translation_jobs.start()
     
-    # Também pode ser ativado manualmente se necessário
-    if is_render or os.environ.get('ENABLE_AUTO_PING') == 'true':
+    # Iniciar thread de auto-ping se estiver no ambiente de produção (Render);
+    # também pode ser ativado manualmente se necessário (ENABLE_AUTO_PING=true)
+    if auto_ping_requested():
         print("🔄 Ambiente de produção detectado, ativando auto-ping...")
         start_auto_ping()
     
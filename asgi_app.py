@@ -0,0 +1,448 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Servidor assíncrono (ASGI): `uvicorn asgi_app:app` ou `python asgi_app.py`
+
+Atende o mesmo contrato do app Flask num único loop de eventos: conexões
+ociosas ou lentas não ocupam threads, só um pouco de memória no loop. O
+trabalho bloqueante (consultas ao SQLite das correções, carga de modelos,
+inferência sem micro-lotes e as demais rotas do Flask) roda num executor de
+tamanho fixo (ASGI_EXECUTOR_THREADS) com fila limitada (ASGI_MAX_PENDING);
+acima do limite a requisição recebe 503 em vez de acumular memória.
+
+Em /api/translate, com o modelo carregado, o texto entra no escalonador de
+micro-lotes do app e a resposta espera o Future do lote no próprio loop, sem
+segurar uma thread durante a inferência. Os demais casos (correção
+encontrada, modelo ainda não carregado, fallback, parâmetros inválidos) são
+respondidos pela própria view do Flask no executor, com as mesmas respostas.
+/api/models e /api/status também vêm do Flask; /api/status ganha o campo
+`asgi` com os contadores do executor. /api/translate/stream envia cada evento
+SSE assim que o executor o produz, sem bufferizar a resposta. Corpos
+enviados aos poucos (documento em texto puro de /api/translate/stream e
+arquivos de /api/jobs) são lidos no loop: o executor só recebe pedaços que já
+chegaram, e um cliente lento no envio não segura nenhuma thread. O download do
+resultado de /api/jobs passa em blocos pelo disco.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.requests import ClientDisconnect
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import Route
+
+import app as server
+
+# Threads para o trabalho bloqueante e limite de tarefas esperando por elas
+ASGI_EXECUTOR_THREADS = int(os.environ.get('ASGI_EXECUTOR_THREADS', '4'))
+ASGI_MAX_PENDING = int(os.environ.get('ASGI_MAX_PENDING', '64'))
+
+ALL_METHODS = ['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
+
+
+class ExecutorSaturated(RuntimeError):
+    """Fila do executor cheia: a requisição é recusada com 503"""
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor com limite de tarefas em andamento + na fila.
+
+    Usado só a partir do loop de eventos, então os contadores não precisam de lock.
+    """
+
+    def __init__(self, threads=ASGI_EXECUTOR_THREADS, max_pending=ASGI_MAX_PENDING):
+        self.threads = max(1, threads)
+        self.max_pending = max(self.threads, max_pending)
+        self.pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="asgi")
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorSaturated(f"{self.pending} tarefas aguardando o executor")
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            'threads': self.threads,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'peak_pending': self.peak_pending,
+            'completed': self.completed,
+            'rejected': self.rejected
+        }
+
+
+executor = BoundedExecutor()
+
+# Requisições sendo atendidas pelo loop (inclui as que esperam o lote ou o executor)
+requests_in_flight = {'current': 0, 'peak': 0, 'total': 0, 'fast_path': 0}
+
+
+def busy_response():
+    return JSONResponse({
+        'success': False,
+        'error': 'Servidor ocupado. Tente novamente em instantes.'
+    }, status_code=503, headers={'Retry-After': '1'})
+
+
+def wsgi_environ(scope, body):
+    """Environ WSGI de uma requisição ASGI (para repassá-la ao app Flask)"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for raw_name, raw_value in scope['headers']:
+        name, value = raw_name.decode('latin-1'), raw_value.decode('latin-1')
+        if name == 'content-length':
+            continue
+        key = 'CONTENT_TYPE' if name == 'content-type' else 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def call_flask(environ):
+    """Executa a requisição no app Flask (no executor); retorna (status, cabeçalhos, corpo)"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    result = server.app(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return started['status'], started['headers'], body
+
+
+async def delegate(request, body=None):
+    """Responde pela view do Flask, no executor"""
+    if body is None:
+        body = await request.body()
+    try:
+        status, headers, content = await executor.run(call_flask, wsgi_environ(request.scope, body))
+    except ExecutorSaturated:
+        return busy_response()
+    response = Response(content, status_code=status)
+    response.raw_headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    return response
+
+
+def start_translation(text, model_id, use_corrections):
+    """Parte bloqueante de /api/translate no caminho rápido (no executor).
+
+    Retorna (translator, tradução do cache ou None, Future do lote ou None, início),
+    ou None quando a view do Flask deve responder.
+    """
+    if use_corrections and server.find_correction(text, model_id):
+        return None
+    if server.render_env and model_id == "english-snejag-translator":
+        return None
+    translator = server.loaded_translators.get(model_id)
+    if translator is None:
+        return None
+    translate_start = time.perf_counter()
+    cached = server.translation_cache.get(model_id, translator.fingerprint, text)
+    if cached is not None:
+        return translator, cached, None, translate_start
+    scheduler = server.get_batch_scheduler(model_id, translator) if server.BATCHING_ENABLED else None
+    future = scheduler.enqueue(text) if scheduler is not None else None
+    if future is None:
+        return None
+    return translator, None, future, translate_start
+
+
+async def api_translate(request):
+    """/api/translate: espera o lote no loop; os demais casos vão para a view do Flask"""
+    body = await request.body()
+    try:
+        data = json.loads(body)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or not isinstance(data.get('text'), str) or 'model' not in data:
+        return await delegate(request, body)
+
+    text = data['text']
+    model_id = data['model']
+    try:
+        started = await executor.run(start_translation, text, model_id, data.get('use_corrections', True))
+    except ExecutorSaturated:
+        return busy_response()
+    if started is None:
+        return await delegate(request, body)
+
+    translator, translated_text, future, translate_start = started
+    from_cache = future is None
+    if future is not None:
+        try:
+            translated_text = await asyncio.wrap_future(future)
+        except Exception as e:
+            server.usage_stats.record(model_id, False, (time.perf_counter() - translate_start) * 1000)
+            try:
+                payload = await executor.run(server.translation_error, model_id, text, e)
+            except ExecutorSaturated:
+                return busy_response()
+            return JSONResponse(payload, status_code=500)
+        server.translation_cache.put(model_id, translator.fingerprint, text, translated_text)
+
+    server.usage_stats.record(model_id, True, (time.perf_counter() - translate_start) * 1000)
+    server.startup_timer.milestone('first_response')
+    requests_in_flight['fast_path'] += 1
+    return JSONResponse(server.translation_result(translator, translated_text, from_cache))
+
+
+class EventStreamResponse:
+    """Resposta SSE de um DocumentStream do app: cada evento é produzido no executor e enviado assim que fica pronto.
+
+    Com texto puro o corpo é lido aqui, no loop, e o executor só recebe pedaços
+    que já chegaram: um cliente lento no envio não segura nenhuma thread. A
+    leitura do corpo percebe a desconexão; depois dela (e com JSON, cujo corpo
+    já foi lido) a tradução para quando o cliente desconecta.
+    """
+
+    def __init__(self, request, stream, chunks=None):
+        self.request = request
+        self.stream = stream
+        # Pedaços do texto já na memória (JSON) ou None para ler o corpo da requisição
+        self.chunks = chunks
+
+    async def send_event(self, send, event):
+        await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+
+    async def send_events(self, send, events, check_disconnect):
+        """Envia os eventos de um gerador do DocumentStream; False se a resposta deve terminar"""
+        while True:
+            if check_disconnect and await self.request.is_disconnected():
+                return False
+            try:
+                event = await executor.run(next, events, None)
+            except ExecutorSaturated:
+                await self.send_event(send, server.sse_event('error', {
+                    'success': False,
+                    'error': 'Servidor ocupado. Tente novamente em instantes.'
+                }))
+                return False
+            if event is None:
+                return not self.stream.failed
+            await self.send_event(send, event)
+
+    async def send_document(self, send):
+        if self.chunks is not None:
+            for chunk in self.chunks:
+                if not await self.send_events(send, self.stream.feed(chunk), check_disconnect=True):
+                    return False
+            return True
+        try:
+            async for chunk in self.request.stream():
+                if chunk and not await self.send_events(send, self.stream.feed(chunk), check_disconnect=False):
+                    return False
+        except ClientDisconnect:
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no')
+        ]})
+        await self.send_event(send, self.stream.start())
+        if await self.send_document(send):
+            await self.send_events(send, self.stream.finish(), check_disconnect=True)
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+async def api_translate_stream(request):
+    """/api/translate/stream: eventos SSE gerados no executor, um por vez, sem bufferizar a resposta"""
+    content_type = request.headers.get('content-type', '')
+    if content_type.split(';', 1)[0].strip() == 'application/json':
+        body = await request.body()
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict) or not isinstance(data.get('text'), str) or not data.get('model'):
+            return await delegate(request, body)
+        model_id = data['model']
+        use_corrections = data.get('use_corrections', True)
+        chunks = server.text_chunks(data['text'])
+        encoding = None
+    else:
+        model_id = request.query_params.get('model')
+        if not model_id:
+            return await delegate(request, b'')
+        use_corrections = request.query_params.get('use_corrections', 'true').lower() != 'false'
+        chunks = None
+        encoding = 'utf-8'
+        for param in content_type.split(';')[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                encoding = value.strip('"')
+
+    try:
+        translator = await executor.run(server.get_or_load_translator, model_id)
+    except ExecutorSaturated:
+        return busy_response()
+    if not translator:
+        return JSONResponse({'success': False, 'error': f'Erro ao carregar modelo {model_id}.'}, status_code=500)
+    stream = server.DocumentStream(model_id, translator, use_corrections, encoding)
+    return EventStreamResponse(request, stream, chunks)
+
+
+async def spool_body(request, path):
+    """Grava o corpo da requisição em `path` conforme chega, lendo no loop (nenhuma thread espera pelo cliente)"""
+    with open(path, 'wb') as f:
+        async for chunk in request.stream():
+            f.write(chunk)
+
+
+async def api_create_job(request):
+    """POST /api/jobs com o arquivo no corpo: gravado em disco conforme chega, sem bufferizar o upload.
+
+    Só o arquivo completo vai para o executor. Formulários multipart e parâmetros
+    inválidos são respondidos pela view do Flask.
+    """
+    params = request.query_params
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith('multipart/form-data') or not params.get('model'):
+        return await delegate(request)
+    job_format = params.get('format') or None
+    column = params.get('column', '0')
+    if not column.isdigit() or (job_format is not None and job_format not in server.JOB_FORMATS):
+        return await delegate(request, b'')
+    try:
+        # O catálogo pode revarrer a pasta de modelos: fora do loop
+        model = await executor.run(server.model_registry.get, params['model'])
+    except ExecutorSaturated:
+        return busy_response()
+    if model is None:
+        return await delegate(request, b'')
+
+    upload_path = server.translation_jobs.upload_path()
+    try:
+        await spool_body(request, upload_path)
+        job = await executor.run(functools.partial(
+            server.translation_jobs.create, params['model'], params.get('filename', 'documento.txt'),
+            fmt=job_format, column=int(column),
+            use_corrections=params.get('use_corrections', 'true').lower() != 'false',
+            input_file=upload_path))
+    except ExecutorSaturated:
+        return busy_response()
+    except ClientDisconnect:
+        return Response(status_code=400)
+    finally:
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+    return JSONResponse({
+        'success': True,
+        'job': server.translation_jobs.public(job),
+        'status_url': f"/api/jobs/{job['id']}",
+        'download_url': f"/api/jobs/{job['id']}/download"
+    }, status_code=202)
+
+
+async def api_job_download(request):
+    """Arquivo traduzido enviado em blocos direto do disco; tarefas inexistentes ou não concluídas vão para o Flask"""
+    try:
+        job = await executor.run(server.translation_jobs.load, request.path_params['job_id'])
+    except ExecutorSaturated:
+        return busy_response()
+    if job is None or job['status'] != 'completed':
+        return await delegate(request, b'')
+    return FileResponse(job['output_path'], media_type=server.JOB_MIMETYPES[job['format']],
+                        filename=job['result_filename'])
+
+
+async def api_status(request):
+    """/api/status do Flask, acrescido dos contadores do servidor assíncrono"""
+    response = await delegate(request, b'')
+    if response.status_code != 200:
+        return response
+    payload = json.loads(response.body)
+    payload['asgi'] = {
+        'executor': executor.stats(),
+        'requests': dict(requests_in_flight)
+    }
+    return JSONResponse(payload)
+
+
+async def api_models(request):
+    return await delegate(request)
+
+
+@asynccontextmanager
+async def lifespan(application):
+    server.start_model_preload()
+    server.translation_jobs.start()
+    print(f"[INFO] Servidor ASGI: executor com {executor.threads} threads, até {executor.max_pending} tarefas")
+    yield
+    executor.shutdown()
+
+
+starlette_app = Starlette(routes=[
+    Route('/api/translate', api_translate, methods=['POST']),
+    Route('/api/translate/stream', api_translate_stream, methods=['POST']),
+    Route('/api/jobs', api_create_job, methods=['POST']),
+    Route('/api/jobs/{job_id}/download', api_job_download, methods=['GET']),
+    Route('/api/models', api_models, methods=['GET']),
+    Route('/api/status', api_status, methods=['GET']),
+    # Demais rotas (páginas, correções, lotes, gerenciamento de modelos): app Flask
+    Route('/{path:path}', delegate, methods=ALL_METHODS)
+], lifespan=lifespan)
+
+
+async def app(scope, receive, send):
+    """Aplicação ASGI: conta as requisições em andamento e repassa ao Starlette"""
+    if scope['type'] != 'http':
+        return await starlette_app(scope, receive, send)
+    requests_in_flight['current'] += 1
+    requests_in_flight['total'] += 1
+    requests_in_flight['peak'] = max(requests_in_flight['peak'], requests_in_flight['current'])
+    try:
+        await starlette_app(scope, receive, send)
+    finally:
+        requests_in_flight['current'] -= 1
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', '5000')))
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Armazenamento das correções de tradução em SQLite
+
+Substitui a leitura de todos os arquivos JSON de corrections/ a cada consulta:
+os filtros de GET /api/corrections viram consultas indexadas, a paginação é
+por cursor e as estatísticas são calculadas com GROUP BY no banco.
+"""
+
+import os
+import json
+import base64
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS corrections (
+    id TEXT PRIMARY KEY,
+    model_id TEXT NOT NULL DEFAULT '',
+    source_text TEXT NOT NULL DEFAULT '',
+    source_key TEXT NOT NULL DEFAULT '',
+    original_translation TEXT NOT NULL DEFAULT '',
+    corrected_translation TEXT NOT NULL DEFAULT '',
+    source_lang TEXT NOT NULL DEFAULT '',
+    target_lang TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_corrections_model_ts ON corrections (model_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_corrections_langs_ts ON corrections (source_lang, target_lang, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_corrections_ts ON corrections (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_corrections_lookup ON corrections (model_id, source_key, timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Tamanho de página padrão e máximo de GET /api/corrections
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(timestamp, correction_id):
+    """Cursor opaco apontando para a última correção de uma página"""
+    raw = json.dumps([timestamp, correction_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        timestamp, correction_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(timestamp), str(correction_id)
+    except Exception:
+        raise ValueError(f"Cursor inválido: {cursor}")
+
+
+def move_database(old_path, new_path):
+    """Move um banco (com os arquivos -wal e -shm) para o novo local, se lá ainda não houver um"""
+    if not os.path.exists(old_path) or os.path.exists(new_path) or os.path.abspath(old_path) == os.path.abspath(new_path):
+        return False
+    os.makedirs(os.path.dirname(os.path.abspath(new_path)), exist_ok=True)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(old_path + suffix):
+            os.replace(old_path + suffix, new_path + suffix)
+    print(f"[INFO] Banco de correções movido de {old_path} para {new_path}")
+    return True
+
+
+class CorrectionsStore:
+    """Correções persistidas num banco SQLite com índices por modelo, idiomas e timestamp"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = None
+        self.connect()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+            self.connection.commit()
+
+    def connect(self):
+        """Abre a conexão do processo atual (uma conexão SQLite não pode atravessar um fork)"""
+        with self.lock:
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.connection.row_factory = sqlite3.Row
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    @staticmethod
+    def _row_values(correction_id, correction):
+        return (
+            correction_id,
+            correction.get('modelId') or '',
+            correction.get('sourceText') or '',
+            (correction.get('sourceText') or '').strip(),
+            correction.get('originalTranslation') or '',
+            correction.get('correctedTranslation') or '',
+            correction.get('sourceLang') or '',
+            correction.get('targetLang') or '',
+            correction.get('timestamp') or '',
+            json.dumps(correction, ensure_ascii=False)
+        )
+
+    def add(self, correction, correction_id):
+        """Grava uma correção; o id também é guardado dentro do JSON retornado pela API"""
+        correction = dict(correction, id=correction_id)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO corrections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._row_values(correction_id, correction)
+            )
+            self.connection.commit()
+        return correction
+
+    def import_directory(self, directory):
+        """Importa os arquivos JSON (layout antigo, um arquivo por correção) ainda não presentes.
+
+        O id de cada correção é o nome do arquivo sem extensão, de modo que a
+        importação é idempotente e só lê arquivos novos.
+        """
+        if not os.path.isdir(directory):
+            return 0
+        with self.lock:
+            known_ids = {row[0] for row in self.connection.execute("SELECT id FROM corrections")}
+        rows = []
+        for filename in os.listdir(directory):
+            if not filename.endswith('.json'):
+                continue
+            correction_id = os.path.splitext(filename)[0]
+            if correction_id in known_ids:
+                continue
+            filepath = os.path.join(directory, filename)
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    correction = json.load(f)
+                correction.setdefault('id', correction_id)
+                rows.append(self._row_values(correction_id, correction))
+            except Exception as e:
+                print(f"Erro ao importar correção {filepath}: {e}")
+        if rows:
+            with self.lock:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO corrections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                self.connection.commit()
+        return len(rows)
+
+    def migrate_directory(self, directory):
+        """Migração única do diretório de arquivos JSON para o banco"""
+        if self.get_meta('migrated_from_files'):
+            return 0
+        imported = self.import_directory(directory)
+        self.set_meta('migrated_from_files', str(imported))
+        print(f"[INFO] Correções migradas de {directory} para {self.db_path}: {imported}")
+        return imported
+
+    def get_meta(self, key):
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+            self.connection.commit()
+
+    def data_version(self):
+        """Muda quando outra conexão (outro processo) grava no banco"""
+        with self.lock:
+            return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def count(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM corrections").fetchone()[0]
+
+    def rows_since(self, rowid=0):
+        """Correções gravadas depois de `rowid` (o rowid de uma linha regravada também muda).
+
+        Retorna (correções em ordem de timestamp, maior rowid visto).
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT rowid, data FROM corrections WHERE rowid > ? ORDER BY timestamp, id", (rowid,)
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows], max((row[0] for row in rows), default=rowid)
+
+    @staticmethod
+    def _filters(model_id=None, source_lang=None, target_lang=None, since=None):
+        clauses, params = [], []
+        if model_id:
+            clauses.append("model_id = ?")
+            params.append(model_id)
+        if source_lang:
+            clauses.append("source_lang = ?")
+            params.append(source_lang)
+        if target_lang:
+            clauses.append("target_lang = ?")
+            params.append(target_lang)
+        if since:
+            clauses.append("timestamp > ?")
+            params.append(since)
+        return clauses, params
+
+    def query(self, model_id=None, source_lang=None, target_lang=None, since=None, limit=DEFAULT_PAGE_SIZE, after=None):
+        """Uma página de correções, da mais recente para a mais antiga.
+
+        Com `limit=None` retorna todas as correções que atendem aos filtros.
+        Retorna (correções, próximo cursor ou None).
+        """
+        clauses, params = self._filters(model_id, source_lang, target_lang, since)
+        if after:
+            after_timestamp, after_id = decode_cursor(after)
+            clauses.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([after_timestamp, after_timestamp, after_id])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT id, timestamp, data FROM corrections {where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        has_more = limit is not None and len(rows) > limit
+        rows = rows[:limit]
+        corrections = [json.loads(row['data']) for row in rows]
+        next_cursor = encode_cursor(rows[-1]['timestamp'], rows[-1]['id']) if has_more else None
+        return corrections, next_cursor
+
+    def stats(self, model_id=None, source_lang=None, target_lang=None, since=None):
+        """Totais por modelo e por par de idiomas para os mesmos filtros da consulta"""
+        clauses, params = self._filters(model_id, source_lang, target_lang, since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.lock:
+            total = self.connection.execute(f"SELECT COUNT(*) FROM corrections {where}", params).fetchone()[0]
+            by_model = self.connection.execute(
+                f"SELECT model_id, COUNT(*) FROM corrections {where} GROUP BY model_id", params
+            ).fetchall()
+            by_language = self.connection.execute(
+                f"SELECT source_lang, target_lang, COUNT(*) FROM corrections {where} GROUP BY source_lang, target_lang",
+                params
+            ).fetchall()
+        return {
+            'total': total,
+            'models': {(row[0] or 'desconhecido'): row[1] for row in by_model},
+            'languages': {f"{row[0] or '?'} → {row[1] or '?'}": row[2] for row in by_language}
+        }
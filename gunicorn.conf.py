@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Configuração do gunicorn para produção (modo pre-fork): `gunicorn app:app`
+
+O app é importado e os modelos de pré-carregamento (PRELOAD_MODELS ou
+preload_models.json) são carregados e aquecidos no processo mestre, antes do
+fork, de modo que pesos e tokenizadores são compartilhados copy-on-write
+pelos workers. Só modelos que carregam sem o runtime do TensorFlow (caminho
+"numpy" com model_numpy.npz extraído) ficam no mestre; os demais são
+carregados por cada worker depois do fork, uma cópia por worker; por isso o
+caminho de inferência padrão aqui é "numpy" (extraia os pesos antes com
+scripts/export_numpy.py). Requisições e memória de cada worker, e a economia
+em relação a N processos independentes, ficam em /api/status → workers.
+"""
+
+import os
+import multiprocessing
+
+# O motor NumPy é o único caminho carregado no mestre e compartilhado pelos workers;
+# com o padrão "compiled" (Keras) cada worker teria a própria cópia de cada modelo
+os.environ.setdefault('INFERENCE_PATH', 'numpy')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+# Threads de atendimento por worker; requisições simultâneas do mesmo modelo
+# são agrupadas pelo escalonador de micro-lotes
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+preload_app = True
+
+# Threads de inferência por worker (NumPy/BLAS, TensorFlow e TFLite): por padrão
+# os núcleos divididos entre os workers, para os workers não disputarem a CPU.
+# Definidas antes da importação do app, pois as bibliotecas as leem ao carregar.
+inference_threads = os.environ.get('INFERENCE_THREADS') or str(max(1, multiprocessing.cpu_count() // max(1, workers)))
+for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                 'TF_NUM_INTRAOP_THREADS', 'TFLITE_THREADS'):
+    os.environ.setdefault(variable, inference_threads)
+os.environ.setdefault('TF_NUM_INTEROP_THREADS', '1')
+
+# Modelos que o mestre não pôde carregar (preenchido em when_ready)
+deferred_models = []
+
+
+def when_ready(server):
+    import app
+    deferred_models.extend(app.prepare_prefork(workers))
+    server.log.info("Pre-fork: %s workers x %s threads, %s threads de inferência por worker",
+                    workers, threads, inference_threads)
+
+
+def pre_fork(server, worker):
+    import app
+    used_slots = {getattr(w, 'stats_slot', None) for w in server.WORKERS.values()}
+    worker.stats_slot = app.worker_stats.claim(used_slots)
+
+
+def post_fork(server, worker):
+    import app
+    app.after_fork(worker.stats_slot, deferred_models)
+
+
+def post_worker_init(worker):
+    import app
+    memory = app.worker_stats.process_memory(os.getpid())
+    worker.log.info("Worker %s pronto: RSS %s MB, PSS %s MB, USS %s MB",
+                    os.getpid(), memory['rss'], memory['pss'], memory['uss'])
+    report = app.worker_stats.report()
+    if len(report['workers']) == workers and report['saved_mb'] is not None:
+        worker.log.info("Memória: %s MB com pre-fork (PSS do mestre + workers) x %s MB para %s processos "
+                        "independentes: %s MB poupados",
+                        report['prefork_total_mb'], report['independent_processes_mb'], workers, report['saved_mb'])
+
+
+def child_exit(server, worker):
+    import app
+    app.worker_stats.release(getattr(worker, 'stats_slot', None))
@@ -1,36 +1,546 @@
 import os
+import re
 import json
 import argparse
 import numpy as np
 import string
+import hashlib
+import time
+import threading
+import queue
+import weakref
 
-# Usando importações do Keras diretamente ao invés de via TensorFlow
-from keras.models import load_model
-from keras.preprocessing.text import tokenizer_from_json
-from keras.preprocessing.sequence import pad_sequences
+from numpy_engine import (NUMPY_WEIGHTS_FILENAME, EQUIVALENCE_TOLERANCE, NumpyModel, UnsupportedModelError,
+                          max_difference)
+
+# Caminhos de inferência suportados: função compilada (grafo rastreado), model.predict,
+# interpretador TFLite ou motor NumPy (numpy_engine.py)
+INFERENCE_PATHS = ("compiled", "predict", "tflite", "numpy")
+DEFAULT_INFERENCE_PATH = "compiled"
+
+# Keras e TensorFlow só são importados quando o primeiro modelo Keras é carregado (ver import_keras)
+keras_import_ms = None
+keras_import_lock = threading.Lock()
+
+def import_keras():
+    """Importa o Keras (e com ele o TensorFlow) na primeira vez em que é necessário.
+
+    Importar este módulo não custa o TensorFlow: processos que só atendem
+    endpoints sem modelo, ou que usam o motor NumPy com pesos já extraídos,
+    nunca pagam a importação. O tempo da primeira importação fica em
+    `keras_import_ms`.
+    """
+    global keras_import_ms
+    check_fork_safe("Keras/TensorFlow")
+    with keras_import_lock:
+        if keras_import_ms is None:
+            start_time = time.perf_counter()
+            import keras
+            import tensorflow as tf
+            keras_import_ms = (time.perf_counter() - start_time) * 1000
+            print(f"[INFO] TensorFlow {tf.__version__} / Keras {keras.__version__} importados em {keras_import_ms:.0f} ms")
+    import keras
+    return keras
+
+# Modo pre-fork (gunicorn.conf.py): o processo mestre carrega os modelos antes do fork, mas o
+# runtime do TensorFlow (Keras e TFLite) não sobrevive ao fork: um worker que o herda já
+# inicializado trava na primeira operação. Com prefork_parent ligado essas cargas falham
+# com ForkUnsafeBackendError e ficam para cada worker, depois do fork.
+prefork_parent = False
+
+class ForkUnsafeBackendError(RuntimeError):
+    """Carga que inicializaria o runtime do TensorFlow pedida no processo mestre do modo pre-fork"""
+
+def set_prefork_parent(value):
+    global prefork_parent
+    prefork_parent = bool(value)
+
+def check_fork_safe(backend):
+    if prefork_parent:
+        raise ForkUnsafeBackendError(f"{backend} não é carregado no processo mestre do modo pre-fork "
+                                     f"(o runtime do TensorFlow não sobrevive ao fork)")
+
+def keras_import_status():
+    """Se o Keras/TensorFlow já foi importado por import_keras e quanto tempo levou"""
+    return {'imported': keras_import_ms is not None,
+            'import_ms': round(keras_import_ms, 1) if keras_import_ms is not None else None}
+
+# Variantes TFLite geradas por scripts/export_tflite.py ao lado do model.keras
+TFLITE_QUANTIZATIONS = ("float32", "float16", "int8")
+DEFAULT_TFLITE_QUANTIZATION = "float32"
+
+def tflite_model_filename(quantization):
+    return f"model_{quantization}.tflite"
+
+# Tamanhos de lote pré-rastreados para o caminho compilado
+DEFAULT_BATCH_BUCKETS = (1, 8, 32)
+
+# Comprimentos de padding usados no modo de buckets de comprimento (além de max_source_len)
+DEFAULT_LENGTH_BUCKETS = (8, 16, 32)
+
+# Pontuação removida por clean_sentence; a tabela é construída uma única vez
+PUNCTUATION = string.punctuation + "!" + '?'
+PUNCTUATION_TABLE = str.maketrans('', '', PUNCTUATION)
 
 def clean_sentence(sentence):
     """Limpa a sentença removendo pontuações e convertendo para minúsculas"""
-    lower_case_sent = sentence.lower()
-    string_punctuation = string.punctuation + "!" + '?'
-    clean_sentence = lower_case_sent.translate(str.maketrans('', '', string_punctuation))
-    return clean_sentence
+    return sentence.lower().translate(PUNCTUATION_TABLE)
+
+# Fim de frase: pontuação final (com aspas/parênteses de fechamento) seguida de espaço, ou quebra de linha
+SENTENCE_BOUNDARY = re.compile(r'[.!?…]+["\'”’»)\]]*\s+|\n+')
+# Tamanho máximo do texto acumulado sem fim de frase antes de cortar num espaço
+MAX_SENTENCE_CHARS = 4096
+
+class SentenceSplitter:
+    """Divide em frases um texto que chega em pedaços (str), sem juntá-lo inteiro na memória.
+
+    `feed` recebe o próximo pedaço e retorna as frases que ficaram completas;
+    `close` retorna o resto. Só o trecho depois do último fim de frase fica no
+    buffer; um trecho que passa de `max_chars` sem fim de frase é cortado no
+    último espaço.
+    """
+
+    def __init__(self, max_chars=MAX_SENTENCE_CHARS):
+        self.max_chars = max_chars
+        self.buffer = ""
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        sentences = []
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(self.buffer):
+            # Um fim de frase no fim do buffer pode continuar no próximo pedaço ("...", "?!")
+            if match.end() == len(self.buffer):
+                break
+            sentence = self.buffer[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        while len(self.buffer) > self.max_chars:
+            cut = self.buffer.rfind(" ", 0, self.max_chars)
+            cut = cut if cut > 0 else self.max_chars
+            sentence = self.buffer[:cut].strip()
+            if sentence:
+                sentences.append(sentence)
+            self.buffer = self.buffer[cut:]
+        return sentences
+
+    def close(self):
+        sentences = [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(self.buffer) if sentence.strip()]
+        self.buffer = ""
+        return sentences
+
+def iter_sentences(chunks, max_chars=MAX_SENTENCE_CHARS):
+    """Frases de um texto que chega em pedaços (str), na ordem (ver SentenceSplitter)"""
+    splitter = SentenceSplitter(max_chars)
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+class CompiledSourceTokenizer:
+    """Tokenizador de origem pré-compilado a partir do Tokenizer do Keras.
+
+    Equivale a `clean_sentence` + `texts_to_sequences` + `pad_sequences(padding="post")`,
+    mas com uma única tabela de tradução (remove a pontuação e troca os demais
+    filtros pelo separador), um único split e consultas num dicionário plano.
+    Os ids são escritos direto num buffer int32 pré-alocado por thread, que é
+    reutilizado na próxima chamada da mesma thread.
+    """
+
+    def __init__(self, word_index, max_len, filters='', lower=True, split=' ', num_words=None, oov_token=None):
+        self.max_len = max_len
+        self.lower = lower
+        self.split = split
+        
+        # Pontuação é apagada (clean_sentence); os demais filtros viram separador (Keras)
+        mapping = {char: None for char in PUNCTUATION}
+        mapping.update({char: split for char in filters if char not in PUNCTUATION})
+        self.table = str.maketrans(mapping)
+        
+        # Dicionário plano já com o corte de num_words e o token OOV aplicados
+        self.oov_index = word_index.get(oov_token) if oov_token is not None else None
+        self.lookup = {}
+        for word, idx in word_index.items():
+            if num_words and idx >= num_words:
+                if self.oov_index is not None:
+                    self.lookup[word] = self.oov_index
+            else:
+                self.lookup[word] = idx
+        
+        self._local = threading.local()
+
+    @classmethod
+    def from_keras(cls, tokenizer, max_len):
+        """Cria o tokenizador compilado a partir de um Tokenizer do Keras (word-level)"""
+        if tokenizer.char_level or getattr(tokenizer, "analyzer", None) is not None:
+            raise ValueError("Tokenizer char_level ou com analyzer customizado não é suportado")
+        return cls(tokenizer.word_index, max_len, filters=tokenizer.filters, lower=tokenizer.lower,
+                   split=tokenizer.split, num_words=tokenizer.num_words, oov_token=tokenizer.oov_token)
+
+    def tokenize(self, text):
+        """Converte um texto bruto na lista de ids (sem padding)"""
+        words = text.lower().translate(self.table).split(self.split)
+        lookup = self.lookup
+        if self.oov_index is None:
+            return [lookup[word] for word in words if word in lookup]
+        return [lookup.get(word, self.oov_index) for word in words if word]
+
+    def _buffer(self, rows):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or len(buffer) < rows:
+            capacity = max(rows, 2 * len(buffer) if buffer is not None else 8)
+            buffer = np.zeros((capacity, self.max_len, 1), dtype=np.int32)
+            self._local.buffer = buffer
+        return buffer
+
+    def encode_batch(self, texts):
+        """Tokeniza e preenche os textos num array (batch, max_len, 1) int32.
+
+        Como `pad_sequences`, sequências longas mantêm os últimos `max_len` ids.
+        """
+        padded = self._buffer(len(texts))[:len(texts)]
+        padded.fill(0)
+        for row, text in enumerate(texts):
+            ids = self.tokenize(text)[-self.max_len:]
+            if ids:
+                padded[row, :len(ids), 0] = ids
+        return padded
+
+# Arquivos que definem um modelo; o fingerprint muda se qualquer um deles mudar
+MODEL_ARTIFACTS = ("model.keras", "config.json", "source_tokenizer.json", "target_tokenizer.json")
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hash SHA-256 do conteúdo de um arquivo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def artifact_hashes(model_path):
+    """SHA-256 de cada artefato existente de um diretório de modelo"""
+    hashes = {}
+    for artifact in MODEL_ARTIFACTS:
+        artifact_path = os.path.join(model_path, artifact)
+        if os.path.exists(artifact_path):
+            hashes[artifact] = file_sha256(artifact_path)
+    return hashes
+
+def model_fingerprint(model_path, hashes=None):
+    """Fingerprint de um diretório de modelo: hash dos hashes de seus artefatos"""
+    if hashes is None:
+        hashes = artifact_hashes(model_path)
+    digest = hashlib.sha256()
+    # Artefatos extras (ex.: o .tflite em uso) entram depois, em ordem alfabética
+    extras = tuple(sorted(set(hashes) - set(MODEL_ARTIFACTS)))
+    for artifact in MODEL_ARTIFACTS + extras:
+        if artifact in hashes:
+            digest.update(f"{artifact}:{hashes[artifact]}\n".encode())
+    return digest.hexdigest()[:16]
+
+class SharedArtifacts:
+    """Objetos carregados compartilhados entre Translators, endereçados pelo conteúdo.
+
+    A chave inclui o SHA-256 do arquivo de origem, então diretórios de modelo
+    diferentes (revisões publicadas lado a lado) com pesos ou tokenizadores
+    idênticos usam o mesmo objeto em memória. As referências são fracas: o
+    objeto é liberado quando o último Translator que o usa é descarregado.
+    Cada chave tem seu próprio lock, para que dois modelos diferentes possam
+    carregar em paralelo sem que o mesmo artefato seja carregado duas vezes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        self.objects = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key, factory):
+        """Retorna (objeto, reutilizado); `factory` só é chamada se o objeto não existir"""
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            obj = self.objects.get(key)
+            if obj is not None:
+                with self.lock:
+                    self.hits += 1
+                return obj, True
+            obj = factory()
+            self.objects[key] = obj
+            with self.lock:
+                self.misses += 1
+            return obj, False
+
+    def stats(self):
+        with self.lock:
+            keys = list(self.objects.keys())
+            return {
+                'entries': len(keys),
+                'by_kind': {kind: sum(1 for key in keys if key[0] == kind) for kind in {key[0] for key in keys}},
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+# Cache de artefatos compartilhado por todos os Translators do processo
+shared_artifacts = SharedArtifacts()
+
+def build_index_to_words(word_index):
+    """Constrói o vocabulário inverso (índice -> palavra) como array NumPy.
+
+    O índice 0 é reservado para o padding e mapeia para uma string vazia.
+    """
+    index_to_words = np.full(max(word_index.values(), default=0) + 1, '', dtype=object)
+    for word, idx in word_index.items():
+        index_to_words[idx] = word
+    return index_to_words
+
+# Versão do formato do artefato compacto de tokenizador (.npz gerado ao lado do .json)
+TOKENIZER_ARTIFACT_VERSION = 2
+
+def tokenizer_artifact_path(json_path):
+    return os.path.splitext(json_path)[0] + ".npz"
+
+class TokenizerArtifact:
+    """Forma compacta de um Tokenizer do Keras, só com o que a inferência usa.
+
+    Guarda filtros, `lower`, `split`, `num_words`, `oov_token` e o `word_index`
+    num `.npz` gerado ao lado do `.json`: as palavras ficam concatenadas num
+    único bloco UTF-8 com as posições em que cada uma termina (um array de
+    strings de largura fixa ocuparia o tamanho da maior palavra por entrada),
+    e o vocabulário inverso é reconstruído na carga com `build_index_to_words`,
+    o mesmo array `object` de um tokenizador lido do JSON. O artefato registra o SHA-256 do `.json` de
+    origem e é regenerado quando ele muda. Carregar o `.npz` evita a
+    decodificação dupla do JSON e o `tokenizer_from_json`, que também
+    decodifica `word_counts`, `word_docs` e `index_docs`, nunca usados aqui.
+    """
+
+    def __init__(self, word_index, filters='', lower=True, split=' ', num_words=None, oov_token=None,
+                 char_level=False):
+        self.word_index = word_index
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.char_level = char_level
+        self.analyzer = None
+        self.index_to_words = build_index_to_words(word_index)
+
+    @classmethod
+    def from_json_file(cls, json_path):
+        """Lê o tokenizador salvo pelo Keras (JSON possivelmente codificado duas vezes)"""
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, str):
+            data = json.loads(data)
+        config = data.get("config", data)
+        word_index = config.get("word_index", {})
+        if isinstance(word_index, str):
+            word_index = json.loads(word_index)
+        return cls(word_index, filters=config.get("filters", ''), lower=config.get("lower", True),
+                   split=config.get("split", ' '), num_words=config.get("num_words"),
+                   oov_token=config.get("oov_token"), char_level=config.get("char_level", False))
+
+    def save(self, path, source_sha256):
+        words = list(self.word_index.keys())
+        # Grava num arquivo temporário e troca, para leitores concorrentes nunca verem um .npz parcial
+        temp_path = f"{path}.tmp.npz"
+        np.savez(temp_path,
+                 version=np.int32(TOKENIZER_ARTIFACT_VERSION),
+                 source_sha256=np.str_(source_sha256),
+                 vocabulary=np.frombuffer(''.join(words).encode('utf-8'), dtype=np.uint8),
+                 word_ends=np.cumsum([len(word) for word in words], dtype=np.int64),
+                 indices=np.array([self.word_index[word] for word in words], dtype=np.int32),
+                 filters=np.str_(self.filters),
+                 lower=np.bool_(self.lower),
+                 split=np.str_(self.split),
+                 num_words=np.int64(self.num_words if self.num_words is not None else -1),
+                 oov_token=np.str_(self.oov_token or ''),
+                 has_oov_token=np.bool_(self.oov_token is not None),
+                 char_level=np.bool_(self.char_level))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, source_sha256=None):
+        """Carrega o artefato; retorna None se ele for de outra versão ou de outro .json"""
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != TOKENIZER_ARTIFACT_VERSION:
+                return None
+            if source_sha256 is not None and str(data["source_sha256"]) != source_sha256:
+                return None
+            num_words = int(data["num_words"])
+            vocabulary = data["vocabulary"].tobytes().decode('utf-8')
+            word_ends = data["word_ends"].tolist()
+            words = [vocabulary[start:end] for start, end in zip([0] + word_ends[:-1], word_ends)]
+            return cls(dict(zip(words, data["indices"].tolist())),
+                       filters=str(data["filters"]), lower=bool(data["lower"]), split=str(data["split"]),
+                       num_words=num_words if num_words >= 0 else None,
+                       oov_token=str(data["oov_token"]) if bool(data["has_oov_token"]) else None,
+                       char_level=bool(data["char_level"]))
+
+    @classmethod
+    def load_or_build(cls, json_path, source_sha256=None):
+        """Usa o .npz ao lado do .json se estiver atualizado; senão o gera a partir do .json.
+
+        Retorna (artefato, gerado_agora). Se o diretório não aceitar escrita o
+        artefato é usado só em memória.
+        """
+        artifact_path = tokenizer_artifact_path(json_path)
+        if source_sha256 is None:
+            source_sha256 = file_sha256(json_path)
+        if os.path.exists(artifact_path):
+            try:
+                artifact = cls.load(artifact_path, source_sha256)
+                if artifact is not None:
+                    return artifact, False
+                print(f"[DEBUG] Artefato de tokenizador desatualizado, regenerando: {artifact_path}")
+            except Exception as e:
+                print(f"[DEBUG] Artefato de tokenizador inválido, regenerando: {artifact_path} ({e})")
+        artifact = cls.from_json_file(json_path)
+        try:
+            artifact.save(artifact_path, source_sha256)
+            print(f"[DEBUG] Artefato de tokenizador gerado: {artifact_path}")
+        except OSError as e:
+            print(f"[DEBUG] Não foi possível gravar o artefato de tokenizador {artifact_path}: {e}")
+        return artifact, True
+
+def decode_predictions(predictions, index_to_words):
+    """Converte um lote de logits (batch, passos, vocabulário) em sentenças.
+
+    Faz um único argmax para todo o lote e um único `take` por linha; os
+    tokens de padding (índice 0) são descartados por máscara, sem laço em
+    Python por token.
+    """
+    predictions = np.asarray(predictions)
+    if predictions.ndim == 2:
+        predictions = predictions[np.newaxis]
+    
+    return decode_token_ids(np.argmax(predictions, axis=-1), index_to_words)
+
+def decode_token_ids(token_ids, index_to_words):
+    """Converte um lote de ids (batch, passos), já com o argmax aplicado, em sentenças"""
+    not_padding = token_ids != 0
+    return [' '.join(index_to_words.take(row[mask])) for row, mask in zip(token_ids, not_padding)]
 
 def logits_to_sentence(logits, tokenizer):
-    """Converte logits para texto usando o tokenizador"""
-    index_to_words = {idx: word for word, idx in tokenizer.word_index.items()}
-    index_to_words[0] = '' 
-    return ' '.join([index_to_words[prediction] for prediction in np.argmax(logits, 1)])
+    """Converte logits para texto usando o tokenizador
+
+    Mantida por compatibilidade; o Translator usa `decode_predictions` com o
+    vocabulário inverso pré-computado em `load_model`.
+    """
+    return decode_predictions(logits, build_index_to_words(tokenizer.word_index))[0]
+
+def load_tflite_interpreter_class():
+    """Interpreter do tflite_runtime (leve, indicado no Raspberry Pi) ou, na falta dele, do TensorFlow"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+class TFLiteRunner:
+    """Executa um modelo TFLite com um pool de interpretadores.
+
+    Um interpretador não pode ser usado por duas threads ao mesmo tempo; cada
+    chamada pega um do pool (bloqueando se todos estiverem ocupados). Como no
+    caminho compilado, o lote é completado até o bucket de lote mais próximo,
+    para que o tensor de entrada só seja realocado quando o bucket muda.
+    """
+
+    def __init__(self, model_file, num_threads=None, pool_size=1, batch_buckets=DEFAULT_BATCH_BUCKETS):
+        check_fork_safe("TFLite")
+        Interpreter = load_tflite_interpreter_class()
+        self.model_file = model_file
+        self.num_threads = num_threads
+        self.batch_buckets = tuple(sorted(batch_buckets))
+        self.pool = queue.Queue()
+        for _ in range(max(1, pool_size)):
+            interpreter = Interpreter(model_path=model_file, num_threads=num_threads)
+            input_details = interpreter.get_input_details()[0]
+            self.input_dtype = input_details["dtype"]
+            self.input_rank = len(input_details["shape"])
+            self.pool.put({
+                "interpreter": interpreter,
+                "input_index": input_details["index"],
+                "output_index": interpreter.get_output_details()[0]["index"],
+                "batch": None
+            })
+        self.pool_size = self.pool.qsize()
+
+    def _invoke(self, chunk):
+        entry = self.pool.get()
+        try:
+            interpreter = entry["interpreter"]
+            if entry["batch"] != chunk.shape[0]:
+                interpreter.resize_tensor_input(entry["input_index"], list(chunk.shape))
+                interpreter.allocate_tensors()
+                entry["batch"] = chunk.shape[0]
+            interpreter.set_tensor(entry["input_index"], chunk)
+            interpreter.invoke()
+            return interpreter.get_tensor(entry["output_index"]).copy()
+        finally:
+            self.pool.put(entry)
+
+    def run(self, padded):
+        """Uma passada sobre um lote (batch, max_source_len, 1)"""
+        inputs = padded.reshape(padded.shape[:self.input_rank]).astype(self.input_dtype)
+        largest_bucket = self.batch_buckets[-1]
+        outputs = []
+        for start in range(0, len(inputs), largest_bucket):
+            chunk = inputs[start:start + largest_bucket]
+            rows = len(chunk)
+            bucket = next(b for b in self.batch_buckets if b >= rows)
+            if bucket > rows:
+                chunk = np.concatenate([chunk, np.zeros((bucket - rows,) + chunk.shape[1:], dtype=chunk.dtype)])
+            outputs.append(self._invoke(np.ascontiguousarray(chunk))[:rows])
+        return np.concatenate(outputs) if len(outputs) > 1 else outputs[0]
 
 class Translator:
-    def __init__(self, model_path):
+    def __init__(self, model_path, inference_path=None, length_bucketing=None, tflite_quantization=None,
+                 inference_pool=None):
         self.model_path = model_path
+        # Caminho de inferência escolhido explicitamente; se None, vem do config.json
+        # do modelo (chave "inference_path"), da variável INFERENCE_PATH ou do padrão
+        self.requested_inference_path = inference_path
+        self.inference_path = None
+        self.batch_buckets = DEFAULT_BATCH_BUCKETS
+        self.compiled_functions = {}
+        self._compiled_input_dtype = np.float32
+        # Padding por buckets de comprimento (config "length_bucketing" ou LENGTH_BUCKETING):
+        # True/"true" só em modelos que mascaram o padding, "force" em qualquer modelo
+        self.requested_length_bucketing = length_bucketing
+        self.length_bucketing = False
+        self.length_buckets = ()
+        # Backend TFLite (inference_path "tflite"): variante em config "tflite_quantization" ou TFLITE_QUANTIZATION
+        self.requested_tflite_quantization = tflite_quantization
+        self.tflite_runner = None
+        self.tflite_model_file = None
+        # Motor NumPy (inference_path "numpy"): com os pesos já extraídos o modelo Keras nem é carregado
+        self.numpy_model = None
+        # Pool de processos de inferência (inference_pool.py): o modelo fica nos processos do pool e
+        # aqui só os tokenizadores; as passadas do modelo são despachadas com pool_key
+        self.inference_pool = inference_pool
+        self.pool_key = None
+        self.pool_finalizer = None
+        self.inference_model = None
+        self.full_output_len = None
+        self.output_tied_to_input = False
+        self.warmup_time_ms = None
+        self.fingerprint = None
         self.model = None
         self.source_tokenizer = None
+        self.compiled_source_tokenizer = None
         self.target_tokenizer = None
         self.config = {}
         self.max_source_len = 0
         self.max_target_len = 0
+        self.index_to_words = None
+        self.tokenizer_load_ms = None
+        self.artifact_hashes = {}
+        self.shared_artifacts = []
 
     def load_model(self):
         try:
@@ -56,35 +566,6 @@ class Translator:
             else:
                 print(f"[DEBUG] Arquivo do modelo encontrado: {model_file} (tamanho: {os.path.getsize(model_file)} bytes)")
             
-            print(f"[DEBUG] Tentando carregar o modelo com Keras...")
-            try:
-                # Verificar versão do Keras
-                import keras
-                print(f"[DEBUG] Versão do Keras: {keras.__version__}")
-                
-                # Tentar carregar com diferentes configurações
-                try:
-                    self.model = load_model(model_file)
-                    print(f"[DEBUG] Modelo carregado com sucesso usando método padrão!")
-                except Exception as e1:
-                    print(f"[DEBUG] Erro ao carregar modelo com método padrão: {str(e1)}")
-                    print(f"[DEBUG] Tentando método alternativo de carregamento...")
-                    
-                    try:
-                        # Tentar com opções alternativas para diferentes versões do Keras
-                        import tensorflow as tf
-                        print(f"[DEBUG] Versão do TensorFlow: {tf.__version__}")
-                        
-                        # Tentar com compile=False
-                        self.model = load_model(model_file, compile=False)
-                        print(f"[DEBUG] Modelo carregado com sucesso usando compile=False!")
-                    except Exception as e2:
-                        print(f"[DEBUG] Erro ao tentar carregar com método alternativo: {str(e2)}")
-                        raise e1
-            except Exception as e:
-                print(f"[DEBUG] ERRO ao carregar modelo com Keras: {str(e)}")
-                raise
-            
             # Carregar configuração
             config_file = os.path.join(self.model_path, "config.json")
             if not os.path.exists(config_file):
@@ -112,6 +593,20 @@ class Translator:
             self.target_language = self.config.get("target_language", "")
             print(f"[DEBUG] Configuração extraída: source_len={self.max_source_len}, target_len={self.max_target_len}, source={self.source_language}, target={self.target_language}")
             
+            # Hash dos artefatos: identifica pesos e tokenizadores idênticos já carregados por outro modelo
+            self.artifact_hashes = artifact_hashes(self.model_path)
+            
+            # No caminho NumPy, pesos já extraídos e atualizados dispensam o carregamento do Keras
+            self.inference_path = self._resolve_inference_path()
+            if self.inference_path == "numpy" and self.inference_pool is None:
+                self.numpy_model = self._load_numpy_weights()
+            if self.numpy_model is None and self.inference_pool is None:
+                self.model, reused = shared_artifacts.get_or_create(
+                    ("model", self.artifact_hashes["model.keras"]), lambda: self._load_keras_model(model_file))
+                if reused:
+                    self.shared_artifacts.append("model.keras")
+                    print(f"[DEBUG] Pesos idênticos já carregados por outro modelo; reutilizando a instância")
+            
             # Carregar tokenizadores
             source_tokenizer_file = os.path.join(self.model_path, "source_tokenizer.json")
             target_tokenizer_file = os.path.join(self.model_path, "target_tokenizer.json")
@@ -129,72 +624,491 @@ class Translator:
             else:
                 print(f"[DEBUG] Arquivo do tokenizador de destino encontrado: {target_tokenizer_file}")
             
-            # Carregar e corrigir tokenizadores (se necessário)
+            # Carregar tokenizadores a partir do artefato compacto (.npz), gerado a partir do JSON se preciso
             try:
+                tokenizer_start = time.perf_counter()
                 print(f"[DEBUG] Carregando tokenizador de origem...")
-                with open(source_tokenizer_file, 'r') as f:
-                    source_tokenizer_data = json.load(f)
-                    print(f"[DEBUG] Tipo de dados do tokenizador de origem: {type(source_tokenizer_data)}")
-                    # Verificar se o JSON está dentro de outro JSON (correção para casos especiais)
-                    if isinstance(source_tokenizer_data, str):
-                        print(f"[DEBUG] Convertendo tokenizador de origem de string para objeto...")
-                        source_tokenizer_data = json.loads(source_tokenizer_data)
-                    self.source_tokenizer = tokenizer_from_json(json.dumps(source_tokenizer_data))
-                    print(f"[DEBUG] Tokenizador de origem carregado com sucesso!")
-            except json.JSONDecodeError as e:
-                print(f"[DEBUG] ERRO ao decodificar o JSON do tokenizador de origem: {str(e)}")
-                raise
-            except Exception as e:
-                print(f"[DEBUG] ERRO ao carregar tokenizador de origem: {str(e)}")
-                raise
-            
-            try:
+                source_sha256 = self.artifact_hashes["source_tokenizer.json"]
+                self.source_tokenizer, built = self._shared_tokenizer(source_tokenizer_file, source_sha256)
+                try:
+                    self.compiled_source_tokenizer, reused = shared_artifacts.get_or_create(
+                        ("compiled_source_tokenizer", source_sha256, self.max_source_len),
+                        lambda: CompiledSourceTokenizer.from_keras(self.source_tokenizer, self.max_source_len))
+                except ValueError as e:
+                    # O caminho sem tokenizador compilado usa texts_to_sequences do Tokenizer do Keras
+                    print(f"[DEBUG] Tokenizador compilado indisponível, usando o Tokenizer do Keras: {e}")
+                    self.compiled_source_tokenizer = None
+                    self.source_tokenizer = self._load_keras_tokenizer(source_tokenizer_file)
+                print(f"[DEBUG] Tokenizador de origem carregado com sucesso! (artefato {'gerado' if built else 'reutilizado'})")
+                
                 print(f"[DEBUG] Carregando tokenizador de destino...")
-                with open(target_tokenizer_file, 'r') as f:
-                    target_tokenizer_data = json.load(f)
-                    print(f"[DEBUG] Tipo de dados do tokenizador de destino: {type(target_tokenizer_data)}")
-                    # Verificar se o JSON está dentro de outro JSON (correção para casos especiais)
-                    if isinstance(target_tokenizer_data, str):
-                        print(f"[DEBUG] Convertendo tokenizador de destino de string para objeto...")
-                        target_tokenizer_data = json.loads(target_tokenizer_data)
-                    self.target_tokenizer = tokenizer_from_json(json.dumps(target_tokenizer_data))
-                    print(f"[DEBUG] Tokenizador de destino carregado com sucesso!")
+                self.target_tokenizer, built = self._shared_tokenizer(target_tokenizer_file, self.artifact_hashes["target_tokenizer.json"])
+                self.index_to_words = self.target_tokenizer.index_to_words
+                self.tokenizer_load_ms = (time.perf_counter() - tokenizer_start) * 1000
+                print(f"[DEBUG] Tokenizador de destino carregado com sucesso! (artefato {'gerado' if built else 'reutilizado'}, vocabulário inverso: {len(self.index_to_words)} entradas)")
+                print(f"[DEBUG] Tokenizadores carregados em {self.tokenizer_load_ms:.1f} ms")
             except json.JSONDecodeError as e:
-                print(f"[DEBUG] ERRO ao decodificar o JSON do tokenizador de destino: {str(e)}")
+                print(f"[DEBUG] ERRO ao decodificar o JSON do tokenizador: {str(e)}")
                 raise
             except Exception as e:
-                print(f"[DEBUG] ERRO ao carregar tokenizador de destino: {str(e)}")
+                print(f"[DEBUG] ERRO ao carregar tokenizadores: {str(e)}")
                 raise
             
+            # Preparar o caminho de inferência e aquecer o modelo antes da primeira requisição
+            # (com o pool, isso acontece em cada processo do pool)
+            if self.inference_pool is not None:
+                self.pool_key = self.inference_pool.load(self)
+                # A referência no pool acompanha a vida desta instância: depois de uma troca ou
+                # despejo, só é liberada quando o escalonador antigo e as requisições que ainda
+                # seguram a instância terminam (o callback só enfileira; ver release_later)
+                self.pool_finalizer = weakref.finalize(self, self.inference_pool.release_later, self.pool_key)
+                self.pool_finalizer.atexit = False
+            else:
+                self.prepare_inference()
+            
+            # Identificar a versão exata dos artefatos carregados (usado como chave de cache)
+            self.fingerprint = model_fingerprint(self.model_path, self.artifact_hashes)
+            if self.shared_artifacts:
+                print(f"[DEBUG] Artefatos compartilhados com outros modelos: {self.shared_artifacts}")
+            print(f"[DEBUG] Fingerprint do modelo: {self.fingerprint}")
+            
             print(f"[DEBUG] Modelo completamente carregado com sucesso!")
             print(f"Tradutor: {self.source_language} -> {self.target_language}")
             return True
             
+        except ForkUnsafeBackendError:
+            raise
         except Exception as e:
             print(f"[DEBUG] ERRO CRÍTICO ao carregar o modelo: {str(e)}")
             import traceback
             print(f"[DEBUG] Traceback completo: {traceback.format_exc()}")
             raise
 
-    def translate(self, text):
-        if not self.model:
-            raise ValueError("Modelo não carregado. Por favor, carregue o modelo primeiro.")
+    @staticmethod
+    def _load_keras_model(model_file):
+        """Carrega o modelo Keras, tentando compile=False se o carregamento padrão falhar"""
+        print(f"[DEBUG] Tentando carregar o modelo com Keras...")
+        try:
+            # Verificar versão do Keras
+            keras = import_keras()
+            load_model = keras.models.load_model
+            print(f"[DEBUG] Versão do Keras: {keras.__version__}")
+            
+            # Tentar carregar com diferentes configurações
+            try:
+                model = load_model(model_file)
+                print(f"[DEBUG] Modelo carregado com sucesso usando método padrão!")
+            except Exception as e1:
+                print(f"[DEBUG] Erro ao carregar modelo com método padrão: {str(e1)}")
+                print(f"[DEBUG] Tentando método alternativo de carregamento...")
+                
+                try:
+                    # Tentar com opções alternativas para diferentes versões do Keras
+                    import tensorflow as tf
+                    print(f"[DEBUG] Versão do TensorFlow: {tf.__version__}")
+                    
+                    # Tentar com compile=False
+                    model = load_model(model_file, compile=False)
+                    print(f"[DEBUG] Modelo carregado com sucesso usando compile=False!")
+                except Exception as e2:
+                    print(f"[DEBUG] Erro ao tentar carregar com método alternativo: {str(e2)}")
+                    raise e1
+        except Exception as e:
+            print(f"[DEBUG] ERRO ao carregar modelo com Keras: {str(e)}")
+            raise
+        return model
+
+    def _shared_tokenizer(self, tokenizer_file, sha256):
+        """Artefato do tokenizador, reutilizando o de outro modelo com o mesmo JSON.
+
+        Retorna (artefato, gerado_agora).
+        """
+        built = []
+        
+        def build():
+            artifact, was_built = TokenizerArtifact.load_or_build(tokenizer_file, sha256)
+            built.append(was_built)
+            return artifact
+        
+        artifact, reused = shared_artifacts.get_or_create(("tokenizer", sha256), build)
+        if reused:
+            self.shared_artifacts.append(os.path.basename(tokenizer_file))
+        return artifact, bool(built and built[0])
+
+    @staticmethod
+    def _load_keras_tokenizer(tokenizer_file):
+        """Tokenizer completo do Keras a partir do JSON (possivelmente codificado duas vezes)"""
+        import_keras()
+        from keras.preprocessing.text import tokenizer_from_json
+        
+        with open(tokenizer_file, 'r') as f:
+            tokenizer_data = json.load(f)
+        if isinstance(tokenizer_data, str):
+            tokenizer_data = json.loads(tokenizer_data)
+        return tokenizer_from_json(json.dumps(tokenizer_data))
+
+    def _resolve_inference_path(self):
+        inference_path = (self.requested_inference_path
+                          or self.config.get("inference_path")
+                          or os.environ.get("INFERENCE_PATH")
+                          or DEFAULT_INFERENCE_PATH)
+        if inference_path not in INFERENCE_PATHS:
+            print(f"[DEBUG] Caminho de inferência desconhecido '{inference_path}', usando '{DEFAULT_INFERENCE_PATH}'")
+            inference_path = DEFAULT_INFERENCE_PATH
+        return inference_path
+
+    def _load_numpy_weights(self):
+        """Pesos do motor NumPy já extraídos, se existirem e corresponderem ao model.keras atual"""
+        weights_file = os.path.join(self.model_path, NUMPY_WEIGHTS_FILENAME)
+        if not os.path.exists(weights_file):
+            return None
+        model_sha256 = self.artifact_hashes["model.keras"]
+        
+        def load():
+            numpy_model = NumpyModel.load(weights_file, model_sha256)
+            if numpy_model is None:
+                raise ValueError("extraídos de outra versão do model.keras")
+            return numpy_model
+        
+        try:
+            numpy_model, reused = shared_artifacts.get_or_create(("numpy_model", model_sha256), load)
+        except Exception as e:
+            print(f"[DEBUG] Pesos NumPy em {weights_file} não utilizáveis, extraindo de novo do Keras: {e}")
+            return None
+        if reused:
+            self.shared_artifacts.append(NUMPY_WEIGHTS_FILENAME)
+        print(f"[DEBUG] Motor NumPy carregado de {weights_file}, sem carregar o modelo Keras")
+        return numpy_model
+
+    def prepare_inference(self):
+        """Seleciona o caminho de inferência, rastreia as funções compiladas e faz o aquecimento"""
+        self.inference_path = self._resolve_inference_path()
+        self.batch_buckets = tuple(sorted(self.config.get("batch_buckets", DEFAULT_BATCH_BUCKETS)))
+        
+        start_time = time.perf_counter()
+        self.inference_model = self.model
+        self.length_buckets = (self.max_source_len,)
+        
+        if self.inference_path == "tflite":
+            try:
+                self._setup_tflite()
+            except Exception as e:
+                print(f"[DEBUG] Backend TFLite indisponível, usando o caminho compilado: {e}")
+                self.tflite_runner = None
+                self.inference_path = "compiled"
+        
+        if self.inference_path == "numpy":
+            try:
+                self._setup_numpy()
+            except Exception as e:
+                print(f"[DEBUG] Motor NumPy indisponível, usando o caminho compilado do Keras: {e}")
+                self.numpy_model = None
+                self.inference_path = "compiled"
+        
+        # TFLite e NumPy usam a entrada de comprimento fixo: buckets de comprimento só nos caminhos Keras
+        length_bucketing = self._length_bucketing_requested()
+        if self.inference_path in ("compiled", "predict") and length_bucketing:
+            self._setup_length_bucketing(force=length_bucketing == "force")
+        
+        if self.inference_path == "compiled":
+            try:
+                self._build_compiled_functions()
+            except Exception as e:
+                print(f"[DEBUG] Falha ao compilar a função de inferência, usando model.predict: {e}")
+                self.compiled_functions = {}
+                self.inference_path = "predict"
+        
+        if self.inference_path == "predict":
+            # Aquecer o predict (um traço por comprimento) para que a primeira requisição não pague a construção do laço
+            for length in self.length_buckets:
+                self.inference_model.predict(np.zeros((1, length, 1), dtype=np.int32), verbose=0)
+        
+        self.warmup_time_ms = (time.perf_counter() - start_time) * 1000
+        print(f"[DEBUG] Caminho de inferência: {self.inference_path} (aquecimento: {self.warmup_time_ms:.0f} ms, "
+              f"buckets de lote: {self.batch_buckets}, buckets de comprimento: {self.length_buckets})")
+
+    def _setup_tflite(self):
+        """Carrega a variante TFLite escolhida, com o número de threads configurado, e faz o aquecimento"""
+        quantization = (self.requested_tflite_quantization
+                        or self.config.get("tflite_quantization")
+                        or os.environ.get("TFLITE_QUANTIZATION")
+                        or DEFAULT_TFLITE_QUANTIZATION)
+        model_file = os.path.join(self.model_path, tflite_model_filename(quantization))
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(f"{model_file} não encontrado (gere com scripts/export_tflite.py)")
+        threads = self.config.get("tflite_threads") or os.environ.get("TFLITE_THREADS")
+        pool_size = self.config.get("tflite_interpreters") or os.environ.get("TFLITE_INTERPRETERS") or 1
         
-        # Limpar e tokenizar o texto
-        cleaned_text = clean_sentence(text)
-        tokenized = self.source_tokenizer.texts_to_sequences([cleaned_text])
+        self.tflite_runner = TFLiteRunner(model_file, num_threads=int(threads) if threads else None,
+                                          pool_size=int(pool_size), batch_buckets=self.batch_buckets)
+        for bucket in self.batch_buckets:
+            self.tflite_runner.run(np.zeros((bucket, self.max_source_len, 1), dtype=np.int32))
+        self.tflite_model_file = model_file
+        # A variante TFLite em uso também identifica a versão do modelo (chave do cache de traduções)
+        self.artifact_hashes[os.path.basename(model_file)] = file_sha256(model_file)
+        print(f"[DEBUG] Backend TFLite: {os.path.basename(model_file)} (threads: {threads or 'padrão'}, interpretadores: {self.tflite_runner.pool_size})")
+
+    def _setup_numpy(self):
+        """Extrai os pesos do modelo Keras para o motor NumPy, conferindo a equivalência das saídas.
+
+        Os pesos extraídos são gravados em model_numpy.npz, de modo que as
+        próximas cargas não precisam do Keras. Se o modelo já veio do .npz não
+        há nada a fazer.
+        """
+        if self.numpy_model is not None:
+            return
+        model_sha256 = self.artifact_hashes["model.keras"]
+        weights_file = os.path.join(self.model_path, NUMPY_WEIGHTS_FILENAME)
+        
+        def extract():
+            numpy_model = NumpyModel.from_keras(self.model, model_sha256)
+            difference = max_difference(numpy_model, self.model, self.max_source_len)
+            if difference > EQUIVALENCE_TOLERANCE:
+                raise UnsupportedModelError(f"saídas divergem do Keras (diferença máxima {difference:.2e})")
+            print(f"[DEBUG] Motor NumPy equivalente ao Keras (diferença máxima {difference:.2e})")
+            try:
+                numpy_model.save(weights_file)
+                print(f"[DEBUG] Pesos do motor NumPy gravados em {weights_file}")
+            except OSError as e:
+                print(f"[DEBUG] Não foi possível gravar os pesos do motor NumPy {weights_file}: {e}")
+            return numpy_model
+        
+        self.numpy_model, reused = shared_artifacts.get_or_create(("numpy_model", model_sha256), extract)
+        if reused:
+            self.shared_artifacts.append(NUMPY_WEIGHTS_FILENAME)
+
+    def _length_bucketing_requested(self):
+        """False, True ou "force" (habilita mesmo em modelos que não mascaram o padding)"""
+        if self.requested_length_bucketing is not None:
+            value = self.requested_length_bucketing
+        elif "length_bucketing" in self.config:
+            value = self.config["length_bucketing"]
+        else:
+            value = os.environ.get("LENGTH_BUCKETING", "false")
+        if isinstance(value, str):
+            value = value.lower()
+            return "force" if value == "force" else value == "true"
+        return bool(value)
+
+    def _setup_length_bucketing(self, force=False):
+        """Habilita o padding por buckets de comprimento, se a arquitetura aceitar comprimento variável
+        e o modelo mascarar o padding (ou com force=True).
+
+        Caso contrário, volta automaticamente ao padding completo (max_source_len).
+        """
+        # Sem máscara de padding, o estado do codificador depende dos zeros finais e as
+        # traduções divergem do padding completo (ver scripts/inference_benchmark.py)
+        masks_padding = any(getattr(layer, "mask_zero", False) for layer in self.model.layers)
+        if not masks_padding and not force:
+            print("[DEBUG] O modelo não mascara o padding, usando padding completo "
+                  "(length_bucketing \"force\" habilita os buckets mesmo assim)")
+            return
+        
+        buckets = sorted(b for b in self.config.get("length_buckets", DEFAULT_LENGTH_BUCKETS) if 0 < b < self.max_source_len)
+        try:
+            variable_model = self._variable_length_model()
+            full_output = variable_model(np.zeros((1, self.max_source_len, 1), dtype=np.float32), training=False)
+            short_output = variable_model(np.zeros((1, buckets[0] if buckets else self.max_source_len, 1), dtype=np.float32), training=False)
+        except Exception as e:
+            print(f"[DEBUG] Arquitetura não aceita comprimento variável, usando padding completo: {e}")
+            return
+        
+        self.inference_model = variable_model
+        self.length_buckets = tuple(buckets) + (self.max_source_len,)
+        self.full_output_len = int(full_output.shape[1])
+        # Se a saída acompanha o comprimento da entrada, ela é completada de volta ao tamanho total
+        self.output_tied_to_input = int(short_output.shape[1]) != self.full_output_len
+        self.length_bucketing = True
+        if not masks_padding:
+            print("[DEBUG] AVISO: buckets de comprimento forçados num modelo que não mascara o padding; "
+                  "as traduções podem diferir do padding completo")
+
+    def _variable_length_model(self):
+        """Retorna um modelo que aceita (batch, None) reutilizando as camadas (e pesos) do original.
+
+        Só é possível para grafos lineares de entrada única; outros grafos levantam ValueError.
+        """
+        import keras
+        
+        if len(self.model.inputs) != 1 or len(self.model.outputs) != 1:
+            raise ValueError("modelo com múltiplas entradas/saídas")
+        input_shape = tuple(self.model.inputs[0].shape)
+        if input_shape[1] is None:
+            return self.model
+        
+        layers = [layer for layer in self.model.layers if not isinstance(layer, keras.layers.InputLayer)]
+        previous_output = self.model.inputs[0]
+        for layer in layers:
+            if len(layer._inbound_nodes) != 1 or layer.input is not previous_output:
+                raise ValueError(f"grafo não linear na camada {layer.name}")
+            previous_output = layer.output
+        if previous_output is not self.model.outputs[0]:
+            raise ValueError("a última camada não é a saída do modelo")
+        
+        inputs = keras.Input(shape=(None,) + input_shape[2:], dtype=self.model.inputs[0].dtype)
+        outputs = inputs
+        for layer in layers:
+            outputs = layer(outputs)
+        return keras.Model(inputs, outputs, name=f"{self.model.name}_variable_length")
+
+    def _build_compiled_functions(self):
+        """Rastreia uma função de grafo por bucket de tamanho de lote, com assinatura fixa
+        (batch, max_source_len, 1), e executa uma chamada de aquecimento em cada uma.
+
+        Com buckets de comprimento a dimensão temporal fica livre (batch, None, 1), de modo
+        que um único traço por bucket de lote atende todos os comprimentos.
+        """
+        import tensorflow as tf
+        
+        input_dtype = self.model.inputs[0].dtype
+        time_steps = None if self.length_bucketing else self.max_source_len
+        self.compiled_functions = {}
+        for bucket in self.batch_buckets:
+            signature = [tf.TensorSpec((bucket, time_steps, 1), input_dtype)]
+            function = tf.function(self._call_model, input_signature=signature, autograph=False)
+            for length in self.length_buckets:
+                function(np.zeros((bucket, length, 1), dtype=input_dtype.as_numpy_dtype))
+            self.compiled_functions[bucket] = function
+        self._compiled_input_dtype = input_dtype.as_numpy_dtype
+
+    def _call_model(self, inputs):
+        return self.inference_model(inputs, training=False)
+
+    def _run_compiled(self, padded):
+        """Executa o lote nas funções compiladas, completando cada fatia até o bucket mais próximo"""
+        largest_bucket = self.batch_buckets[-1]
+        outputs = []
+        for start in range(0, len(padded), largest_bucket):
+            chunk = padded[start:start + largest_bucket].astype(self._compiled_input_dtype)
+            rows = len(chunk)
+            bucket = next(b for b in self.batch_buckets if b >= rows)
+            if bucket > rows:
+                filler = np.zeros((bucket - rows,) + chunk.shape[1:], dtype=chunk.dtype)
+                chunk = np.concatenate([chunk, filler])
+            outputs.append(self.compiled_functions[bucket](chunk).numpy()[:rows])
+        return np.concatenate(outputs) if len(outputs) > 1 else outputs[0]
+
+    def run_model(self, padded):
+        """Uma passada do modelo sobre um lote já preenchido, no comprimento em que ele chegar.
+
+        O motor NumPy omite o softmax final e devolve logits (mesmo argmax).
+        """
+        if self.inference_path == "numpy" and self.numpy_model is not None:
+            return self.numpy_model.predict(padded, final_softmax=False)
+        if self.inference_path == "tflite" and self.tflite_runner is not None:
+            return self.tflite_runner.run(padded)
+        if self.inference_path == "compiled" and self.compiled_functions:
+            return self._run_compiled(padded)
+        return self.inference_model.predict(padded, batch_size=len(padded), verbose=0)
+
+    def bucket_lengths(self, padded):
+        """Bucket de comprimento de cada linha de um lote preenchido com padding "post" """
+        lengths = np.count_nonzero(padded[:, :, 0], axis=1)
+        return np.asarray(self.length_buckets)[np.searchsorted(self.length_buckets, lengths)]
+
+    def predict_padded(self, padded):
+        """Executa a passada do modelo sobre um lote já preenchido (batch, max_source_len, 1)"""
+        if not self.length_bucketing:
+            return self.run_model(padded)
+        
+        # Agrupar as linhas por bucket e rodar cada grupo no comprimento do bucket
+        row_buckets = self.bucket_lengths(padded)
+        predictions = None
+        for length in np.unique(row_buckets):
+            rows = np.flatnonzero(row_buckets == length)
+            output = self.run_model(padded[rows, :length])
+            if self.output_tied_to_input and output.shape[1] < self.full_output_len:
+                # Completar a saída com zeros (decodificados como padding)
+                output = np.pad(output, ((0, 0), (0, self.full_output_len - output.shape[1]), (0, 0)))
+            if predictions is None:
+                predictions = np.zeros((len(padded),) + output.shape[1:], dtype=output.dtype)
+            predictions[rows] = output
+        return predictions
+
+    def release_pool_model(self):
+        """Libera já a referência desta instância ao modelo no pool de inferência (uma única vez).
+
+        Só para quem é o único dono da instância (benchmark, candidato de recarga
+        descartado); instâncias servidas liberam a referência ao serem coletadas.
+        """
+        if self.pool_finalizer is not None and self.pool_finalizer.detach() is not None:
+            self.inference_pool.unload(self.pool_key)
+
+    def predict_token_ids(self, padded):
+        """Ids previstos (batch, passos) em int32: o argmax da passada do modelo"""
+        return np.argmax(self.predict_padded(padded), axis=-1).astype(np.int32)
+
+    def prepare_batch(self, texts):
+        """Limpa, tokeniza e preenche os textos num array (batch, max_source_len, 1)
+
+        Com o tokenizador compilado o array é um buffer reutilizado pela thread;
+        ele deve ser consumido antes da próxima chamada.
+        """
+        if self.compiled_source_tokenizer is not None:
+            return self.compiled_source_tokenizer.encode_batch(texts)
+        
+        import_keras()
+        from keras.preprocessing.sequence import pad_sequences
+        
+        cleaned_texts = [clean_sentence(text) for text in texts]
+        tokenized = self.source_tokenizer.texts_to_sequences(cleaned_texts)
         
         # Padding
         padded = pad_sequences(tokenized, self.max_source_len, padding="post")
-        padded = padded.reshape(*padded.shape, 1)
+        return padded.reshape(*padded.shape, 1)
+
+    def count_tokens(self, text):
+        """Número de ids que o texto ocupa na entrada do modelo (palavras fora do vocabulário não contam)"""
+        if self.compiled_source_tokenizer is not None:
+            return len(self.compiled_source_tokenizer.tokenize(text))
+        return len(self.source_tokenizer.texts_to_sequences([clean_sentence(text)])[0])
+
+    def split_segments(self, sentences):
+        """Quebra as frases em trechos de até max_source_len ids.
+
+        `pad_sequences` descarta o início de entradas mais longas; aqui a frase
+        é dividida entre palavras, e cada trecho é traduzido por inteiro.
+        """
+        for sentence in sentences:
+            if not self.max_source_len or self.count_tokens(sentence) <= self.max_source_len:
+                yield sentence
+                continue
+            words, used = [], 0
+            for word in sentence.split():
+                tokens = self.count_tokens(word)
+                if words and used + tokens > self.max_source_len:
+                    yield " ".join(words)
+                    words, used = [], 0
+                words.append(word)
+                used += tokens
+            if words:
+                yield " ".join(words)
+
+    def translate(self, text):
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts):
+        """Traduz uma lista de textos com uma única passada do modelo.
+
+        Todas as entradas são limpas, tokenizadas e preenchidas num único array,
+        de modo que N sentenças custam uma chamada ao modelo em vez de N.
+        Os resultados são retornados na mesma ordem das entradas.
+        """
+        if self.model is None and self.numpy_model is None and self.pool_key is None:
+            raise ValueError("Modelo não carregado. Por favor, carregue o modelo primeiro.")
+        
+        if not texts:
+            return []
         
-        # Previsão
-        prediction = self.model.predict(padded)
+        padded = self.prepare_batch(texts)
         
-        # Converter para texto
-        translated_text = logits_to_sentence(prediction[0], self.target_tokenizer)
+        # Previsão (uma única passada para todo o lote), num processo do pool se houver
+        if self.pool_key is not None:
+            return decode_token_ids(self.inference_pool.run(self.pool_key, padded), self.index_to_words)
+        predictions = self.predict_padded(padded)
         
-        return translated_text
+        # Converter todas as linhas para texto de uma vez
+        return decode_predictions(predictions, self.index_to_words)
 
 def main():
     parser = argparse.ArgumentParser(description="Ferramenta de tradução")
@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pool de processos de inferência
+
+As passadas do modelo saem do processo do servidor: cada processo do pool
+carrega os próprios Translators e recebe lotes já tokenizados. O lote
+preenchido (batch, max_source_len, 1) e os ids previstos (batch, passos)
+trafegam por um segmento de memória compartilhada de cada processo; pelo
+socket só passam mensagens pequenas (chave do modelo, formato e dtype). No
+servidor ficam a limpeza, a tokenização, a decodificação e o JSON, que já não
+disputam o GIL com o modelo.
+
+Os processos são iniciados com `python -m inference_pool` (e não com o
+multiprocessing, que reimportaria o app.py como __main__) e falam com o
+servidor por um socketpair herdado. Um processo que morre ou estoura o tempo
+limite é reiniciado, com os mesmos modelos, pela requisição que o encontrou.
+"""
+
+import os
+import sys
+import time
+import socket
+import queue
+import atexit
+import argparse
+import threading
+import subprocess
+from multiprocessing.connection import Connection
+from multiprocessing import shared_memory
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Tamanho do segmento de memória compartilhada de cada processo (entrada + saída de um lote)
+DEFAULT_BUFFER_MB = 8
+# Tempo máximo de uma mensagem (carregar um modelo Keras inclui importar o TensorFlow)
+DEFAULT_TIMEOUT = 120
+# Alinhamento da saída dentro do segmento
+ALIGNMENT = 64
+
+
+class InferenceWorkerError(RuntimeError):
+    """Falha de um processo do pool: erro no modelo, processo encerrado ou tempo limite"""
+
+
+def attach_shared_memory(name):
+    """Abre o segmento criado pelo servidor sem registrá-lo no resource_tracker deste processo
+    (senão ele seria removido quando o processo do pool terminasse)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        from multiprocessing import resource_tracker
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def model_key(translator):
+    """Identifica um modelo no pool: diretório, versão exata dos artefatos e parâmetros pedidos"""
+    return (translator.model_path, translator.artifact_hashes.get("model.keras"),
+            translator.artifact_hashes.get("config.json"), translator.requested_inference_path,
+            translator.requested_length_bucketing, translator.requested_tflite_quantization)
+
+
+class PoolWorker:
+    """Lado do servidor de um processo do pool: processo, conexão, segmento e contadores"""
+
+    def __init__(self, index, buffer_bytes):
+        self.index = index
+        self.segment = shared_memory.SharedMemory(create=True, size=buffer_bytes)
+        self.lock = threading.Lock()
+        self.process = None
+        self.connection = None
+        self.started_at = None
+        self.models = set()
+        # Fila: requisições esperando ou em execução neste processo (atualizado sob o lock do pool)
+        self.queue_depth = 0
+        self.requests = 0
+        self.errors = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+        self.last_error = None
+
+    def start(self):
+        parent_socket, child_socket = socket.socketpair()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "inference_pool", "--fd", str(child_socket.fileno()),
+             "--buffer", self.segment.name],
+            cwd=BASE_DIR, pass_fds=(child_socket.fileno(),),
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [BASE_DIR, os.environ.get("PYTHONPATH")])))
+        )
+        child_socket.close()
+        self.connection = Connection(parent_socket.detach())
+        self.started_at = time.time()
+        self.models = set()
+
+    def stop(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def call(self, message, timeout):
+        """Envia uma mensagem e espera a resposta; InferenceWorkerError se o processo morrer ou demorar"""
+        try:
+            self.connection.send(message)
+            deadline = time.monotonic() + timeout
+            while not self.connection.poll(0.2):
+                if not self.alive():
+                    raise InferenceWorkerError(f"processo {self.process.pid} encerrado (código {self.process.returncode})")
+                if time.monotonic() > deadline:
+                    raise InferenceWorkerError(f"processo {self.process.pid} sem resposta em {timeout} s")
+            reply = self.connection.recv()
+        except (EOFError, OSError) as e:
+            raise InferenceWorkerError(f"conexão com o processo {self.process.pid} perdida: {e}")
+        if reply[0] == "error":
+            raise ValueError(reply[1])
+        return reply[1:]
+
+
+class InferencePool:
+    """Processos de inferência com despacho para o de menor fila.
+
+    `load` registra um modelo (e o carrega em todos os processos), `run`
+    executa um lote e devolve os ids previstos, `unload` descarrega quando a
+    última instância do servidor que usava o modelo é liberada.
+    `release_later` faz o mesmo numa thread do pool, para os finalizadores
+    das instâncias coletadas.
+    """
+
+    def __init__(self, size, buffer_mb=DEFAULT_BUFFER_MB, timeout=DEFAULT_TIMEOUT):
+        self.size = max(1, size)
+        self.buffer_bytes = int(buffer_mb * 1024 * 1024)
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        # Modelos registrados: chave → {"params": ..., "refs": instâncias do servidor que o usam,
+        # "active": lotes em execução, "output_steps": n}; sai dos processos quando os dois chegam a zero
+        self.registered = {}
+        self.workers = [PoolWorker(index, self.buffer_bytes) for index in range(self.size)]
+        self.started_at = time.time()
+        self.closed = False
+        # Referências liberadas por finalizadores (weakref.finalize no Translator), descarregadas pela thread
+        self.releases = queue.SimpleQueue()
+        self.release_thread = threading.Thread(target=self._release_loop, name="inference-pool-release", daemon=True)
+        self.release_thread.start()
+        for worker in self.workers:
+            worker.start()
+        atexit.register(self.close)
+        print(f"[INFO] Pool de inferência: {self.size} processos, {buffer_mb} MB de memória compartilhada cada "
+              f"(pids {[worker.process.pid for worker in self.workers]})")
+
+    def _restart(self, worker, reason):
+        """Reinicia um processo (com o lock dele) e recarrega os modelos registrados"""
+        print(f"[INFO] Reiniciando o processo {worker.index} do pool de inferência: {reason}")
+        worker.stop()
+        worker.restarts += 1
+        worker.last_error = str(reason)
+        worker.start()
+        with self.lock:
+            registered = {key: entry["params"] for key, entry in self.registered.items()}
+        for key, params in registered.items():
+            try:
+                worker.call(("load", key, params), self.timeout)
+                worker.models.add(key)
+            except Exception as e:
+                print(f"[DEBUG] Processo {worker.index} do pool não recarregou {key[0]}: {e}")
+
+    def _call(self, worker, message, retry=True):
+        """Chamada com o lock do processo já obtido; um processo morto é reiniciado e a chamada repetida uma vez"""
+        if not worker.alive():
+            self._restart(worker, f"processo encerrado (código {worker.process.returncode})")
+        try:
+            return worker.call(message, self.timeout)
+        except InferenceWorkerError as e:
+            self._restart(worker, e)
+            if not retry:
+                raise
+            return self._call(worker, message, retry=False)
+
+    def load(self, translator):
+        """Carrega o modelo do Translator em todos os processos; retorna a chave usada em `run`"""
+        key = model_key(translator)
+        params = {
+            "model_path": translator.model_path,
+            "inference_path": translator.requested_inference_path,
+            "length_bucketing": translator.requested_length_bucketing,
+            "tflite_quantization": translator.requested_tflite_quantization,
+            "artifact_hashes": {name: translator.artifact_hashes.get(name) for name in ("model.keras", "config.json")}
+        }
+        with self.lock:
+            entry = self.registered.setdefault(key, {"params": params, "refs": 0, "active": 0, "output_steps": None})
+            entry["refs"] += 1
+
+        results, errors = [None] * self.size, []
+
+        def load_on(worker):
+            with worker.lock:
+                try:
+                    if key not in worker.models:
+                        results[worker.index] = self._call(worker, ("load", key, params))
+                        worker.models.add(key)
+                except Exception as e:
+                    errors.append(f"processo {worker.index}: {e}")
+
+        threads = [threading.Thread(target=load_on, args=(worker,), daemon=True) for worker in self.workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            self.unload(key)
+            raise RuntimeError(f"Falha ao carregar {translator.model_path} no pool de inferência: {'; '.join(errors)}")
+
+        with self.lock:
+            for result in results:
+                if result is not None:
+                    entry["output_steps"], inference_path = result
+                    translator.inference_path = inference_path
+        print(f"[DEBUG] {translator.model_path} carregado nos {self.size} processos do pool "
+              f"(caminho: {translator.inference_path})")
+        return key
+
+    def unload(self, key):
+        """Libera uma referência ao modelo; na última, descarrega dos processos assim que os lotes
+        em execução (de uma instância já trocada pelo recarregamento, por exemplo) terminarem"""
+        with self.lock:
+            entry = self.registered.get(key)
+            if entry is None:
+                return
+            entry["refs"] -= 1
+        self._drop_if_unused(key)
+
+    def release_later(self, key):
+        """Agenda a liberação de uma referência sem obter locks (pode ser chamado por um finalizador
+        no meio de qualquer código, inclusive com os locks do pool já obtidos)"""
+        self.releases.put(key)
+
+    def _release_loop(self):
+        while True:
+            key = self.releases.get()
+            if key is None:
+                return
+            try:
+                self.unload(key)
+            except Exception as e:
+                print(f"[DEBUG] Erro ao liberar {key[0]} no pool de inferência: {e}")
+
+    def _drop_if_unused(self, key):
+        with self.lock:
+            entry = self.registered.get(key)
+            if entry is None or entry["refs"] > 0 or entry["active"] > 0:
+                return
+            self.registered.pop(key)
+        for worker in self.workers:
+            with worker.lock:
+                if key in worker.models and worker.alive():
+                    try:
+                        worker.call(("unload", key), self.timeout)
+                    except Exception as e:
+                        print(f"[DEBUG] Erro ao descarregar {key[0]} do processo {worker.index}: {e}")
+                worker.models.discard(key)
+
+    def _choose_worker(self, key):
+        """Processo com menor fila (na dúvida, um que já tem o modelo carregado)"""
+        with self.lock:
+            worker = min(self.workers, key=lambda w: (w.queue_depth, key not in w.models, w.index))
+            worker.queue_depth += 1
+        return worker
+
+    def run(self, key, padded):
+        """Executa um lote preenchido num processo do pool e devolve os ids previstos (batch, passos)"""
+        if self.closed:
+            raise InferenceWorkerError("pool de inferência encerrado")
+        with self.lock:
+            entry = self.registered.get(key)
+            if entry is None:
+                raise InferenceWorkerError(f"{key[0]} não está carregado no pool de inferência")
+            entry["active"] += 1
+            params, output_steps = entry["params"], entry["output_steps"] or padded.shape[1]
+        try:
+            row_bytes = padded[0].nbytes + output_steps * 4 + 2 * ALIGNMENT
+            rows_per_call = max(1, self.buffer_bytes // row_bytes)
+            outputs = [self._run_chunk(key, params, padded[start:start + rows_per_call])
+                       for start in range(0, len(padded), rows_per_call)]
+        finally:
+            with self.lock:
+                entry["active"] -= 1
+            self._drop_if_unused(key)
+        return np.concatenate(outputs) if len(outputs) > 1 else outputs[0]
+
+    def _run_chunk(self, key, params, chunk):
+        worker = self._choose_worker(key)
+        try:
+            with worker.lock:
+                start_time = time.perf_counter()
+                try:
+                    if key not in worker.models:
+                        self._call(worker, ("load", key, params))
+                        worker.models.add(key)
+                    inputs = np.ndarray(chunk.shape, dtype=chunk.dtype, buffer=worker.segment.buf)
+                    inputs[...] = chunk
+                    del inputs
+                    output_shape, output_offset = self._call(worker, ("run", key, chunk.shape, chunk.dtype.str))
+                    outputs = np.ndarray(output_shape, dtype=np.int32, buffer=worker.segment.buf, offset=output_offset)
+                    result = outputs.copy()
+                    del outputs
+                    worker.requests += 1
+                    return result
+                except Exception as e:
+                    worker.errors += 1
+                    worker.last_error = str(e)
+                    raise
+                finally:
+                    worker.busy_seconds += time.perf_counter() - start_time
+        finally:
+            with self.lock:
+                worker.queue_depth -= 1
+
+    def stats(self):
+        now = time.time()
+        with self.lock:
+            models = {key[0]: entry["refs"] for key, entry in self.registered.items()}
+            workers = []
+            for worker in self.workers:
+                uptime = now - worker.started_at if worker.started_at else 0
+                workers.append({
+                    'index': worker.index,
+                    'pid': worker.process.pid if worker.process else None,
+                    'alive': worker.alive(),
+                    'queue_depth': worker.queue_depth,
+                    'requests': worker.requests,
+                    'errors': worker.errors,
+                    'restarts': worker.restarts,
+                    'busy_seconds': round(worker.busy_seconds, 3),
+                    'utilization': round(worker.busy_seconds / (now - self.started_at), 4) if now > self.started_at else 0,
+                    'uptime_seconds': round(uptime, 1),
+                    'models': len(worker.models),
+                    'last_error': worker.last_error
+                })
+        return {
+            'size': self.size,
+            'buffer_mb': round(self.buffer_bytes / (1024 * 1024), 1),
+            'models': models,
+            'workers': workers
+        }
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.releases.put(None)
+        for worker in self.workers:
+            with worker.lock:
+                worker.stop()
+                worker.segment.close()
+                worker.segment.unlink()
+
+
+def serve(connection, segment):
+    """Laço de um processo do pool: responde a load, unload e run até a conexão fechar"""
+    from inference import Translator, MODEL_ARTIFACTS
+
+    translators = {}
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        command, key = message[0], message[1]
+        try:
+            if command == "load":
+                params = message[2]
+                translator = Translator(params["model_path"], inference_path=params["inference_path"],
+                                        length_bucketing=params["length_bucketing"],
+                                        tflite_quantization=params["tflite_quantization"])
+                translator.load_model()
+                for name, expected in params["artifact_hashes"].items():
+                    if name in MODEL_ARTIFACTS and translator.artifact_hashes.get(name) != expected:
+                        raise ValueError(f"{name} mudou no disco durante o carregamento")
+                sample = np.zeros((1, translator.max_source_len, 1), dtype=np.int32)
+                output_steps = translator.predict_token_ids(sample).shape[1]
+                translators[key] = translator
+                connection.send(("ok", output_steps, translator.inference_path))
+            elif command == "unload":
+                translators.pop(key, None)
+                connection.send(("ok",))
+            elif command == "run":
+                shape, dtype = message[2], np.dtype(message[3])
+                inputs = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+                token_ids = translators[key].predict_token_ids(inputs)
+                del inputs
+                output_offset = aligned(int(np.prod(shape)) * dtype.itemsize)
+                if output_offset + token_ids.nbytes > segment.size:
+                    raise ValueError(f"saída de {token_ids.nbytes} bytes não cabe no segmento de {segment.size} bytes")
+                outputs = np.ndarray(token_ids.shape, dtype=np.int32, buffer=segment.buf, offset=output_offset)
+                outputs[...] = token_ids
+                del outputs
+                connection.send(("ok", token_ids.shape, output_offset))
+            else:
+                raise ValueError(f"comando desconhecido: {command}")
+        except Exception as e:
+            connection.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Processo do pool de inferência (iniciado pelo servidor)")
+    parser.add_argument("--fd", type=int, required=True, help="Descritor do socket herdado do servidor")
+    parser.add_argument("--buffer", required=True, help="Nome do segmento de memória compartilhada")
+    args = parser.parse_args()
+
+    segment = attach_shared_memory(args.buffer)
+    try:
+        serve(Connection(args.fd), segment)
+    finally:
+        segment.close()
+
+
+if __name__ == "__main__":
+    main()
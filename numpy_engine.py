@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Motor de inferência em NumPy para os modelos embedding + LSTM
+
+Os pesos são extraídos do model.keras uma única vez e gravados em
+models/<id>/model_numpy.npz; a partir daí a passada direta (Embedding → LSTM →
+RepeatVector → LSTM → TimeDistributed(Dense) → softmax) roda só com NumPy,
+sem importar o TensorFlow. Este módulo não importa TensorFlow nem Keras: a
+extração recebe um modelo Keras já carregado.
+
+Grafos com camadas ou opções não suportadas levantam UnsupportedModelError e
+o Translator volta ao Keras.
+"""
+
+import os
+import json
+
+import numpy as np
+
+# Versão do formato do arquivo de pesos extraídos
+NUMPY_ENGINE_VERSION = 1
+NUMPY_WEIGHTS_FILENAME = "model_numpy.npz"
+
+# Diferença máxima tolerada entre as probabilidades do NumPy e do Keras
+EQUIVALENCE_TOLERANCE = 1e-4
+
+
+class UnsupportedModelError(ValueError):
+    """O grafo do modelo tem camadas ou opções que o motor NumPy não implementa"""
+
+
+def _sigmoid(x):
+    # Forma via tanh: sem overflow de exp para entradas muito negativas
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _softmax(x):
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "tanh": np.tanh,
+    "sigmoid": _sigmoid,
+    "relu": lambda x: np.maximum(x, 0),
+    "softmax": _softmax,
+}
+
+# Camadas sem efeito na inferência
+IDENTITY_LAYERS = ("Dropout", "SpatialDropout1D", "GaussianNoise", "GaussianDropout")
+
+
+def _activation_name(layer_class, config, key="activation"):
+    name = config.get(key, "linear")
+    if not isinstance(name, str) or name not in ACTIVATIONS:
+        raise UnsupportedModelError(f"{layer_class}: ativação '{name}' não suportada")
+    return name
+
+
+def _layer_spec(class_name, config, weights):
+    """Traduz uma camada Keras (classe, config, pesos) para um passo do motor NumPy"""
+    if class_name == "Embedding":
+        if config.get("mask_zero"):
+            raise UnsupportedModelError("Embedding com mask_zero=True")
+        return {"type": "embedding"}, {"embeddings": weights[0]}
+
+    if class_name == "LSTM":
+        for option in ("return_state", "go_backwards", "stateful", "time_major"):
+            if config.get(option):
+                raise UnsupportedModelError(f"LSTM com {option}=True")
+        spec = {
+            "type": "lstm",
+            "units": int(config["units"]),
+            "return_sequences": bool(config.get("return_sequences")),
+            "activation": _activation_name("LSTM", config),
+            "recurrent_activation": _activation_name("LSTM", config, "recurrent_activation"),
+        }
+        bias = weights[2] if config.get("use_bias", True) else np.zeros(4 * spec["units"], dtype=np.float32)
+        return spec, {"kernel": weights[0], "recurrent_kernel": weights[1], "bias": bias}
+
+    if class_name == "RepeatVector":
+        return {"type": "repeat", "n": int(config["n"])}, {}
+
+    if class_name == "Dense":
+        units = int(config["units"])
+        bias = weights[1] if config.get("use_bias", True) else np.zeros(units, dtype=np.float32)
+        return {"type": "dense", "activation": _activation_name("Dense", config)}, {"kernel": weights[0], "bias": bias}
+
+    if class_name == "TimeDistributed":
+        # TimeDistributed(Dense) equivale à Dense aplicada ao último eixo
+        inner = config.get("layer", {})
+        if inner.get("class_name") != "Dense":
+            raise UnsupportedModelError(f"TimeDistributed({inner.get('class_name')}) não suportado")
+        return _layer_spec("Dense", inner.get("config", {}), weights)
+
+    if class_name == "Activation":
+        return {"type": "activation", "activation": _activation_name("Activation", config)}, {}
+
+    raise UnsupportedModelError(f"camada {class_name} não suportada")
+
+
+class NumpyModel:
+    """Passada direta de um modelo sequencial embedding + LSTM em NumPy.
+
+    Na montagem, a Embedding seguida de LSTM é fundida numa tabela
+    `embeddings @ kernel + bias` (vocabulário x 4·unidades): a projeção de
+    entrada da primeira LSTM vira uma indexação. Numa LSTM alimentada por
+    RepeatVector a projeção de entrada é a mesma em todos os passos e é
+    calculada uma única vez. Só o laço recorrente é feito passo a passo,
+    sempre sobre o lote inteiro.
+    """
+
+    def __init__(self, layers, weights, input_rank=2, source_sha256=""):
+        self.layers = layers
+        self.weights = weights
+        self.input_rank = input_rank
+        self.source_sha256 = source_sha256
+        self._plan = self._build_plan()
+
+    @classmethod
+    def from_keras(cls, model, source_sha256=""):
+        """Extrai a sequência de camadas e os pesos de um modelo Keras já carregado.
+
+        Só grafos lineares de entrada e saída únicas são aceitos; qualquer outra
+        coisa levanta UnsupportedModelError.
+        """
+        if len(model.inputs) != 1 or len(model.outputs) != 1:
+            raise UnsupportedModelError("modelo com múltiplas entradas/saídas")
+
+        layers, weights = [], {}
+        previous_output = model.inputs[0]
+        for layer in model.layers:
+            class_name = layer.__class__.__name__
+            if class_name == "InputLayer":
+                continue
+            if len(layer._inbound_nodes) != 1 or layer.input is not previous_output:
+                raise UnsupportedModelError(f"grafo não linear na camada {layer.name}")
+            previous_output = layer.output
+            if class_name in IDENTITY_LAYERS:
+                continue
+            spec, layer_weights = _layer_spec(class_name, layer.get_config(), layer.get_weights())
+            for name, value in layer_weights.items():
+                weights[f"{len(layers)}/{name}"] = np.asarray(value, dtype=np.float32)
+            layers.append(spec)
+        if previous_output is not model.outputs[0]:
+            raise UnsupportedModelError("a última camada não é a saída do modelo")
+        if not layers or layers[0]["type"] != "embedding":
+            raise UnsupportedModelError("a primeira camada deve ser uma Embedding")
+
+        input_rank = len(model.inputs[0].shape)
+        return cls(layers, weights, input_rank=input_rank, source_sha256=source_sha256)
+
+    def _layer_weights(self, index):
+        prefix = f"{index}/"
+        return {name[len(prefix):]: value for name, value in self.weights.items() if name.startswith(prefix)}
+
+    def _build_plan(self):
+        """Pré-calcula o que não depende da entrada (tabela Embedding+LSTM fundida)"""
+        plan = []
+        index = 0
+        while index < len(self.layers):
+            spec = self.layers[index]
+            weights = self._layer_weights(index)
+            following = self.layers[index + 1] if index + 1 < len(self.layers) else None
+            if spec["type"] == "embedding" and following is not None and following["type"] == "lstm":
+                lstm_weights = self._layer_weights(index + 1)
+                table = weights["embeddings"] @ lstm_weights["kernel"] + lstm_weights["bias"]
+                plan.append(("embedding_lstm", following, {"table": table.astype(np.float32),
+                                                           "recurrent_kernel": lstm_weights["recurrent_kernel"]}))
+                index += 2
+                continue
+            plan.append((spec["type"], spec, weights))
+            index += 1
+        return plan
+
+    @staticmethod
+    def _run_lstm(spec, recurrent_kernel, projected, steps=None):
+        """Laço recorrente da LSTM (portas na ordem do Keras: i, f, c, o).
+
+        `projected` é a projeção de entrada já somada ao bias: (lote, passos, 4·unidades),
+        ou (lote, 4·unidades) repetida `steps` vezes quando a entrada vem de um RepeatVector.
+        """
+        units = spec["units"]
+        activation = ACTIVATIONS[spec["activation"]]
+        recurrent_activation = ACTIVATIONS[spec["recurrent_activation"]]
+        repeated = steps is not None
+        batch = projected.shape[0]
+        steps = steps if repeated else projected.shape[1]
+
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, steps, units), dtype=np.float32) if spec["return_sequences"] else None
+        for step in range(steps):
+            z = (projected if repeated else projected[:, step]) + h @ recurrent_kernel
+            gates = recurrent_activation(z)
+            candidate = activation(z[:, 2 * units:3 * units])
+            c = gates[:, units:2 * units] * c + gates[:, :units] * candidate
+            h = gates[:, 3 * units:] * activation(c)
+            if outputs is not None:
+                outputs[:, step] = h
+        return outputs if outputs is not None else h
+
+    def predict(self, inputs, final_softmax=True):
+        """Probabilidades para um lote de ids (lote, passos) ou (lote, passos, 1).
+
+        Com final_softmax=False um softmax na última camada é omitido e a saída
+        são os logits: o argmax é o mesmo e a decodificação só usa o argmax.
+        """
+        x = np.asarray(inputs)
+        x = x.reshape(x.shape[:self.input_rank])
+        repeat_steps = None
+        last = len(self._plan) - 1
+        for position, (kind, spec, weights) in enumerate(self._plan):
+            activation = spec.get("activation")
+            if not final_softmax and position == last and activation == "softmax":
+                activation = "linear"
+            if kind == "embedding_lstm":
+                x = self._run_lstm(spec, weights["recurrent_kernel"], weights["table"][x.astype(np.int64)])
+            elif kind == "embedding":
+                x = weights["embeddings"][x.astype(np.int64)]
+            elif kind == "repeat":
+                repeat_steps = spec["n"]
+                continue
+            elif kind == "lstm":
+                # Depois de um RepeatVector, x é (lote, unidades): a projeção é feita uma só vez
+                projected = x @ weights["kernel"] + weights["bias"]
+                x = self._run_lstm(spec, weights["recurrent_kernel"], projected, repeat_steps)
+                repeat_steps = None
+                continue
+            if repeat_steps is not None:
+                x = np.repeat(x[:, np.newaxis], repeat_steps, axis=1)
+                repeat_steps = None
+            if kind == "dense":
+                shape = x.shape
+                x = x.reshape(-1, shape[-1]) @ weights["kernel"]
+                x += weights["bias"]
+                x = ACTIVATIONS[activation](x.reshape(shape[:-1] + (x.shape[-1],)))
+            elif kind == "activation":
+                x = ACTIVATIONS[activation](x)
+        if repeat_steps is not None:
+            x = np.repeat(x[:, np.newaxis], repeat_steps, axis=1)
+        return x
+
+    __call__ = predict
+
+    def save(self, path):
+        # Grava num arquivo temporário e troca, para leitores concorrentes nunca verem um .npz parcial
+        temp_path = f"{path}.tmp.npz"
+        np.savez(temp_path,
+                 version=np.int32(NUMPY_ENGINE_VERSION),
+                 source_sha256=np.str_(self.source_sha256),
+                 layers=np.str_(json.dumps(self.layers)),
+                 input_rank=np.int32(self.input_rank),
+                 **{f"weight:{name}": value for name, value in self.weights.items()})
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, source_sha256=None):
+        """Carrega os pesos extraídos; retorna None se forem de outra versão ou de outro model.keras"""
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != NUMPY_ENGINE_VERSION:
+                return None
+            if source_sha256 is not None and str(data["source_sha256"]) != source_sha256:
+                return None
+            weights = {name.split(":", 1)[1]: data[name] for name in data.files if name.startswith("weight:")}
+            return cls(json.loads(str(data["layers"])), weights, input_rank=int(data["input_rank"]),
+                       source_sha256=str(data["source_sha256"]))
+
+
+def sample_inputs(vocab_size, max_len, samples=16, seed=0):
+    """Lote de ids aleatórios com comprimentos variados e padding "post" """
+    rng = np.random.default_rng(seed)
+    inputs = np.zeros((samples, max_len), dtype=np.float32)
+    for row in range(samples):
+        length = rng.integers(1, max(2, min(max_len, 20)))
+        inputs[row, :length] = rng.integers(1, vocab_size, length)
+    return inputs
+
+
+def max_difference(numpy_model, keras_model, max_len, samples=16):
+    """Maior diferença absoluta entre as saídas do NumPy e do Keras em entradas aleatórias"""
+    vocab_size = int(numpy_model.weights["0/embeddings"].shape[0])
+    inputs = sample_inputs(vocab_size, max_len, samples)
+    expected = np.asarray(keras_model(inputs, training=False))
+    return float(np.max(np.abs(numpy_model.predict(inputs) - expected)))
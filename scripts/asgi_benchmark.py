@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de concorrência de conexões: servidor atual (gunicorn gthread,
+gunicorn.conf.py) x servidor assíncrono (uvicorn asgi_app:app)
+
+Para cada servidor e cenário, abre N conexões que ficam presas no servidor
+e, ao mesmo tempo, mede a vazão e a latência de /api/translate com C
+clientes:
+- idle: conexões keep-alive que já fizeram uma requisição e ficam ociosas
+- slow: clientes lentos que enviaram só parte dos cabeçalhos
+Registra quantas conexões continuavam abertas, as threads e a RSS dos
+processos do servidor. O cache de traduções é desligado para toda
+requisição passar pelo modelo.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import datetime
+import threading
+import subprocess
+import http.client
+import urllib.request
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+SERVERS = {
+    "wsgi": lambda port: [sys.executable, "-m", "gunicorn", "app:app"],
+    "asgi": lambda port: [sys.executable, "-m", "uvicorn", "asgi_app:app", "--host", "127.0.0.1",
+                          "--port", str(port), "--no-access-log"]
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def load_texts(path=os.path.join(BASE_DIR, "data", "hau.txt"), limit=64):
+    """Frases em hausa do corpus (segunda coluna), cortadas para o tamanho de uma requisição típica"""
+    texts = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                columns = line.rstrip("\n").split("\t")
+                if len(columns) >= 2 and columns[1].strip():
+                    texts.append(" ".join(columns[1].split()[:12]))
+    return texts[:limit] or ["Sannu duniya", "Yaya kake?", "Na gode"]
+
+
+def wait_ready(base_url, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/ready", timeout=5) as response:
+                if json.loads(response.read())["ready"]:
+                    return True
+        except Exception:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def process_tree_usage(pid):
+    """Threads e RSS (MB) de um processo e dos seus filhos"""
+    import psutil
+
+    root = psutil.Process(pid)
+    processes = [root] + root.children(recursive=True)
+    return {
+        "threads": sum(process.num_threads() for process in processes),
+        "rss_mb": round(sum(process.memory_info().rss for process in processes) / (1024 * 1024), 1)
+    }
+
+
+def open_held_connections(port, count, mode):
+    """Abre as conexões presas: `idle` (keep-alive depois de uma resposta) ou `slow` (cabeçalhos pela metade)"""
+    held = []
+    for _ in range(count):
+        try:
+            sock = socket.create_connection(("127.0.0.1", port), timeout=10)
+            if mode == "idle":
+                sock.sendall(b"GET /api/ready HTTP/1.1\r\nHost: localhost\r\nConnection: keep-alive\r\n\r\n")
+                response = b""
+                while b"\r\n\r\n" not in response:
+                    chunk = sock.recv(4096)
+                    if not chunk:
+                        break
+                    response += chunk
+            else:
+                sock.sendall(b"POST /api/translate HTTP/1.1\r\nHost: localhost\r\n")
+            held.append(sock)
+        except OSError:
+            break
+    return held
+
+
+def count_open(held):
+    """Conexões que o servidor ainda não fechou"""
+    open_count = 0
+    for sock in held:
+        try:
+            sock.setblocking(False)
+            data = sock.recv(65536)
+            # Dados pendentes (resto da resposta) ainda contam como aberta; b"" é o fim da conexão
+            open_count += 1 if data else 0
+        except BlockingIOError:
+            open_count += 1
+        except OSError:
+            pass
+    return open_count
+
+
+class ConnectionBenchmark:
+    def __init__(self, model_id, held, clients, duration, port, env):
+        self.model_id = model_id
+        self.held = held
+        self.clients = clients
+        self.duration = duration
+        self.port = port
+        self.texts = load_texts()
+        self.env = dict(os.environ, PRELOAD_MODELS=model_id, TRANSLATION_CACHE_MAX_ENTRIES="0",
+                        TF_CPP_MIN_LOG_LEVEL="3", PORT=str(port), WEB_CONCURRENCY="1", **env)
+        self.report = {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "cpu_count": os.cpu_count(),
+            "model": model_id,
+            "held_connections": held,
+            "clients": clients,
+            "duration_seconds": duration,
+            "results": {}
+        }
+
+    def run_load(self):
+        """C clientes com conexões keep-alive traduzindo frases do corpus por `duration` segundos"""
+        latencies = []
+        errors = [0]
+        lock = threading.Lock()
+        deadline = time.perf_counter() + self.duration
+
+        def client(index):
+            connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+            request_index = index
+            while time.perf_counter() < deadline:
+                payload = json.dumps({"text": self.texts[request_index % len(self.texts)], "model": self.model_id})
+                request_index += self.clients
+                start = time.perf_counter()
+                try:
+                    connection.request("POST", "/api/translate", body=payload,
+                                       headers={"Content-Type": "application/json"})
+                    response = connection.getresponse()
+                    ok = response.status == 200 and json.loads(response.read()).get("success")
+                except (OSError, http.client.HTTPException, ValueError):
+                    ok = False
+                    connection.close()
+                    connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                with lock:
+                    if ok:
+                        latencies.append(elapsed_ms)
+                    else:
+                        errors[0] += 1
+            connection.close()
+
+        threads = [threading.Thread(target=client, args=(index,), daemon=True) for index in range(self.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        return {
+            "requests": len(latencies),
+            "errors": errors[0],
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p99_ms": round(percentile(latencies, 99), 1)
+        }
+
+    def measure(self, server_name, mode):
+        print(f"\n🔌 {server_name} / {mode}: {self.held} conexões presas, {self.clients} clientes, {self.duration} s")
+        server = subprocess.Popen(SERVERS[server_name](self.port), cwd=BASE_DIR, env=self.env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        base_url = f"http://127.0.0.1:{self.port}"
+        held = []
+        try:
+            if not wait_ready(base_url):
+                raise RuntimeError(f"{server_name} não ficou pronto")
+            held = open_held_connections(self.port, self.held, mode)
+            time.sleep(1)
+            held_at_start = count_open(held)
+            usage_before = process_tree_usage(server.pid)
+            load = self.run_load()
+            usage_after = process_tree_usage(server.pid)
+            held_at_end = count_open(held)
+        finally:
+            for sock in held:
+                sock.close()
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+        result = dict(load, held_opened=len(held), held_at_start=held_at_start, held_at_end=held_at_end,
+                      threads_idle=usage_before["threads"], threads_loaded=usage_after["threads"],
+                      rss_mb=usage_after["rss_mb"])
+        print(f"   {result['rps']} req/s, p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, "
+              f"{result['errors']} erros; conexões abertas {held_at_start} → {held_at_end}; "
+              f"threads {result['threads_loaded']}, RSS {result['rss_mb']} MB")
+        self.report["results"].setdefault(server_name, {})[mode] = result
+        return result
+
+    def compare(self, modes):
+        for mode in modes:
+            for server_name in SERVERS:
+                self.measure(server_name, mode)
+
+    def save_report(self, filename=None):
+        """Salva relatório em arquivo JSON"""
+        if filename is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"asgi_benchmark_{timestamp}.json"
+
+        with open(filename, "w") as f:
+            json.dump(self.report, f, indent=2)
+
+        print(f"\n📄 Relatório salvo em: {filename}")
+        return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conexões presas e vazão: gunicorn gthread x uvicorn (asgi_app)")
+    parser.add_argument("--model", default="hausa-english-translator", help="Modelo pré-carregado e traduzido")
+    parser.add_argument("--held", type=int, default=200, help="Conexões presas durante a medição")
+    parser.add_argument("--clients", type=int, default=16, help="Clientes traduzindo ao mesmo tempo")
+    parser.add_argument("--duration", type=float, default=10, help="Duração da carga em segundos")
+    parser.add_argument("--mode", action="append", choices=["idle", "slow"],
+                        help="Cenário (pode repetir); padrão: idle e slow")
+    parser.add_argument("--threads", type=int, default=4,
+                        help="Threads de atendimento (GUNICORN_THREADS) e do executor (ASGI_EXECUTOR_THREADS)")
+    parser.add_argument("--port", type=int, default=5098, help="Porta dos servidores durante o benchmark")
+    parser.add_argument("--inference-path", help="INFERENCE_PATH dos dois servidores (ex.: numpy)")
+    parser.add_argument("--output", help="Arquivo JSON de saída do relatório")
+    args = parser.parse_args()
+
+    env = {"GUNICORN_THREADS": str(args.threads), "ASGI_EXECUTOR_THREADS": str(args.threads)}
+    if args.inference_path:
+        env["INFERENCE_PATH"] = args.inference_path
+    benchmark = ConnectionBenchmark(args.model, args.held, args.clients, args.duration, args.port, env)
+    benchmark.compare(args.mode or ["idle", "slow"])
+    benchmark.save_report(args.output)
+
+
+if __name__ == "__main__":
+    main()
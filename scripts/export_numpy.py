@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extração dos pesos para o motor NumPy (numpy_engine.py)
+Gera models/<id>/model_numpy.npz ao lado do model.keras original, para que o
+servidor com inference_path "numpy" não precise importar o TensorFlow
+"""
+
+import os
+import sys
+import argparse
+import json
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, BASE_DIR)
+
+from inference import file_sha256
+from numpy_engine import (NUMPY_WEIGHTS_FILENAME, EQUIVALENCE_TOLERANCE, NumpyModel, UnsupportedModelError,
+                          max_difference)
+
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+
+
+def export_model(model_path):
+    """Extrai e confere os pesos de um diretório de modelo; retorna o arquivo gerado ou None"""
+    from keras.models import load_model
+
+    model_file = os.path.join(model_path, "model.keras")
+    with open(os.path.join(model_path, "config.json"), "r") as f:
+        max_len = json.load(f).get("max_source_len")
+
+    print(f"\n📦 {model_path}")
+    try:
+        model = load_model(model_file, compile=False)
+    except Exception as e:
+        print(f"   ❌ Não foi possível carregar {model_file}: {e}")
+        return None
+
+    try:
+        numpy_model = NumpyModel.from_keras(model, file_sha256(model_file))
+    except UnsupportedModelError as e:
+        print(f"   ⚠️ Grafo não suportado pelo motor NumPy (o servidor usará o Keras): {e}")
+        return None
+
+    difference = max_difference(numpy_model, model, max_len)
+    if difference > EQUIVALENCE_TOLERANCE:
+        print(f"   ❌ Saídas divergem do Keras (diferença máxima {difference:.2e} > {EQUIVALENCE_TOLERANCE:.0e})")
+        return None
+
+    output_file = os.path.join(model_path, NUMPY_WEIGHTS_FILENAME)
+    numpy_model.save(output_file)
+    print(f"   ✅ {os.path.getsize(output_file) / 1024:8.1f} KB  diferença máxima para o Keras={difference:.2e}  → {output_file}")
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrai os pesos dos modelos Keras para o motor NumPy")
+    parser.add_argument("--model", action="append",
+                        help="Diretório do modelo (pode repetir); padrão: todos em models/")
+    args = parser.parse_args()
+
+    model_paths = args.model or sorted(
+        os.path.join(MODELS_DIR, d) for d in os.listdir(MODELS_DIR) if os.path.isdir(os.path.join(MODELS_DIR, d))
+    )
+    for model_path in model_paths:
+        export_model(model_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportação dos modelos para TFLite (float32, float16 e int8 dinâmico)
+Gera models/<id>/model_<variante>.tflite ao lado do model.keras original
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, BASE_DIR)
+
+from inference import TFLITE_QUANTIZATIONS, tflite_model_filename
+
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+
+
+def unrolled_model(model):
+    """Recria o modelo com as camadas recorrentes desenroladas (unroll=True), com os mesmos pesos.
+
+    A conversão da LSTM do Keras para o operador fundido do TFLite não
+    reproduz as saídas deste modelo; desenrolada, a LSTM vira operações
+    simples e o resultado bate com o Keras. A entrada tem comprimento fixo
+    (max_source_len), então o desenrolamento é sempre possível.
+    """
+    import keras
+
+    config = model.get_config()
+    changed = False
+    for layer in config["layers"]:
+        if layer["class_name"] in ("LSTM", "GRU", "SimpleRNN"):
+            layer["config"]["unroll"] = True
+            changed = True
+    if not changed:
+        return model
+    unrolled = keras.Model.from_config(config)
+    unrolled.set_weights(model.get_weights())
+    return unrolled
+
+
+def convert(model, quantization):
+    """Converte o modelo para TFLite na variante pedida; o lote fica dinâmico"""
+    import tensorflow as tf
+
+    input_spec = model.inputs[0]
+    signature = [tf.TensorSpec((None,) + tuple(input_spec.shape[1:]), input_spec.dtype)]
+    function = tf.function(lambda inputs: model(inputs, training=False), input_signature=signature)
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([function.get_concrete_function()], model)
+    if quantization == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        # Quantização dinâmica: pesos em int8, ativações em float
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    return converter.convert()
+
+
+def check_agreement(model, tflite_file, max_len, samples=16):
+    """Concordância de tokens entre o Keras e o TFLite em entradas aleatórias"""
+    import tensorflow as tf
+
+    rng = np.random.default_rng(0)
+    vocab_size = next((layer.input_dim for layer in model.layers if hasattr(layer, "input_dim")), 100)
+    inputs = np.zeros((samples, max_len), dtype=np.float32)
+    for row in range(samples):
+        length = rng.integers(1, min(max_len, 20))
+        inputs[row, :length] = rng.integers(1, vocab_size, length)
+
+    interpreter = tf.lite.Interpreter(model_path=tflite_file)
+    input_details = interpreter.get_input_details()[0]
+    interpreter.resize_tensor_input(input_details["index"], list(inputs.shape))
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(input_details["index"], inputs)
+    interpreter.invoke()
+    tflite_output = interpreter.get_tensor(interpreter.get_output_details()[0]["index"])
+    keras_output = model(inputs, training=False).numpy()
+    return float(np.mean(np.argmax(tflite_output, -1) == np.argmax(keras_output, -1)))
+
+
+def export_model(model_path, quantizations=TFLITE_QUANTIZATIONS):
+    """Exporta as variantes TFLite de um diretório de modelo"""
+    from keras.models import load_model
+
+    model_file = os.path.join(model_path, "model.keras")
+    with open(os.path.join(model_path, "config.json"), "r") as f:
+        max_len = json.load(f).get("max_source_len")
+
+    print(f"\n📦 {model_path}")
+    try:
+        model = load_model(model_file, compile=False)
+    except Exception as e:
+        print(f"   ❌ Não foi possível carregar {model_file}: {e}")
+        return {}
+
+    source_model = unrolled_model(model)
+    results = {}
+    for quantization in quantizations:
+        output_file = os.path.join(model_path, tflite_model_filename(quantization))
+        try:
+            content = convert(source_model, quantization)
+        except Exception as e:
+            print(f"   ❌ {quantization}: falha na conversão: {e}")
+            continue
+        temp_file = f"{output_file}.tmp"
+        with open(temp_file, "wb") as f:
+            f.write(content)
+        os.replace(temp_file, output_file)
+        agreement = check_agreement(model, output_file, max_len)
+        results[quantization] = {"file": output_file, "bytes": len(content), "token_agreement": agreement}
+        print(f"   ✅ {quantization:8s} {len(content) / 1024:8.1f} KB  concordância com Keras={agreement:.3f}  → {output_file}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta modelos Keras para TFLite")
+    parser.add_argument("--model", action="append",
+                        help="Diretório do modelo (pode repetir); padrão: todos em models/")
+    parser.add_argument("--quantization", action="append", choices=TFLITE_QUANTIZATIONS,
+                        help="Variante a gerar (pode repetir); padrão: todas")
+    args = parser.parse_args()
+
+    model_paths = args.model or sorted(
+        os.path.join(MODELS_DIR, d) for d in os.listdir(MODELS_DIR) if os.path.isdir(os.path.join(MODELS_DIR, d))
+    )
+    for model_path in model_paths:
+        export_model(model_path, args.quantization or TFLITE_QUANTIZATIONS)
+
+
+if __name__ == "__main__":
+    main()
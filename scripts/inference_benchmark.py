@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de inferência local (sem servidor HTTP)
+Compara os caminhos de inferência do Translator diretamente sobre o modelo
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import subprocess
+import tracemalloc
+from statistics import mean, median
+
+import numpy as np
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, BASE_DIR)
+
+from inference import (Translator, TokenizerArtifact, build_index_to_words, tokenizer_artifact_path, file_sha256,
+                       TFLITE_QUANTIZATIONS, tflite_model_filename)
+from numpy_engine import NUMPY_WEIGHTS_FILENAME
+
+CORPUS_FILE = os.path.join(BASE_DIR, "data", "hau.txt")
+
+
+def load_sample_texts(source_language, limit=64):
+    """Carrega frases de teste do corpus data/hau.txt (pares inglês<TAB>hausa)"""
+    column = 1 if source_language.lower().startswith("hausa") else 0
+    texts = []
+    try:
+        with open(CORPUS_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) > column and parts[column].strip():
+                    texts.append(parts[column].strip())
+                if len(texts) >= limit:
+                    break
+    except Exception as e:
+        print(f"⚠️ Não foi possível ler o corpus {CORPUS_FILE}: {e}")
+    return texts or ["Hello world", "How are you?", "Good morning"]
+
+
+def percentile(values, pct):
+    """Percentil simples sobre uma lista de valores"""
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def summarize(times_ms):
+    return {
+        "mean_ms": mean(times_ms),
+        "median_ms": median(times_ms),
+        "p95_ms": percentile(times_ms, 95),
+        "min_ms": min(times_ms),
+        "max_ms": max(times_ms),
+    }
+
+
+class InferenceBenchmark:
+    def __init__(self, model_path, iterations=20, length_bucketing=False):
+        self.model_path = model_path
+        self.iterations = iterations
+        self.length_bucketing = length_bucketing
+        self.translator = None
+        self.texts = []
+        self.report = {
+            "model_path": model_path,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "iterations": iterations,
+            "results": {},
+        }
+
+    def load(self):
+        """Carrega o modelo com o caminho compilado habilitado"""
+        print(f"📦 Carregando modelo de {self.model_path}")
+        start_time = time.perf_counter()
+        # "force": a comparação mede justamente a divergência em modelos que não mascaram o padding
+        self.translator = Translator(self.model_path, inference_path="compiled",
+                                     length_bucketing="force" if self.length_bucketing else False)
+        self.translator.load_model()
+        self.report["load_time_ms"] = (time.perf_counter() - start_time) * 1000
+        self.report["warmup_time_ms"] = self.translator.warmup_time_ms
+        self.texts = load_sample_texts(self.translator.source_language)
+
+    def prepare(self, texts):
+        """Gera o lote preenchido exatamente como o Translator faz"""
+        return self.translator.prepare_batch(texts)
+
+    def time_path(self, inference_path, padded):
+        """Mede a latência de um caminho de inferência para um lote preenchido"""
+        self.translator.inference_path = inference_path
+        self.translator.predict_padded(padded)  # aquecimento adicional
+        times_ms = []
+        for _ in range(self.iterations):
+            start_time = time.perf_counter()
+            output = self.translator.predict_padded(padded)
+            times_ms.append((time.perf_counter() - start_time) * 1000)
+        return times_ms, output
+
+    def compare_inference_paths(self, batch_sizes=(1, 8, 32)):
+        """Compara o caminho compilado com model.predict para cada tamanho de lote"""
+        print("\n⚡ Comparando caminhos de inferência: compiled x predict")
+        original_path = self.translator.inference_path
+        results = {}
+        for batch_size in batch_sizes:
+            texts = (self.texts * (batch_size // len(self.texts) + 1))[:batch_size]
+            padded = self.prepare(texts)
+
+            predict_times, predict_output = self.time_path("predict", padded)
+            compiled_times, compiled_output = self.time_path("compiled", padded)
+
+            agreement = float(np.mean(np.argmax(predict_output, -1) == np.argmax(compiled_output, -1)))
+            results[str(batch_size)] = {
+                "predict": summarize(predict_times),
+                "compiled": summarize(compiled_times),
+                "speedup": median(predict_times) / median(compiled_times),
+                "token_agreement": agreement,
+            }
+            print(f"   lote={batch_size:3d}  predict={median(predict_times):8.2f}ms  "
+                  f"compiled={median(compiled_times):8.2f}ms  "
+                  f"ganho={results[str(batch_size)]['speedup']:.1f}x  concordância={agreement:.3f}")
+
+        self.translator.inference_path = original_path
+        self.report["results"]["inference_paths"] = results
+        return results
+
+    def time_run(self, padded):
+        """Mede a latência de uma passada direta do modelo no comprimento recebido"""
+        self.translator.run_model(padded)
+        times_ms = []
+        for _ in range(self.iterations):
+            start_time = time.perf_counter()
+            output = self.translator.run_model(padded)
+            times_ms.append((time.perf_counter() - start_time) * 1000)
+        return times_ms, output
+
+    def compare_length_buckets(self):
+        """Compara o padding por bucket de comprimento com o padding completo, bucket a bucket"""
+        print("\n📏 Comparando buckets de comprimento com padding completo")
+        if not self.translator.length_bucketing:
+            print("   ⚠️ Buckets de comprimento indisponíveis para este modelo (padding completo)")
+            self.report["results"]["length_buckets"] = {"enabled": False}
+            return None
+
+        padded = self.prepare(self.texts)
+        row_buckets = self.translator.bucket_lengths(padded)
+        results = {"enabled": True, "buckets": {}}
+        for length in self.translator.length_buckets:
+            rows = np.flatnonzero(row_buckets == length)
+            if len(rows) == 0:
+                continue
+            group = padded[rows]
+            full_times, full_output = self.time_run(group)
+            bucket_times, bucket_output = self.time_run(group[:, :length])
+
+            full_tokens = np.argmax(full_output, -1)
+            bucket_tokens = np.argmax(bucket_output, -1)
+            steps = min(full_tokens.shape[1], bucket_tokens.shape[1])
+            token_agreement = float(np.mean(full_tokens[:, :steps] == bucket_tokens[:, :steps]))
+            sentence_agreement = float(np.mean(np.all(full_tokens[:, :steps] == bucket_tokens[:, :steps], axis=1)))
+            savings = 1 - median(bucket_times) / median(full_times)
+
+            results["buckets"][str(length)] = {
+                "inputs": int(len(rows)),
+                "full_padding": summarize(full_times),
+                "bucket_padding": summarize(bucket_times),
+                "savings_pct": savings * 100,
+                "token_agreement": token_agreement,
+                "sentence_agreement": sentence_agreement,
+            }
+            print(f"   bucket={length:3d}  entradas={len(rows):3d}  completo={median(full_times):8.2f}ms  "
+                  f"bucket={median(bucket_times):8.2f}ms  economia={savings * 100:5.1f}%  "
+                  f"concordância={token_agreement:.3f}")
+
+        self.report["results"]["length_buckets"] = results
+        return results
+
+    def compare_tflite(self, batch_sizes=(1, 8, 32), threads=None, corpus_size=256):
+        """Compara latência e concordância das variantes TFLite com o caminho Keras (compilado)"""
+        print(f"\n🪶 Comparando backend TFLite com Keras (threads: {threads or 'padrão'})")
+        if threads:
+            os.environ["TFLITE_THREADS"] = str(threads)
+        corpus = load_sample_texts(self.translator.source_language, limit=corpus_size)
+        reference_padded = self.prepare(corpus).copy()
+        reference_tokens = np.argmax(self.translator.predict_padded(reference_padded), -1)
+        reference_sentences = self.translator.translate_batch(corpus)
+
+        results = {"threads": threads, "corpus_size": len(corpus), "variants": {}}
+        for quantization in TFLITE_QUANTIZATIONS:
+            tflite_file = os.path.join(self.model_path, tflite_model_filename(quantization))
+            if not os.path.exists(tflite_file):
+                print(f"   ⚠️ {quantization}: {tflite_file} não encontrado (gere com scripts/export_tflite.py)")
+                continue
+            translator = Translator(self.model_path, inference_path="tflite", tflite_quantization=quantization)
+            translator.load_model()
+            if translator.inference_path != "tflite":
+                print(f"   ⚠️ {quantization}: backend TFLite indisponível")
+                continue
+
+            tokens = np.argmax(translator.predict_padded(reference_padded), -1)
+            sentences = translator.translate_batch(corpus)
+            variant = {
+                "bytes": os.path.getsize(tflite_file),
+                "token_agreement": float(np.mean(tokens == reference_tokens)),
+                "sentence_agreement": float(np.mean([a == b for a, b in zip(sentences, reference_sentences)])),
+                "batches": {},
+            }
+            for batch_size in batch_sizes:
+                texts = (corpus * (batch_size // len(corpus) + 1))[:batch_size]
+                padded = self.prepare(texts).copy()
+                keras_times, _ = self.time_run(padded)
+                self.translator, keras_translator = translator, self.translator
+                tflite_times, _ = self.time_run(padded)
+                self.translator = keras_translator
+                variant["batches"][str(batch_size)] = {
+                    "keras": summarize(keras_times),
+                    "tflite": summarize(tflite_times),
+                    "speedup": median(keras_times) / median(tflite_times),
+                }
+                print(f"   {quantization:8s} lote={batch_size:3d}  keras={median(keras_times):8.2f}ms  "
+                      f"tflite={median(tflite_times):8.2f}ms  ganho={variant['batches'][str(batch_size)]['speedup']:.1f}x")
+            print(f"   {quantization:8s} {variant['bytes'] / 1024:.0f} KB  concordância: tokens={variant['token_agreement']:.3f}  "
+                  f"frases={variant['sentence_agreement']:.3f}")
+            results["variants"][quantization] = variant
+
+        self.report["results"]["tflite"] = results
+        return results
+
+    def compare_numpy(self, batch_sizes=(1, 8, 32), corpus_size=256):
+        """Compara o motor NumPy com o caminho Keras: diferença das saídas, concordância, latência e custo de processo"""
+        print("\n🧮 Comparando motor NumPy com Keras")
+        corpus = load_sample_texts(self.translator.source_language, limit=corpus_size)
+        reference_padded = self.prepare(corpus).copy()
+        reference_output = self.translator.predict_padded(reference_padded)
+        reference_sentences = self.translator.translate_batch(corpus)
+
+        translator = Translator(self.model_path, inference_path="numpy")
+        translator.load_model()
+        if translator.inference_path != "numpy":
+            print("   ⚠️ Motor NumPy indisponível para este modelo (o Translator voltou ao Keras)")
+            return None
+
+        numpy_output = translator.numpy_model.predict(reference_padded)
+        sentences = translator.translate_batch(corpus)
+        results = {
+            "corpus_size": len(corpus),
+            "max_abs_difference": float(np.max(np.abs(numpy_output - reference_output))),
+            "token_agreement": float(np.mean(np.argmax(numpy_output, -1) == np.argmax(reference_output, -1))),
+            "sentence_agreement": float(np.mean([a == b for a, b in zip(sentences, reference_sentences)])),
+            "batches": {},
+        }
+        print(f"   diferença máxima={results['max_abs_difference']:.2e}  concordância: "
+              f"tokens={results['token_agreement']:.3f}  frases={results['sentence_agreement']:.3f}")
+
+        for batch_size in batch_sizes:
+            texts = (corpus * (batch_size // len(corpus) + 1))[:batch_size]
+            padded = self.prepare(texts).copy()
+            keras_times, _ = self.time_run(padded)
+            self.translator, keras_translator = translator, self.translator
+            numpy_times, _ = self.time_run(padded)
+            self.translator = keras_translator
+            results["batches"][str(batch_size)] = {
+                "keras": summarize(keras_times),
+                "numpy": summarize(numpy_times),
+                "speedup": median(keras_times) / median(numpy_times),
+            }
+            print(f"   lote={batch_size:3d}  keras={median(keras_times):8.2f}ms  numpy={median(numpy_times):8.2f}ms  "
+                  f"ganho={results['batches'][str(batch_size)]['speedup']:.1f}x")
+
+        # Custo de um processo novo só para carregar o modelo: Keras/TensorFlow x pesos extraídos
+        results["process"] = {
+            "keras": self.measure_process(
+                "from keras.models import load_model; "
+                f"load_model({os.path.join(self.model_path, 'model.keras')!r}, compile=False)"),
+            "numpy": self.measure_process(
+                "from numpy_engine import NumpyModel; "
+                f"NumpyModel.load({os.path.join(self.model_path, NUMPY_WEIGHTS_FILENAME)!r})"),
+        }
+        for name, stats in results["process"].items():
+            print(f"   processo {name:6s} tempo={stats['seconds']:6.2f}s  RSS={stats['rss_mb']:7.1f} MB  "
+                  f"tensorflow importado={stats['tensorflow_imported']}")
+
+        self.report["results"]["numpy"] = results
+        return results
+
+    def compare_pool(self, pool_size, clients=8, batch_size=8, requests_per_client=50,
+                     inference_paths=("compiled", "numpy")):
+        """Vazão com `clients` threads concorrentes: inferência na própria thread x pool de processos"""
+        from concurrent.futures import ThreadPoolExecutor
+        from inference_pool import InferencePool
+
+        print(f"\n🏭 Comparando inferência na thread x pool de {pool_size} processos "
+              f"({clients} clientes, lotes de {batch_size})")
+        corpus = load_sample_texts(self.translator.source_language)
+        batches = [(corpus * (batch_size // len(corpus) + 1))[i % len(corpus):][:batch_size] or corpus[:batch_size]
+                   for i in range(clients * requests_per_client)]
+        pool = InferencePool(pool_size)
+        results = {"pool_size": pool_size, "clients": clients, "batch_size": batch_size, "paths": {}}
+        try:
+            for inference_path in inference_paths:
+                results["paths"][inference_path] = {}
+                for mode in ("thread", "pool"):
+                    translator = Translator(self.model_path, inference_path=inference_path,
+                                            inference_pool=pool if mode == "pool" else None)
+                    translator.load_model()
+
+                    def timed(texts):
+                        start_time = time.perf_counter()
+                        translator.translate_batch(texts)
+                        return (time.perf_counter() - start_time) * 1000
+
+                    for texts in batches[:clients]:
+                        translator.translate_batch(texts)
+                    start_time = time.perf_counter()
+                    with ThreadPoolExecutor(max_workers=clients) as executor:
+                        times_ms = list(executor.map(timed, batches))
+                    elapsed = time.perf_counter() - start_time
+                    translator.release_pool_model()
+                    results["paths"][inference_path][mode] = {
+                        **summarize(times_ms),
+                        "p99_ms": percentile(times_ms, 99),
+                        "sentences_per_second": len(batches) * batch_size / elapsed,
+                    }
+                    stats = results["paths"][inference_path][mode]
+                    print(f"   {inference_path:8s} {mode:6s} {stats['sentences_per_second']:8.0f} frases/s  "
+                          f"p50={stats['median_ms']:7.2f}ms  p99={stats['p99_ms']:7.2f}ms")
+            results["workers"] = pool.stats()["workers"]
+        finally:
+            pool.close()
+
+        self.report["results"]["pool"] = results
+        return results
+
+    @staticmethod
+    def measure_process(code):
+        """Executa `code` num processo Python novo e mede tempo total e RSS ao final"""
+        # ru_maxrss herda o pico do processo pai no fork; o RSS atual do filho vem do psutil
+        script = (
+            "import sys, time, psutil\n"
+            "start = time.perf_counter()\n"
+            f"{code}\n"
+            "print(time.perf_counter() - start, psutil.Process().memory_info().rss // 1024, "
+            "'tensorflow' in sys.modules)\n"
+        )
+        output = subprocess.run([sys.executable, "-c", script], cwd=BASE_DIR, capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=BASE_DIR, TF_CPP_MIN_LOG_LEVEL="3"), check=True)
+        seconds, rss_kb, tensorflow_imported = output.stdout.strip().splitlines()[-1].split()
+        return {"seconds": float(seconds), "rss_mb": int(rss_kb) / 1024,
+                "tensorflow_imported": tensorflow_imported == "True"}
+
+    def measure_load(self, load):
+        """Mede o tempo de carregamento e a memória Python retida pelo objeto carregado"""
+        times_ms = []
+        for _ in range(self.iterations):
+            start_time = time.perf_counter()
+            load()
+            times_ms.append((time.perf_counter() - start_time) * 1000)
+        tracemalloc.start()
+        loaded = load()
+        retained_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del loaded
+        return {**summarize(times_ms), "retained_kb": retained_bytes / 1024, "peak_kb": peak_bytes / 1024}
+
+    def compare_tokenizer_loading(self):
+        """Compara o carregamento dos tokenizadores via JSON (Keras) e via artefato compacto (.npz)"""
+        from keras.preprocessing.text import tokenizer_from_json
+
+        print("\n🔤 Comparando carregamento dos tokenizadores: JSON x artefato compacto")
+        results = {}
+        for name in ("source_tokenizer", "target_tokenizer"):
+            json_path = os.path.join(self.model_path, f"{name}.json")
+            TokenizerArtifact.load_or_build(json_path)
+            artifact_path = tokenizer_artifact_path(json_path)
+
+            def load_json():
+                # Caminho antigo do load_model: decodificação dupla + tokenizer_from_json + vocabulário inverso
+                with open(json_path, "r") as f:
+                    data = json.load(f)
+                if isinstance(data, str):
+                    data = json.loads(data)
+                tokenizer = tokenizer_from_json(json.dumps(data))
+                return tokenizer, build_index_to_words(tokenizer.word_index)
+
+            def load_artifact():
+                return TokenizerArtifact.load(artifact_path, file_sha256(json_path))
+
+            json_stats = self.measure_load(load_json)
+            artifact_stats = self.measure_load(load_artifact)
+            results[name] = {
+                "json_bytes": os.path.getsize(json_path),
+                "artifact_bytes": os.path.getsize(artifact_path),
+                "json": json_stats,
+                "artifact": artifact_stats,
+                "speedup": json_stats["median_ms"] / artifact_stats["median_ms"],
+            }
+            print(f"   {name}: json={json_stats['median_ms']:7.2f}ms/{json_stats['retained_kb']:8.1f}KB  "
+                  f"artefato={artifact_stats['median_ms']:7.2f}ms/{artifact_stats['retained_kb']:8.1f}KB  "
+                  f"ganho={results[name]['speedup']:.1f}x")
+
+        self.report["results"]["tokenizer_loading"] = results
+        return results
+
+    def save_report(self, filename=None):
+        """Salva relatório em arquivo JSON"""
+        if filename is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"inference_benchmark_{timestamp}.json"
+
+        with open(filename, "w") as f:
+            json.dump(self.report, f, indent=2)
+
+        print(f"\n📄 Relatório salvo em: {filename}")
+        return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local de inferência do Translator")
+    parser.add_argument("--model", default=os.path.join(BASE_DIR, "models", "hausa-english-translator"),
+                        help="Caminho para o diretório do modelo")
+    parser.add_argument("--iterations", type=int, default=20, help="Repetições por medição")
+    parser.add_argument("--batch-sizes", default="1,8,32", help="Tamanhos de lote separados por vírgula")
+    parser.add_argument("--length-buckets", action="store_true",
+                        help="Habilitar e comparar o padding por buckets de comprimento")
+    parser.add_argument("--tokenizers", action="store_true",
+                        help="Comparar o carregamento dos tokenizadores (JSON x artefato compacto)")
+    parser.add_argument("--tflite", action="store_true",
+                        help="Comparar as variantes TFLite (scripts/export_tflite.py) com o caminho Keras")
+    parser.add_argument("--tflite-threads", type=int, help="Threads do interpretador TFLite")
+    parser.add_argument("--numpy", action="store_true",
+                        help="Comparar o motor NumPy (numpy_engine.py) com o caminho Keras")
+    parser.add_argument("--pool", type=int, metavar="N",
+                        help="Comparar a inferência na thread com um pool de N processos (inference_pool.py)")
+    parser.add_argument("--pool-clients", type=int, default=8, help="Threads concorrentes na comparação do pool")
+    parser.add_argument("--output", help="Arquivo JSON de saída do relatório")
+    args = parser.parse_args()
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b.strip()]
+
+    benchmark = InferenceBenchmark(args.model, iterations=args.iterations, length_bucketing=args.length_buckets)
+    benchmark.load()
+    benchmark.compare_inference_paths(batch_sizes)
+    if args.length_buckets:
+        benchmark.compare_length_buckets()
+    if args.tokenizers:
+        benchmark.compare_tokenizer_loading()
+    if args.tflite:
+        benchmark.compare_tflite(batch_sizes, threads=args.tflite_threads)
+    if args.numpy:
+        benchmark.compare_numpy(batch_sizes)
+    if args.pool:
+        benchmark.compare_pool(args.pool, clients=args.pool_clients)
+    benchmark.save_report(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de memória do modo pre-fork (gunicorn.conf.py)
+Compara a memória total de N workers do gunicorn, com os modelos carregados no
+mestre antes do fork, com a de N processos independentes que carregam os
+mesmos modelos
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import subprocess
+import urllib.request
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def process_tree_pss_mb(pid):
+    """Soma das PSS (MB) de um processo e dos seus filhos, lida de /proc/<pid>/smaps_rollup"""
+    import psutil
+
+    total_kb = 0
+    root = psutil.Process(pid)
+    for process in [root] + root.children(recursive=True):
+        with open(f"/proc/{process.pid}/smaps_rollup", "r") as f:
+            total_kb += next(int(line.split()[1]) for line in f if line.startswith("Pss:"))
+    return total_kb / 1024
+
+
+def http_json(url, payload=None, timeout=30):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def wait_ready(base_url, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if http_json(f"{base_url}/api/ready", timeout=5)["ready"]:
+                return True
+        except Exception:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+class PreforkBenchmark:
+    def __init__(self, workers, model_ids, requests, port, env):
+        self.workers = workers
+        self.model_ids = model_ids
+        self.requests = requests
+        self.port = port
+        self.env = dict(os.environ, PRELOAD_MODELS=",".join(model_ids), TF_CPP_MIN_LOG_LEVEL="3", **env)
+        self.report = {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "workers": workers,
+            "models": model_ids,
+            "requests": requests,
+            "results": {}
+        }
+
+    def translate_all(self, base_url):
+        for index in range(self.requests):
+            model_id = self.model_ids[index % len(self.model_ids)]
+            http_json(f"{base_url}/api/translate", {"text": "Sannu duniya", "model": model_id})
+
+    def measure_prefork(self):
+        """Sobe o gunicorn com N workers, envia as requisições e mede a PSS de mestre + workers"""
+        print(f"\n🍴 gunicorn pre-fork: {self.workers} workers")
+        env = dict(self.env, WEB_CONCURRENCY=str(self.workers), PORT=str(self.port))
+        server = subprocess.Popen([sys.executable, "-m", "gunicorn", "app:app"], cwd=BASE_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        base_url = f"http://127.0.0.1:{self.port}"
+        try:
+            start_time = time.perf_counter()
+            if not wait_ready(base_url):
+                raise RuntimeError("gunicorn não ficou pronto")
+            ready_seconds = time.perf_counter() - start_time
+            self.translate_all(base_url)
+            workers_report = http_json(f"{base_url}/api/status")["workers"]
+            measured = process_tree_pss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        result = {
+            "ready_seconds": ready_seconds,
+            "total_pss_mb": measured,
+            "requests_per_worker": {str(w["pid"]): w["requests"] for w in workers_report["workers"]},
+            "reported_saved_mb": workers_report["saved_mb"],
+            "reported_independent_mb": workers_report["independent_processes_mb"]
+        }
+        print(f"   Pronto em {ready_seconds:.1f} s, PSS total {measured:.1f} MB, requisições por worker: "
+              f"{list(result['requests_per_worker'].values())}")
+        print(f"   Relatório do servidor: {workers_report['prefork_total_mb']} MB x "
+              f"{workers_report['independent_processes_mb']} MB estimados para processos independentes")
+        self.report["results"]["prefork"] = result
+        return result
+
+    def measure_independent(self):
+        """N processos Python independentes, cada um importando o app e carregando os mesmos modelos"""
+        print(f"\n🧍 {self.workers} processos independentes")
+        code = (
+            "import sys, app\n"
+            "app.model_preloader.start(app.get_preload_model_ids(), wait=True)\n"
+            "for model_id in app.get_preload_model_ids():\n"
+            "    translator = app.loaded_translators.peek(model_id)\n"
+            "    translator and translator.translate_batch(['Sannu duniya'])\n"
+            "print('ready', flush=True)\n"
+            "sys.stdin.read()\n"
+        )
+        processes = [subprocess.Popen([sys.executable, "-c", code], cwd=BASE_DIR, env=self.env, text=True,
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                     for _ in range(self.workers)]
+        try:
+            start_time = time.perf_counter()
+            for process in processes:
+                while process.stdout.readline().strip() != "ready":
+                    if process.poll() is not None:
+                        raise RuntimeError("processo independente terminou antes de ficar pronto")
+            ready_seconds = time.perf_counter() - start_time
+            measured = sum(process_tree_pss_mb(process.pid) for process in processes)
+        finally:
+            for process in processes:
+                process.kill()
+                process.wait()
+        result = {"ready_seconds": ready_seconds, "total_pss_mb": measured}
+        print(f"   Prontos em {ready_seconds:.1f} s, PSS total {measured:.1f} MB")
+        self.report["results"]["independent"] = result
+        return result
+
+    def compare(self):
+        prefork = self.measure_prefork()
+        independent = self.measure_independent()
+        saved = independent["total_pss_mb"] - prefork["total_pss_mb"]
+        self.report["results"]["saved_mb"] = saved
+        print(f"\n💾 Memória poupada pelo pre-fork: {saved:.1f} MB "
+              f"({saved / independent['total_pss_mb'] * 100:.0f}% dos processos independentes); "
+              f"estimativa do servidor: {prefork['reported_saved_mb']} MB")
+
+    def save_report(self, filename=None):
+        """Salva relatório em arquivo JSON"""
+        if filename is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"prefork_benchmark_{timestamp}.json"
+
+        with open(filename, "w") as f:
+            json.dump(self.report, f, indent=2)
+
+        print(f"\n📄 Relatório salvo em: {filename}")
+        return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória do modo pre-fork x processos independentes")
+    parser.add_argument("--workers", type=int, default=2, help="Número de workers / processos")
+    parser.add_argument("--model", action="append",
+                        help="Modelo a pré-carregar (pode repetir); padrão: hausa-english-translator")
+    parser.add_argument("--requests", type=int, default=50, help="Traduções enviadas ao gunicorn")
+    parser.add_argument("--port", type=int, default=5099, help="Porta do gunicorn durante o benchmark")
+    parser.add_argument("--inference-path", help="INFERENCE_PATH dos dois lados (ex.: numpy)")
+    parser.add_argument("--output", help="Arquivo JSON de saída do relatório")
+    args = parser.parse_args()
+
+    env = {"INFERENCE_PATH": args.inference_path} if args.inference_path else {}
+    benchmark = PreforkBenchmark(args.workers, args.model or ["hausa-english-translator"], args.requests,
+                                 args.port, env)
+    benchmark.compare()
+    benchmark.save_report(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,11 @@ Script de teste rápido para verificar se o sistema está funcionando
 
 import sys
 import os
+import json
+import tempfile
+
+# Os testes importam o app: as estatísticas de uso vão para uma pasta temporária, não para stats/
+os.environ.setdefault('USAGE_STATS_FILE', os.path.join(tempfile.mkdtemp(prefix="usage_stats_"), "model_usage.json"))
 
 def test_imports():
     """Testa se todas as importações estão funcionando"""
@@ -120,6 +125,1271 @@ def test_app_import():
         print(f"❌ Erro ao importar: {e}")
         return False
 
+def test_batch_translation():
+    """Testa se a tradução em lote é equivalente à tradução individual"""
+    print("\n📦 Testando tradução em lote...")
+    
+    model_path = os.path.join(os.path.dirname(__file__), "models", "hausa-english-translator")
+    texts = ["Sannu duniya", "Yaya kake?", "Na gode"]
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        from inference import Translator
+        
+        translator = Translator(model_path)
+        translator.load_model()
+        
+        batch = translator.translate_batch(texts)
+        single = [translator.translate(text) for text in texts]
+        
+        if batch != single:
+            print(f"❌ Resultados divergentes: {batch} != {single}")
+            return False
+        
+        print(f"✅ {len(texts)} textos traduzidos em lote com resultados idênticos")
+        return True
+    except Exception as e:
+        print(f"❌ Erro na tradução em lote: {e}")
+        return False
+
+def test_compiled_path():
+    """Testa as funções compiladas por bucket de lote: aquecidas no carregamento e sem novo traço depois"""
+    print("\n⚙️ Testando caminho compilado...")
+    
+    model_path = os.path.join(os.path.dirname(__file__), "models", "hausa-english-translator")
+    texts = ["Sannu duniya", "Yaya kake?", "Na gode", "Ina kwana", "Barka da safe"]
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        from inference import Translator
+        
+        compiled = Translator(model_path, inference_path="compiled")
+        compiled.load_model()
+        if compiled.inference_path != "compiled" or tuple(sorted(compiled.compiled_functions)) != compiled.batch_buckets:
+            print(f"❌ Funções compiladas ausentes: {compiled.inference_path}, {sorted(compiled.compiled_functions)}")
+            return False
+        if not compiled.warmup_time_ms:
+            print("❌ Aquecimento não executado no carregamento")
+            return False
+        
+        # O aquecimento já rastreou cada bucket: um lote de 5 textos (bucket 8) não gera novo traço
+        traces = {bucket: function.experimental_get_tracing_count() for bucket, function in compiled.compiled_functions.items()}
+        batch = compiled.translate_batch(texts)
+        retraced = {bucket: function.experimental_get_tracing_count() for bucket, function in compiled.compiled_functions.items()}
+        if retraced != traces:
+            print(f"❌ Função compilada rastreada de novo após o aquecimento: {traces} -> {retraced}")
+            return False
+        
+        predict = Translator(model_path, inference_path="predict")
+        predict.load_model()
+        expected = predict.translate_batch(texts)
+        if batch != expected:
+            print(f"❌ Caminho compilado diverge do model.predict: {batch} != {expected}")
+            return False
+        
+        print(f"✅ {len(compiled.compiled_functions)} buckets de lote compilados e aquecidos em {compiled.warmup_time_ms:.0f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do caminho compilado: {e}")
+        return False
+
+def test_length_bucketing():
+    """Testa os buckets de comprimento: volta ao padding completo sem máscara e equivalência com máscara"""
+    print("\n📏 Testando buckets de comprimento...")
+    
+    model_path = os.path.join(os.path.dirname(__file__), "models", "hausa-english-translator")
+    texts = ["Sannu duniya", "Yaya kake?", "Na gode", "Ina kwana", "Barka da safe"]
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import shutil
+        import keras
+        from inference import Translator
+        
+        # O modelo hausa não mascara o padding: length_bucketing=True volta ao padding completo
+        unmasked = Translator(model_path, length_bucketing=True)
+        unmasked.load_model()
+        if unmasked.length_bucketing or unmasked.length_buckets != (unmasked.max_source_len,):
+            print(f"❌ Buckets habilitados num modelo sem máscara: {unmasked.length_buckets}")
+            return False
+        
+        # Com "force" os buckets são habilitados mesmo assim
+        forced = Translator(model_path, length_bucketing="force")
+        forced.load_model()
+        if not forced.length_bucketing or len(forced.length_buckets) < 2:
+            print(f"❌ length_bucketing \"force\" não habilitou os buckets: {forced.length_buckets}")
+            return False
+        
+        # Uma cópia com mask_zero=True usa os buckets e traduz igual ao padding completo
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for filename in ("config.json", "source_tokenizer.json", "target_tokenizer.json"):
+                shutil.copy(os.path.join(model_path, filename), temp_dir)
+            model = keras.models.load_model(os.path.join(model_path, "model.keras"), compile=False)
+            config = model.get_config()
+            for layer in config["layers"]:
+                if layer["class_name"] == "Embedding":
+                    layer["config"]["mask_zero"] = True
+            masked_model = keras.Model.from_config(config)
+            masked_model.set_weights(model.get_weights())
+            masked_model.save(os.path.join(temp_dir, "model.keras"))
+            
+            bucketed = Translator(temp_dir, length_bucketing=True)
+            bucketed.load_model()
+            full = Translator(temp_dir, length_bucketing=False)
+            full.load_model()
+            if not bucketed.length_bucketing:
+                print("❌ Buckets não habilitados num modelo que mascara o padding")
+                return False
+            batch, expected = bucketed.translate_batch(texts), full.translate_batch(texts)
+        if batch != expected:
+            print(f"❌ Buckets de comprimento divergem do padding completo: {batch} != {expected}")
+            return False
+        
+        print(f"✅ Buckets {bucketed.length_buckets} equivalentes ao padding completo com máscara; sem máscara, padding completo")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste dos buckets de comprimento: {e}")
+        return False
+
+def test_tflite_backend():
+    """Testa o backend TFLite: variante exportada reproduz o Keras e a falta do arquivo volta ao caminho compilado"""
+    print("\n📱 Testando backend TFLite...")
+    
+    model_path = os.path.join(os.path.dirname(__file__), "models", "hausa-english-translator")
+    texts = ["Sannu duniya", "Yaya kake?", "Na gode", "Ina kwana", "Barka da safe"]
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "scripts"))
+        import shutil
+        from inference import Translator
+        from export_tflite import export_model
+        
+        # Exporta numa cópia do modelo: o teste não depende dos .tflite gerados localmente
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for filename in ("config.json", "model.keras", "source_tokenizer.json", "target_tokenizer.json"):
+                shutil.copy(os.path.join(model_path, filename), temp_dir)
+            exported = export_model(temp_dir, ["float32"])
+            if "float32" not in exported:
+                print("❌ Exportação float32 falhou")
+                return False
+            
+            tflite = Translator(temp_dir, inference_path="tflite", tflite_quantization="float32")
+            tflite.load_model()
+            if tflite.inference_path != "tflite" or tflite.tflite_runner is None:
+                print(f"❌ Backend TFLite não selecionado: {tflite.inference_path}")
+                return False
+            batch = tflite.translate_batch(texts)
+            
+            # Sem o arquivo da variante pedida o tradutor volta ao caminho compilado
+            missing = Translator(temp_dir, inference_path="tflite", tflite_quantization="int8")
+            missing.load_model()
+            if missing.inference_path != "compiled":
+                print(f"❌ Sem model_int8.tflite o caminho deveria ser compiled: {missing.inference_path}")
+                return False
+            expected = missing.translate_batch(texts)
+        
+        if batch != expected:
+            print(f"❌ TFLite diverge do Keras: {batch} != {expected}")
+            return False
+        
+        print(f"✅ TFLite float32 reproduz o Keras (concordância {exported['float32']['token_agreement']:.3f}); sem o arquivo, caminho compilado")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do backend TFLite: {e}")
+        return False
+
+def test_compiled_tokenizer():
+    """Testa se o tokenizador compilado gera exatamente o mesmo padding do Keras"""
+    print("\n🔤 Testando tokenizador compilado...")
+    
+    model_path = os.path.join(os.path.dirname(__file__), "models", "hausa-english-translator")
+    texts = ["Sannu duniya!", "Yaya kake?", "", "Na\tgode, sosai.", " ".join(["da"] * 120)]
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import json
+        import numpy as np
+        from keras.preprocessing.text import tokenizer_from_json
+        from keras.preprocessing.sequence import pad_sequences
+        from inference import CompiledSourceTokenizer, clean_sentence
+        
+        with open(os.path.join(model_path, "source_tokenizer.json"), "r") as f:
+            data = json.load(f)
+        if isinstance(data, str):
+            data = json.loads(data)
+        tokenizer = tokenizer_from_json(json.dumps(data))
+        
+        expected = pad_sequences(tokenizer.texts_to_sequences([clean_sentence(t) for t in texts]), 89, padding="post")
+        compiled = CompiledSourceTokenizer.from_keras(tokenizer, 89).encode_batch(texts)
+        
+        if not np.array_equal(expected.reshape(*expected.shape, 1), compiled):
+            print("❌ Tokenizador compilado diverge do Keras")
+            return False
+        
+        # O artefato compacto (.npz) deve reproduzir o mesmo tokenizador após gravar e reler
+        from inference import TokenizerArtifact, build_index_to_words
+        artifact = TokenizerArtifact.from_json_file(os.path.join(model_path, "source_tokenizer.json"))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            artifact_path = os.path.join(temp_dir, "source_tokenizer.npz")
+            artifact.save(artifact_path, "sha")
+            reloaded = TokenizerArtifact.load(artifact_path, "sha")
+            stale = TokenizerArtifact.load(artifact_path, "outro")
+        from_artifact = CompiledSourceTokenizer.from_keras(reloaded, 89).encode_batch(texts)
+        if (stale is not None or reloaded.word_index != tokenizer.word_index
+                or reloaded.index_to_words.dtype != object
+                or not np.array_equal(reloaded.index_to_words, build_index_to_words(tokenizer.word_index))
+                or not np.array_equal(expected.reshape(*expected.shape, 1), from_artifact)):
+            print("❌ Artefato compacto do tokenizador diverge do JSON")
+            return False
+        
+        print("✅ Tokenizador compilado idêntico ao Keras")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do tokenizador: {e}")
+        return False
+
+def test_lazy_imports():
+    """Testa se importar o app não importa TensorFlow/Keras e se /api/status mostra as fases da inicialização"""
+    print("\n💤 Testando importações sob demanda...")
+    
+    # Processo novo: neste os testes anteriores já importaram o TensorFlow
+    script = """
+import json, sys
+import app
+import inference
+client = app.app.test_client()
+client.get('/api/status')
+# O marco da primeira resposta é registrado depois dela: aparece a partir da segunda
+startup = client.get('/api/status').get_json()['startup']
+before = {'tensorflow': 'tensorflow' in sys.modules, 'keras': 'keras' in sys.modules, 'startup': startup}
+inference.import_keras()
+after = inference.keras_import_status()
+print(json.dumps({'before': before, 'after': after, 'tensorflow_after': 'tensorflow' in sys.modules}))
+"""
+    
+    try:
+        import subprocess
+        
+        result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, timeout=300,
+                                env=dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3"))
+        if result.returncode != 0:
+            print(f"❌ Processo de teste falhou: {result.stderr[-500:]}")
+            return False
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        before, startup = report['before'], report['before']['startup']
+        
+        if before['tensorflow'] or before['keras'] or startup['keras']['imported'] or startup['tensorflow_loaded']:
+            print(f"❌ TensorFlow/Keras importados junto com o app: {before}")
+            return False
+        phases = [phase['phase'] for phase in startup['phases']]
+        if not {'imports', 'routes'} <= set(phases) or startup['app_import_ms'] is None:
+            print(f"❌ Fases da inicialização ausentes em /api/status: {phases}")
+            return False
+        if 'first_response' not in startup['milestones']:
+            print(f"❌ Marco da primeira resposta ausente: {startup['milestones']}")
+            return False
+        
+        # A primeira necessidade do Keras importa e registra o tempo gasto
+        if not report['after']['imported'] or report['after']['import_ms'] is None or not report['tensorflow_after']:
+            print(f"❌ import_keras não registrou a importação: {report['after']}")
+            return False
+        
+        print(f"✅ App importado em {startup['app_import_ms']:.0f} ms sem TensorFlow; Keras importado sob demanda em {report['after']['import_ms']:.0f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste de importações sob demanda: {e}")
+        return False
+
+def test_numpy_engine():
+    """Testa se o motor NumPy reproduz as saídas do Keras e recusa grafos não suportados"""
+    print("\n🧮 Testando motor NumPy...")
+    
+    model_path = os.path.join(os.path.dirname(__file__), "models", "hausa-english-translator")
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import keras
+        from keras.models import load_model
+        from numpy_engine import NumpyModel, UnsupportedModelError, EQUIVALENCE_TOLERANCE, max_difference
+        
+        model = load_model(os.path.join(model_path, "model.keras"), compile=False)
+        numpy_model = NumpyModel.from_keras(model, "sha")
+        difference = max_difference(numpy_model, model, 89)
+        if difference > EQUIVALENCE_TOLERANCE:
+            print(f"❌ Motor NumPy diverge do Keras (diferença máxima {difference:.2e})")
+            return False
+        
+        # Os pesos extraídos devem sobreviver a gravar e reler, e ficar obsoletos com outro model.keras
+        with tempfile.TemporaryDirectory() as temp_dir:
+            weights_path = os.path.join(temp_dir, "model_numpy.npz")
+            numpy_model.save(weights_path)
+            reloaded = NumpyModel.load(weights_path, "sha")
+            stale = NumpyModel.load(weights_path, "outro")
+        if stale is not None or max_difference(reloaded, model, 89) > EQUIVALENCE_TOLERANCE:
+            print("❌ Pesos extraídos do motor NumPy não reproduzem o modelo")
+            return False
+        
+        unsupported = keras.Sequential([keras.Input((8,)), keras.layers.Embedding(10, 4), keras.layers.Conv1D(2, 3)])
+        try:
+            NumpyModel.from_keras(unsupported)
+            print("❌ Grafo com Conv1D deveria ser recusado")
+            return False
+        except UnsupportedModelError:
+            pass
+        
+        print(f"✅ Motor NumPy equivalente ao Keras (diferença máxima {difference:.2e})")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do motor NumPy: {e}")
+        return False
+
+def test_prefork():
+    """Testa o que o modo pre-fork compartilha entre processos: contadores dos workers e estatísticas de uso"""
+    print("\n🍴 Testando modo pre-fork...")
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import json
+        import app
+        import inference
+        
+        # Um worker (processo filho) conta requisições na tabela criada antes do fork
+        stats = app.WorkerStats(4)
+        slot = stats.claim(set())
+        pid = os.fork()
+        if pid == 0:
+            stats.register(slot)
+            for _ in range(3):
+                stats.record()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        counts = [(worker['pid'], worker['requests']) for worker in stats.report()['workers']]
+        if counts != [(pid, 3)]:
+            print(f"❌ Contadores do worker não visíveis no mestre: {counts}")
+            return False
+        
+        # Dois processos gravando o mesmo arquivo de uso não apagam as contagens um do outro
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stats_file = os.path.join(temp_dir, "model_usage.json")
+            first, second = app.UsageStats(stats_file), app.UsageStats(stats_file)
+            first.record("modelo", True, 1.0)
+            second.record("modelo", True, 1.0)
+            second.record("modelo", False)
+            first.flush()
+            second.flush()
+            with open(stats_file, "r") as f:
+                saved = json.load(f)["modelo"]
+        if (saved["success"], saved["failure"]) != (2, 1):
+            print(f"❌ Estatísticas de uso perdidas entre processos: {saved}")
+            return False
+        
+        # No processo mestre, cargas que inicializariam o TensorFlow são recusadas
+        inference.set_prefork_parent(True)
+        try:
+            inference.import_keras()
+            print("❌ Keras importado no processo mestre do modo pre-fork")
+            return False
+        except inference.ForkUnsafeBackendError:
+            pass
+        finally:
+            inference.set_prefork_parent(False)
+        
+        print("✅ Contadores dos workers e estatísticas de uso compartilhados entre processos")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do modo pre-fork: {e}")
+        return False
+
+def test_inference_pool():
+    """Testa se o pool de processos traduz igual ao processo do servidor e se recupera de um processo morto"""
+    print("\n🏭 Testando pool de inferência...")
+    
+    model_path = os.path.join(os.path.dirname(__file__), "models", "hausa-english-translator")
+    texts = ["Sannu duniya", "Yaya kake?", "Na gode"]
+    
+    pool = None
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import time
+        import signal
+        from inference import Translator
+        from inference_pool import InferencePool
+        
+        local = Translator(model_path, inference_path="numpy")
+        local.load_model()
+        pool = InferencePool(1)
+        remote = Translator(model_path, inference_path="numpy", inference_pool=pool)
+        remote.load_model()
+        if remote.model is not None or remote.numpy_model is not None:
+            print("❌ Modelo carregado no processo do servidor com o pool habilitado")
+            return False
+        if remote.translate_batch(texts) != local.translate_batch(texts):
+            print("❌ Pool de inferência diverge da inferência no próprio processo")
+            return False
+        
+        # Um processo morto é reiniciado com os modelos e a requisição é repetida
+        os.kill(pool.workers[0].process.pid, signal.SIGKILL)
+        pool.workers[0].process.wait()
+        if remote.translate_batch(texts) != local.translate_batch(texts) or pool.workers[0].restarts != 1:
+            print("❌ Pool de inferência não se recuperou do processo morto")
+            return False
+        
+        # Troca (recarga) com itens na fila do escalonador e uma requisição ainda segurando a instância:
+        # os dois terminam na instância antiga, e o pool só a descarrega quando ninguém mais a usa
+        import gc
+        import app
+        holder = remote
+        scheduler = app.BatchScheduler("pool-swap", remote, window_ms=300)
+        futures = [scheduler.enqueue(text) for text in texts]
+        scheduler.stop()
+        app.release_model_resources("pool-swap", remote)
+        del remote
+        if [future.result(timeout=60) for future in futures] != local.translate_batch(texts):
+            print("❌ Itens na fila do escalonador antigo falharam depois da troca")
+            return False
+        if holder.translate_batch(texts) != local.translate_batch(texts):
+            print("❌ Requisição com a instância antiga falhou depois da troca")
+            return False
+        for thread in scheduler.threads:
+            thread.join(timeout=10)
+        del holder, scheduler, futures
+        gc.collect()
+        deadline = time.time() + 10
+        while pool.stats()["models"] and time.time() < deadline:
+            time.sleep(0.05)
+        if pool.stats()["models"]:
+            print("❌ Modelo não foi descarregado do pool depois da troca")
+            return False
+        
+        print("✅ Pool de inferência equivalente, reiniciado após a queda de um processo e estável na troca")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do pool de inferência: {e}")
+        return False
+    finally:
+        if pool is not None:
+            pool.close()
+
+def test_translate_stream():
+    """Testa a divisão de documentos em trechos e os eventos SSE de /api/translate/stream"""
+    print("\n📡 Testando tradução de documentos por SSE...")
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import app
+        from inference import iter_sentences
+        
+        document = "Sannu duniya. Yaya kake?! Na gode...\nSai an jima\n\n" + "kai " * 300
+        pieces = [document[i:i + 7] for i in range(0, len(document), 7)]
+        if list(iter_sentences(pieces)) != list(iter_sentences([document])):
+            print("❌ Frases diferentes quando o documento chega em pedaços")
+            return False
+        
+        response = app.app.test_client().post("/api/translate/stream?model=hausa-english-translator",
+                                              data=document.encode("utf-8"), content_type="text/plain")
+        events = [event.split("\n", 1) for event in response.get_data(as_text=True).split("\n\n") if event]
+        names = [name[len("event: "):] for name, _ in events]
+        segments = [json.loads(data[len("data: "):]) for name, data in events if name == "event: segment"]
+        translator = app.loaded_translators.peek("hausa-english-translator")
+        if names[0] != "start" or names[-1] != "done" or not segments:
+            print(f"❌ Sequência de eventos inesperada: {names}")
+            return False
+        if [segment["index"] for segment in segments] != list(range(len(segments))):
+            print("❌ Índices dos trechos fora de ordem")
+            return False
+        if max(translator.count_tokens(segment["text"]) for segment in segments) > translator.max_source_len:
+            print("❌ Trecho maior que max_source_len")
+            return False
+        if sum(translator.count_tokens(segment["text"]) for segment in segments) != translator.count_tokens(document):
+            print("❌ Palavras do documento perdidas na divisão em trechos")
+            return False
+        
+        print(f"✅ Documento traduzido em {len(segments)} trechos de até {translator.max_source_len} ids")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste de tradução por SSE: {e}")
+        return False
+
+def test_asgi():
+    """Testa se o servidor assíncrono responde como o app Flask"""
+    print("\n⚡ Testando servidor ASGI...")
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import asyncio
+        import app
+        import asgi_app
+        
+        def asgi_request(method, path, payload=None):
+            body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+            scope = {"type": "http", "method": method, "path": path, "root_path": "", "query_string": b"",
+                     "headers": [(b"content-type", b"application/json")], "http_version": "1.1",
+                     "scheme": "http", "server": ("localhost", 80), "client": ("127.0.0.1", 1)}
+            messages = [{"type": "http.request", "body": body, "more_body": False}]
+            sent = []
+            
+            async def receive():
+                return messages.pop(0) if messages else {"type": "http.disconnect"}
+            
+            async def send(message):
+                sent.append(message)
+            
+            asyncio.run(asgi_app.app(scope, receive, send))
+            content = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+            return sent[0]["status"], json.loads(content)
+        
+        client = app.app.test_client()
+        invalid = {"text": "Sannu"}
+        expected = client.post("/api/translate", json=invalid)
+        if asgi_request("POST", "/api/translate", invalid) != (expected.status_code, expected.get_json()):
+            print("❌ Resposta de parâmetros inválidos diverge do Flask")
+            return False
+        
+        payload = {"text": "Sannu duniya", "model": "hausa-english-translator", "use_corrections": False}
+        expected = client.post("/api/translate", json=payload).get_json()
+        app.translation_cache.invalidate_model("hausa-english-translator")
+        fast_path = asgi_app.requests_in_flight["fast_path"]
+        status, translated = asgi_request("POST", "/api/translate", payload)
+        if status != 200 or translated != expected or asgi_app.requests_in_flight["fast_path"] != fast_path + 1:
+            print(f"❌ Tradução pelo loop diverge do Flask: {translated} != {expected}")
+            return False
+        
+        status, report = asgi_request("GET", "/api/status")
+        if status != 200 or "asgi" not in report or "model_manager" not in report:
+            print("❌ /api/status do servidor ASGI incompleto")
+            return False
+        
+        def asgi_upload(path, query, parts):
+            """Envia o corpo em partes, como um cliente lento; registra as tarefas no executor enquanto espera cada parte"""
+            scope = {"type": "http", "method": "POST", "path": path, "root_path": "", "query_string": query.encode(),
+                     "headers": [(b"content-type", b"text/plain")], "http_version": "1.1",
+                     "scheme": "http", "server": ("localhost", 80), "client": ("127.0.0.1", 1)}
+            messages = [{"type": "http.request", "body": part, "more_body": index < len(parts) - 1}
+                        for index, part in enumerate(parts)]
+            sent, pending = [], []
+            
+            async def receive():
+                if messages:
+                    if len(messages) < len(parts):
+                        await asyncio.sleep(0.05)
+                        pending.append(asgi_app.executor.pending)
+                    return messages.pop(0)
+                await asyncio.Event().wait()
+            
+            async def send(message):
+                sent.append(message)
+            
+            asyncio.run(asgi_app.app(scope, receive, send))
+            content = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+            return sent[0]["status"], content.decode("utf-8"), pending
+        
+        def translated_segments(events):
+            return [json.loads(event.split("data: ", 1)[1])["translated_text"]
+                    for event in events.split("\n\n") if event.startswith("event: segment")]
+        
+        # Documento em texto puro enviado aos poucos: nenhuma thread do executor espera pelo cliente
+        document = "Sannu duniya. Yaya kake?\nNa gode. " * 20
+        query = "model=hausa-english-translator&use_corrections=false"
+        expected = client.post(f"/api/translate/stream?{query}", data=document.encode("utf-8"),
+                               content_type="text/plain").get_data(as_text=True)
+        parts = [document.encode("utf-8")[start:start + 97] for start in range(0, len(document), 97)]
+        status, events, pending = asgi_upload("/api/translate/stream", query, parts)
+        if status != 200 or translated_segments(events) != translated_segments(expected) or "event: done" not in events:
+            print("❌ Tradução por SSE do servidor ASGI diverge do Flask")
+            return False
+        if any(pending):
+            print(f"❌ Executor ocupado enquanto o cliente enviava o documento: {pending}")
+            return False
+        
+        # Arquivo de /api/jobs enviado aos poucos: gravado em disco pelo loop, sem segurar o executor
+        from translation_jobs import TranslationJobs
+        jobs = app.translation_jobs
+        with tempfile.TemporaryDirectory() as directory:
+            app.translation_jobs = TranslationJobs(directory, app.translate_documents)
+            try:
+                content = "".join(f"{i}\tsannu {i}\n" for i in range(200)).encode("utf-8")
+                status, body, pending = asgi_upload("/api/jobs", "model=hausa-english-translator&filename=a.tsv&column=1",
+                                                    [content[start:start + 500] for start in range(0, len(content), 500)])
+                job = app.translation_jobs.load(json.loads(body)["job"]["id"])
+                if status != 202 or open(os.path.join(directory, job["id"], "input"), "rb").read() != content:
+                    print("❌ Arquivo enviado ao servidor ASGI não foi gravado por inteiro")
+                    return False
+                if any(pending) or any(name.startswith(".upload-") for name in os.listdir(directory)):
+                    print(f"❌ Envio do arquivo segurou o executor ou deixou o arquivo temporário: {pending}")
+                    return False
+                app.translation_jobs.run_job(job["id"])
+                sent = []
+                
+                async def receive():
+                    await asyncio.Event().wait()
+                
+                async def send(message):
+                    sent.append(message)
+                
+                scope = {"type": "http", "method": "GET", "path": f"/api/jobs/{job['id']}/download", "root_path": "",
+                         "query_string": b"", "headers": [], "http_version": "1.1", "scheme": "http",
+                         "server": ("localhost", 80), "client": ("127.0.0.1", 1)}
+                asyncio.run(asgi_app.app(scope, receive, send))
+                downloaded = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+                if sent[0]["status"] != 200 or downloaded != open(os.path.join(directory, job["id"], "output"), "rb").read():
+                    print("❌ Download do arquivo traduzido pelo servidor ASGI incorreto")
+                    return False
+            finally:
+                app.translation_jobs = jobs
+        
+        print("✅ Servidor ASGI com as mesmas respostas do Flask, tradução aguardada no loop e envios lentos lidos no loop")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do servidor ASGI: {e}")
+        return False
+
+def test_translation_jobs():
+    """Testa tarefas de tradução de arquivos: formatos e retomada do último bloco concluído"""
+    print("\n📦 Testando tarefas de tradução de arquivos...")
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        from translation_jobs import TranslationJobs
+        
+        failures = []
+        
+        def translate(model_id, texts, use_corrections):
+            if failures and failures.pop():
+                raise RuntimeError("falha simulada")
+            return [text.upper() for text in texts]
+        
+        documents = {
+            "corpus.tsv": "".join(f"{i}\tsannu {i}\n" for i in range(10)).encode("utf-8"),
+            "pares.json": json.dumps({"project": "teste", "pairs": [{"source": f"na gode {i}"} for i in range(10)],
+                                      "total": 10}).encode("utf-8")
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            jobs = TranslationJobs(directory, translate, chunk_records=3)
+            for filename, content in documents.items():
+                reference = jobs.create("modelo", filename, [content], column=1)
+                jobs.run_job(reference["id"])
+                expected = open(jobs.load(reference["id"])["output_path"], "rb").read()
+                
+                # Falha no segundo bloco: a retomada continua do primeiro bloco gravado
+                failures[:] = [True, False]
+                job = jobs.create("modelo", filename, [content[:7], content[7:]], column=1)
+                jobs.run_job(job["id"])
+                if jobs.load(job["id"])["status"] != "failed" or jobs.load(job["id"])["chunks_done"] != 1:
+                    print(f"❌ {filename}: falha não registrada no bloco esperado")
+                    return False
+                jobs.requeue(job["id"])
+                jobs.run_job(job["id"])
+                job = jobs.load(job["id"])
+                if job["status"] != "completed" or job["records_done"] != 10 or job["runs"] != 2:
+                    print(f"❌ {filename}: tarefa não retomada ({job['status']}, {job['records_done']} registros)")
+                    return False
+                if open(job["output_path"], "rb").read() != expected:
+                    print(f"❌ {filename}: saída retomada diferente da saída sem interrupção")
+                    return False
+            
+            output = json.loads(expected)
+            if output["total"] != 10 or output["pairs"][9] != {"source": "na gode 9", "translation": "NA GODE 9"}:
+                print("❌ JSON traduzido sem as chaves originais")
+                return False
+        
+        print("✅ Tarefas TSV/JSON retomadas do último bloco com saída idêntica")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste de tarefas de tradução: {e}")
+        return False
+
+class FakeTranslator:
+    """Tradutor de teste: converte para maiúsculas e registra cada lote recebido.
+
+    Com `gate` (threading.Event) cada lote espera o evento antes de responder.
+    """
+
+    pool_key = None
+
+    def __init__(self, gate=None):
+        import threading
+        self.batches = []
+        self.lock = threading.Lock()
+        self.last_used = None
+        self.gate = gate
+
+    def translate_batch(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        if self.gate is not None:
+            self.gate.wait()
+        return [text.upper() for text in texts]
+
+    def translate(self, text):
+        return self.translate_batch([text])[0]
+
+def test_batch_scheduler():
+    """Testa se requisições concorrentes são agrupadas numa única passada do modelo sem atrasar o servidor ocioso"""
+    print("\n🧺 Testando escalonador de micro-lotes...")
+
+    texts = [f"texto {index}" for index in range(6)]
+    scheduler = None
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import threading
+        import time
+        import app
+
+        gate = threading.Event()
+        translator = FakeTranslator(gate)
+        scheduler = app.BatchScheduler("batch-test", translator, window_ms=500, max_batch_size=len(texts))
+
+        # Servidor ocioso: a primeira requisição é despachada sem esperar a janela de 500 ms
+        results = {}
+        first = threading.Thread(target=lambda: results.update(primeiro=scheduler.submit("primeiro")))
+        first.start()
+        deadline = time.time() + 0.25
+        while not translator.batches and time.time() < deadline:
+            time.sleep(0.005)
+        if translator.batches != [["primeiro"]]:
+            print("❌ Requisição com o servidor ocioso esperou a janela de agregação")
+            return False
+
+        # Com um lote em execução, as requisições que chegam juntas esperam e viram um único lote
+        def submit(text):
+            results[text] = scheduler.submit(text)
+
+        threads = [threading.Thread(target=submit, args=(text,)) for text in texts]
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 10
+        while scheduler.stats()['queue_depth'] < len(texts) and time.time() < deadline:
+            time.sleep(0.005)
+        gate.set()
+        for thread in [first] + threads:
+            thread.join(timeout=30)
+
+        if results != {text: text.upper() for text in ["primeiro"] + texts}:
+            print(f"❌ Resultados trocados entre as requisições: {results}")
+            return False
+        stats = scheduler.stats()
+        if translator.batches[1:] != [texts] or stats['batches'] != 2 or stats['requests'] != len(texts) + 1:
+            print(f"❌ Requisições concorrentes não foram agrupadas: {translator.batches}")
+            return False
+        if stats['batch_size_distribution'] != {"1": 1, str(len(texts)): 1} or stats['immediate_dispatches'] != 1:
+            print(f"❌ Distribuição de tamanhos de lote incorreta: {stats['batch_size_distribution']}")
+            return False
+
+        print(f"✅ Requisição isolada despachada na hora e {len(texts)} requisições concorrentes num único lote")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do escalonador: {e}")
+        return False
+    finally:
+        if scheduler is not None:
+            gate.set()
+            scheduler.stop()
+
+def test_translation_cache():
+    """Testa se o cache de traduções é invalidado quando o modelo é trocado ou descarregado"""
+    print("\n🗃️ Testando cache de traduções...")
+
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import app
+
+        cache = app.translation_cache
+        manager = app.ModelManager(budget_mb=0)
+        manager.on_evict = app.release_model_resources
+        manager.on_swap = app.release_model_resources
+        old, new = FakeTranslator(), FakeTranslator()
+        manager.add("cache-test", old)
+
+        cache.put("cache-test", "v1", "Sannu duniya", "Hello world")
+        cache.put("cache-outro", "v1", "Sannu duniya", "Hi world")
+        if cache.get("cache-test", "v1", "sannu duniya!") != "Hello world":
+            print("❌ Texto normalizado não encontrado no cache")
+            return False
+
+        manager.swap("cache-test", new, old)
+        if cache.get("cache-test", "v1", "Sannu duniya") is not None:
+            print("❌ Cache não foi invalidado na troca do modelo")
+            return False
+        if cache.get("cache-outro", "v1", "Sannu duniya") != "Hi world":
+            print("❌ Troca de um modelo invalidou o cache de outro")
+            return False
+
+        cache.put("cache-test", "v2", "Sannu duniya", "Hello world")
+        manager.remove("cache-test")
+        if cache.get("cache-test", "v2", "Sannu duniya") is not None:
+            print("❌ Cache não foi invalidado no despejo do modelo")
+            return False
+        cache.invalidate_model("cache-outro")
+
+        print("✅ Cache invalidado na troca e no despejo, sem afetar outros modelos")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do cache de traduções: {e}")
+        return False
+
+def test_model_manager():
+    """Testa se o gerenciador de modelos despeja o menos usado para caber no orçamento de memória"""
+    print("\n🧠 Testando gerenciador de modelos (LRU)...")
+
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import threading
+        import app
+
+        manager = app.ModelManager(budget_mb=100)
+        evicted, blocked = [], []
+
+        def on_evict(model_id, translator):
+            # O despejo roda fora do lock: outra thread consegue consultar o gerenciador enquanto isso
+            reader = threading.Thread(target=manager.peek, args=(model_id,))
+            reader.start()
+            reader.join(timeout=5)
+            blocked.append(reader.is_alive())
+            evicted.append(model_id)
+
+        manager.on_evict = on_evict
+
+        manager.add("modelo-a", FakeTranslator(), memory_mb=40)
+        manager.add("modelo-b", FakeTranslator(), memory_mb=40)
+        manager.get("modelo-a")  # modelo-b passa a ser o menos usado
+        manager.add("modelo-c", FakeTranslator(), memory_mb=40)
+        if evicted != ["modelo-b"] or list(manager.entries) != ["modelo-a", "modelo-c"]:
+            print(f"❌ Despejo não seguiu a ordem LRU: despejados {evicted}, carregados {list(manager.entries)}")
+            return False
+        if manager.used_mb() > manager.budget_mb or manager.stats()['evictions'] != 1:
+            print(f"❌ Orçamento de memória excedido: {manager.stats()}")
+            return False
+
+        # Antes de carregar, a estimativa do novo modelo (média dos medidos) já abre espaço
+        manager.ensure_capacity(manager.estimate_mb("modelo-d"))
+        if evicted != ["modelo-b", "modelo-a"] or manager.used_mb() + 40 > manager.budget_mb:
+            print(f"❌ Espaço não foi liberado antes do carregamento: despejados {evicted}")
+            return False
+
+        # Recarregar um modelo já carregado também despeja (e conta) a instância anterior
+        manager.add("modelo-c", FakeTranslator(), memory_mb=40)
+        if evicted[-1] != "modelo-c" or manager.stats()['evictions'] != 3:
+            print(f"❌ Substituição não contada como despejo: {manager.stats()}")
+            return False
+        if any(blocked):
+            print("❌ Consultas ao gerenciador bloqueadas durante o despejo")
+            return False
+
+        print("✅ Modelos menos usados despejados dentro do orçamento de memória")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do gerenciador de modelos: {e}")
+        return False
+
+def test_single_flight_loading():
+    """Testa se requisições concorrentes por um modelo não carregado disparam um único carregamento"""
+    print("\n🛫 Testando carregamento single-flight...")
+
+    app = None
+    original_load_translator = None
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import threading
+        import time
+        import app
+
+        loads = []
+
+        def slow_load(model_id):
+            loads.append(model_id)
+            time.sleep(0.5)
+            translator = FakeTranslator()
+            app.loaded_translators.add(model_id, translator)
+            return translator
+
+        original_load_translator = app.load_translator
+        app.load_translator = slow_load
+        barrier = threading.Barrier(8)
+        results = []
+
+        def request():
+            barrier.wait()
+            results.append(app.get_or_load_translator("single-flight-test"))
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+        if loads != ["single-flight-test"]:
+            print(f"❌ {len(loads)} carregamentos para 8 requisições concorrentes")
+            return False
+        if len(results) != 8 or any(result is not results[0] for result in results):
+            print("❌ Requisições concorrentes receberam instâncias diferentes")
+            return False
+        if app.model_loading_futures:
+            print(f"❌ Carregamentos pendentes não foram limpos: {list(app.model_loading_futures)}")
+            return False
+
+        print("✅ 8 requisições concorrentes compartilharam um único carregamento")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste de carregamento single-flight: {e}")
+        return False
+    finally:
+        if original_load_translator is not None:
+            app.load_translator = original_load_translator
+            app.loaded_translators.remove("single-flight-test")
+
+def test_preload_readiness():
+    """Testa se /api/ready responde 503 enquanto o pré-carregamento não termina e 200 depois"""
+    print("\n🚦 Testando prontidão do pré-carregamento...")
+
+    app = None
+    original_load_translator = None
+    original_preloader = None
+    model_ids = ["preload-test-a", "preload-test-b"]
+    gate = None
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import threading
+        import time
+        import app
+
+        gate = threading.Event()
+
+        def gated_load(model_id):
+            gate.wait(timeout=30)
+            translator = FakeTranslator()
+            app.loaded_translators.add(model_id, translator)
+            return translator
+
+        original_load_translator = app.load_translator
+        original_preloader = app.model_preloader
+        app.load_translator = gated_load
+        app.model_preloader = app.ModelPreloader(max_workers=2)
+        client = app.app.test_client()
+
+        # O servidor responde enquanto os modelos carregam, mas ainda não está pronto
+        app.model_preloader.start(model_ids)
+        response = client.get('/api/ready')
+        states = {model_id: state['state'] for model_id, state in response.get_json()['models'].items()}
+        if response.status_code != 503 or set(states) != set(model_ids) or 'ready' in states.values():
+            print(f"❌ /api/ready antes do pré-carregamento: {response.status_code} {states}")
+            return False
+
+        gate.set()
+        deadline = time.monotonic() + 10
+        while not app.model_preloader.status()['ready'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        response = client.get('/api/ready')
+        status = response.get_json()
+        if response.status_code != 200 or any(state['load_ms'] is None for state in status['models'].values()):
+            print(f"❌ /api/ready depois do pré-carregamento: {response.status_code} {status}")
+            return False
+
+        print(f"✅ /api/ready: 503 durante o pré-carregamento, 200 com {len(model_ids)} modelos prontos")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste de prontidão do pré-carregamento: {e}")
+        return False
+    finally:
+        if gate is not None:
+            gate.set()
+        if original_load_translator is not None:
+            app.load_translator = original_load_translator
+            app.model_preloader = original_preloader
+            for model_id in model_ids:
+                app.loaded_translators.remove(model_id)
+
+def test_shared_artifacts():
+    """Testa se duas cópias da mesma pasta de modelo compartilham os artefatos carregados"""
+    print("\n🔗 Testando compartilhamento de artefatos...")
+
+    model_path = os.path.join(os.path.dirname(__file__), "models", "hausa-english-translator")
+
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import shutil
+        from inference import Translator, shared_artifacts
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            copies = []
+            for name in ("copia-a", "copia-b"):
+                copy_path = os.path.join(temp_dir, name)
+                shutil.copytree(model_path, copy_path, ignore=shutil.ignore_patterns("*.tflite"))
+                copies.append(copy_path)
+            first = Translator(copies[0])
+            first.load_model()
+            hits_before = shared_artifacts.stats()['hits']
+            second = Translator(copies[1])
+            second.load_model()
+
+        if first.model is not second.model or first.compiled_source_tokenizer is not second.compiled_source_tokenizer:
+            print("❌ Cópias idênticas do modelo carregaram objetos separados")
+            return False
+        if "model.keras" not in second.shared_artifacts or shared_artifacts.stats()['hits'] <= hits_before:
+            print(f"❌ Reutilização não registrada: {second.shared_artifacts}")
+            return False
+        if first.translate_batch(["Sannu duniya"]) != second.translate_batch(["Sannu duniya"]):
+            print("❌ Cópias com artefatos compartilhados traduzem diferente")
+            return False
+
+        print(f"✅ Cópias do modelo compartilham {len(second.shared_artifacts)} artefatos: {second.shared_artifacts}")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste de compartilhamento de artefatos: {e}")
+        return False
+
+def test_model_registry():
+    """Testa o catálogo de modelos: nova varredura só quando a pasta ou um config.json muda"""
+    print("\n🗂️ Testando catálogo de modelos...")
+    
+    def write_config(model_dir, target_language, mtime):
+        os.makedirs(model_dir, exist_ok=True)
+        config_path = os.path.join(model_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({"source_language": "hausa", "target_language": target_language}, f)
+        # mtime explícito: duas gravações no mesmo instante teriam o mesmo mtime
+        os.utime(config_path, (mtime, mtime))
+    
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import shutil
+        import app
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_config(os.path.join(temp_dir, "modelo_a"), "english", 1000)
+            registry = app.ModelRegistry(temp_dir, check_interval=0)
+            if registry.get("modelo_a")["target_language"] != "english":
+                print("❌ Modelo não encontrado no catálogo")
+                return False
+            
+            # Sem mudanças, consultas seguidas não varrem a pasta de novo
+            for _ in range(5):
+                registry.list()
+                registry.get("modelo_a")
+            if registry.scans != 1:
+                print(f"❌ Pasta varrida de novo sem mudanças: {registry.scans} varreduras")
+                return False
+            
+            # config.json alterado, modelo novo e modelo removido são vistos na consulta seguinte
+            write_config(os.path.join(temp_dir, "modelo_a"), "french", 2000)
+            if registry.get("modelo_a")["target_language"] != "french":
+                print("❌ Alteração do config.json não detectada")
+                return False
+            write_config(os.path.join(temp_dir, "modelo_b"), "english", 3000)
+            if registry.get("modelo_b") is None:
+                print("❌ Modelo novo não detectado")
+                return False
+            shutil.rmtree(os.path.join(temp_dir, "modelo_a"))
+            if registry.get("modelo_a") is not None or [m["id"] for m in registry.list()] != ["modelo_b"]:
+                print("❌ Modelo removido continua no catálogo")
+                return False
+            
+            # Dentro do intervalo de verificação as mudanças só aparecem com refresh explícito
+            slow = app.ModelRegistry(temp_dir, check_interval=3600)
+            slow.list()
+            write_config(os.path.join(temp_dir, "modelo_c"), "english", 4000)
+            if slow.get("modelo_c") is not None:
+                print("❌ Pasta verificada antes do intervalo")
+                return False
+            slow.refresh()
+            if slow.get("modelo_c") is None:
+                print("❌ refresh explícito não encontrou o modelo novo")
+                return False
+        
+        print(f"✅ Catálogo atualizado só com mudanças ({registry.scans} varreduras para 8+ consultas)")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste do catálogo de modelos: {e}")
+        return False
+
+def test_hot_reload():
+    """Testa se a recarga troca a instância no ar sem interromper quem ainda usa a antiga"""
+    print("\n♻️ Testando recarga sem indisponibilidade...")
+
+    model_path = os.path.join(os.path.dirname(__file__), "models", "hausa-english-translator")
+    texts = ["Sannu duniya", "Yaya kake?", "Na gode"]
+
+    app = None
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        import threading
+        from inference import Translator
+        import app
+
+        old = Translator(model_path)
+        old.load_model()
+        expected = old.translate_batch(texts)
+        app.loaded_translators.add("reload-test", old, memory_mb=40)
+
+        # Sem espaço no orçamento para a nova versão ao lado da atual, a recarga é adiada
+        budget_mb = app.loaded_translators.budget_mb
+        app.loaded_translators.budget_mb = 60
+        try:
+            deferred = app.ModelReloader(interval=0)
+            if deferred.reload("reload-test", old) or deferred.models["reload-test"]['state'] != 'deferred':
+                print("❌ Recarga não foi adiada sem memória para a nova versão")
+                return False
+        finally:
+            app.loaded_translators.budget_mb = budget_mb
+        if app.loaded_translators.peek("reload-test") is not old or app.loaded_translators.reserved_mb != 0:
+            print("❌ Recarga adiada alterou o modelo no ar ou deixou memória reservada")
+            return False
+
+        scheduler = app.BatchScheduler("reload-test", old, window_ms=200)
+        with app.batch_schedulers_lock:
+            app.batch_schedulers["reload-test"] = scheduler
+        queued = [scheduler.enqueue(text) for text in texts]
+
+        # Requisições com a instância antiga continuam durante toda a recarga
+        stop = threading.Event()
+        answers, errors = [], []
+
+        def keep_translating():
+            while not stop.is_set():
+                try:
+                    answers.append(app.run_translation("reload-test", old, texts[0]))
+                except Exception as e:
+                    errors.append(e)
+
+        worker = threading.Thread(target=keep_translating)
+        worker.start()
+        try:
+            reloaded = app.ModelReloader(interval=0).reload("reload-test", old, ["model.keras"])
+        finally:
+            stop.set()
+            worker.join(timeout=30)
+
+        current = app.loaded_translators.peek("reload-test")
+        if not reloaded or current is old or current is None:
+            print("❌ Nova versão não foi trocada pela instância no ar")
+            return False
+        if app.loaded_translators.model_state("reload-test")['memory_mb'] != 40:
+            print("❌ Recarga trocou o tamanho conhecido do modelo por um delta de RSS")
+            return False
+        if errors or not answers or set(answers) != {expected[0]}:
+            print(f"❌ Instância antiga falhou durante a recarga: {errors[:1]}")
+            return False
+        if [future.result(timeout=30) for future in queued] != expected:
+            print("❌ Itens na fila do escalonador antigo não terminaram depois da troca")
+            return False
+        if app.run_translation("reload-test", old, texts[1]) != expected[1] or current.translate_batch(texts) != expected:
+            print("❌ Instâncias antiga e nova divergem depois da troca")
+            return False
+
+        print(f"✅ Instância antiga respondeu {len(answers)} requisições durante a recarga e continua respondendo depois da troca")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste de recarga: {e}")
+        return False
+    finally:
+        if app is not None:
+            app.loaded_translators.remove("reload-test")
+
+def test_corrections():
+    """Testa a migração dos arquivos JSON para o SQLite, os filtros e a paginação de /api/corrections"""
+    print("\n📝 Testando correções...")
+
+    app = None
+    saved = None
+    try:
+        sys.path.insert(0, os.path.dirname(__file__))
+        from corrections_store import CorrectionsStore
+        import app
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            corrections_dir = os.path.join(temp_dir, "corrections")
+            os.makedirs(corrections_dir)
+            legacy = [
+                ("2025-01-01T10-00-00-000001", "modelo-a", "hausa", "english", "2025-01-01T10:00:00.000001"),
+                ("2025-01-02T10-00-00-000001", "modelo-b", "english", "snejag", "2025-01-02T10:00:00.000001"),
+                ("2025-01-03T10-00-00-000001", "modelo-a", "hausa", "english", "2025-01-03T10:00:00.000001"),
+            ]
+            for correction_id, model_id, source_lang, target_lang, timestamp in legacy:
+                with open(os.path.join(corrections_dir, f"{correction_id}.json"), 'w', encoding='utf-8') as f:
+                    json.dump({'sourceText': f"texto {correction_id}", 'correctedTranslation': "corrigido",
+                               'modelId': model_id, 'sourceLang': source_lang, 'targetLang': target_lang,
+                               'timestamp': timestamp}, f)
+
+            # Migração única e idempotente do layout antigo (um arquivo JSON por correção)
+            store = CorrectionsStore(os.path.join(temp_dir, "corrections.db"))
+            if store.migrate_directory(corrections_dir) != 3 or store.migrate_directory(corrections_dir) != 0:
+                print("❌ Migração dos arquivos JSON não importou cada correção exatamente uma vez")
+                return False
+
+            everything, cursor = store.query(limit=None)
+            if [c['id'] for c in everything] != [c[0] for c in reversed(legacy)] or cursor is not None:
+                print(f"❌ Correções migradas fora de ordem: {[c['id'] for c in everything]}")
+                return False
+            by_model, _ = store.query(model_id="modelo-a", limit=None)
+            recent, _ = store.query(source_lang="hausa", since="2025-01-02", limit=None)
+            if [c['id'] for c in by_model] != [legacy[2][0], legacy[0][0]] or [c['id'] for c in recent] != [legacy[2][0]]:
+                print("❌ Filtros por modelo, idioma ou data incorretos")
+                return False
+
+            # Páginas via API: sem limit nem cursor vem tudo; com limit, seguir next_cursor
+            saved = (app.corrections_store, app.corrections_index, app.CORRECTIONS_DIR)
+            app.corrections_store = store
+            app.corrections_index = app.CorrectionsIndex(store, corrections_dir)
+            app.corrections_index.rebuild()
+            app.CORRECTIONS_DIR = corrections_dir
+            client = app.app.test_client()
+
+            response = client.post('/api/corrections', json={'sourceText': "Sannu", 'correctedTranslation': "Hello",
+                                                             'modelId': "modelo-b"})
+            new_id = response.get_json()['correction']['id']
+            if not os.path.exists(os.path.join(corrections_dir, f"{new_id}.json")):
+                print("❌ Correção nova não foi gravada também como arquivo JSON")
+                return False
+
+            full = client.get('/api/corrections').get_json()
+            if len(full['corrections']) != 4 or full['next_cursor'] is not None or full['stats']['total'] != 4:
+                print(f"❌ GET /api/corrections sem parâmetros não retornou todas as correções: {len(full['corrections'])}")
+                return False
+            pages, after = [], None
+            while True:
+                query = {'limit': 3, 'after': after} if after else {'limit': 3}
+                page = client.get('/api/corrections', query_string=query).get_json()
+                pages.append([c['id'] for c in page['corrections']])
+                after = page['next_cursor']
+                if after is None:
+                    break
+            if [len(page) for page in pages] != [3, 1] or sum(pages, []) != [c['id'] for c in full['corrections']]:
+                print(f"❌ Paginação por cursor incorreta: {pages}")
+                return False
+            filtered = client.get('/api/corrections', query_string={'model_id': "modelo-b", 'limit': 1}).get_json()
+            if [c['modelId'] for c in filtered['corrections']] != ["modelo-b"] or filtered['stats']['total'] != 2:
+                print("❌ Filtro da API não aplicado à página e às estatísticas")
+                return False
+            if client.get('/api/corrections', query_string={'after': "invalido"}).status_code != 400:
+                print("❌ Cursor inválido não foi recusado")
+                return False
+
+            # Gravação de outro processo: só entra no índice depois do intervalo, sem reconstruí-lo
+            index = app.CorrectionsIndex(store, corrections_dir, check_interval=3600)
+            index.rebuild()
+            other = CorrectionsStore(store.db_path)
+            other.add({'sourceText': "Na gode", 'correctedTranslation': "Thanks", 'modelId': "modelo-a",
+                       'timestamp': "2025-02-01T10:00:00"}, "outro-processo")
+            other.close()
+            if index.lookup("Na gode", "modelo-a") is not None:
+                print("❌ Índice consultou o banco antes do intervalo de verificação")
+                return False
+            index.check_interval = 0
+            if (index.lookup("Na gode", "modelo-a") or {}).get('correctedTranslation') != "Thanks" or index.rebuilds != 1:
+                print("❌ Correção de outro processo não foi aplicada incrementalmente ao índice")
+                return False
+            store.close()
+
+        print("✅ Arquivos JSON migrados uma vez, filtros e páginas por cursor corretos, lista completa sem parâmetros")
+        return True
+    except Exception as e:
+        print(f"❌ Erro no teste de correções: {e}")
+        return False
+    finally:
+        if saved is not None:
+            app.corrections_store, app.corrections_index, app.CORRECTIONS_DIR = saved
+
 def main():
     """Função principal"""
     print("🚀 Iniciando testes do sistema...")
@@ -129,7 +1399,28 @@ def main():
         ("Importações", test_imports),
         ("Modelos", test_models),
         ("Estrutura", test_app_structure),
-        ("App", test_app_import)
+        ("App", test_app_import),
+        ("Importações sob demanda", test_lazy_imports),
+        ("Lote", test_batch_translation),
+        ("Caminho compilado", test_compiled_path),
+        ("Buckets de comprimento", test_length_bucketing),
+        ("Tokenizador", test_compiled_tokenizer),
+        ("Motor NumPy", test_numpy_engine),
+        ("Backend TFLite", test_tflite_backend),
+        ("Pre-fork", test_prefork),
+        ("Pool de inferência", test_inference_pool),
+        ("Servidor ASGI", test_asgi),
+        ("Tradução por SSE", test_translate_stream),
+        ("Tarefas de arquivos", test_translation_jobs),
+        ("Micro-lotes", test_batch_scheduler),
+        ("Cache de traduções", test_translation_cache),
+        ("Gerenciador de modelos", test_model_manager),
+        ("Carregamento single-flight", test_single_flight_loading),
+        ("Prontidão do pré-carregamento", test_preload_readiness),
+        ("Artefatos compartilhados", test_shared_artifacts),
+        ("Catálogo de modelos", test_model_registry),
+        ("Recarga de modelos", test_hot_reload),
+        ("Correções", test_corrections)
     ]
     
     passed = 0
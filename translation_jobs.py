@@ -0,0 +1,538 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tarefas de tradução em massa de arquivos (TSV, TXT e exportações JSON de projetos)
+
+Cada tarefa tem uma pasta em JOBS_DIR com o arquivo enviado (input), a saída
+parcial (output.part) e o estado (job.json). Uma thread em segundo plano
+processa o arquivo como um pipeline em streaming: lê um bloco de registros,
+traduz o bloco em lote e grava a saída do bloco. Só um bloco fica na memória,
+seja qual for o tamanho do arquivo.
+
+Depois de cada bloco a saída é sincronizada no disco e o job.json registra a
+posição no arquivo de entrada e o tamanho da saída. Depois de um reinício a
+tarefa continua do último bloco concluído: a saída é truncada nesse tamanho e
+a leitura recomeça nessa posição.
+
+Formatos:
+- tsv: uma linha por registro; a coluna `column` é traduzida e a tradução é
+  acrescentada como nova coluna (ex.: data/hau.txt)
+- txt: uma linha por registro; a saída tem a tradução de cada linha
+- json: exportação de projeto ({"project", "metadata", "pairs": [...]}) ou lista
+  de registros; cada par recebe o campo "translation" com a tradução de "source"
+"""
+
+import os
+import re
+import json
+import uuid
+import codecs
+import queue
+import time
+import datetime
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos (um único processo processa as tarefas)
+    fcntl = None
+
+FORMATS = ("tsv", "txt", "json")
+# Registros traduzidos (e gravados) por bloco
+DEFAULT_CHUNK_RECORDS = 64
+# Leitura do arquivo de entrada e cópia do upload
+READ_BYTES = 64 * 1024
+# Quantos bytes do início do arquivo são olhados para distinguir TSV de TXT
+SNIFF_BYTES = 64 * 1024
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# Tarefas que voltam à fila quando o servidor inicia
+UNFINISHED_STATUSES = ("queued", "running")
+# Envios gravados em disco antes de virarem tarefa (upload_path); os abandonados numa
+# queda do servidor são apagados no início depois de UPLOAD_MAX_AGE segundos
+UPLOAD_PREFIX = ".upload-"
+UPLOAD_MAX_AGE = 3600
+
+
+def detect_format(input_path, filename):
+    """Formato pela extensão; .txt (e extensões desconhecidas) com tabulação na primeira linha são TSV"""
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if extension == "json":
+        return "json"
+    if extension in ("tsv", "tab"):
+        return "tsv"
+    with open(input_path, "rb") as f:
+        first_line = f.read(SNIFF_BYTES).split(b"\n", 1)[0]
+    return "tsv" if b"\t" in first_line else "txt"
+
+
+class LinesFormat:
+    """TXT e TSV: um registro por linha; a posição de retomada é o byte depois da última linha do bloco"""
+
+    def __init__(self, input_path, column=0, tabular=False):
+        self.input_path = input_path
+        self.column = column
+        self.tabular = tabular
+        self.file = None
+
+    def open(self, state):
+        self.file = open(self.input_path, "rb")
+        self.file.seek(state.get("offset", 0))
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def prefix(self):
+        return ""
+
+    def suffix(self):
+        return ""
+
+    def read(self, count):
+        records = []
+        while len(records) < count:
+            line = self.file.readline()
+            if not line:
+                break
+            records.append(line.decode("utf-8").rstrip("\r\n"))
+        return records
+
+    def text(self, record):
+        if not self.tabular:
+            return record
+        columns = record.split("\t")
+        return columns[self.column] if self.column < len(columns) else ""
+
+    def render(self, record, translation):
+        translation = " ".join(translation.split())
+        return f"{record}\t{translation}\n" if self.tabular else f"{translation}\n"
+
+    def state(self):
+        return {"offset": self.file.tell()}
+
+
+class JsonReader:
+    """Leitor incremental de JSON sobre um arquivo binário, com a posição em bytes.
+
+    Só o trecho ainda não consumido fica no buffer; cada valor é decodificado
+    com `raw_decode` assim que está completo no buffer.
+    """
+
+    def __init__(self, file, offset=0):
+        self.file = file
+        self.file.seek(offset)
+        if offset == 0 and self.file.read(3) != codecs.BOM_UTF8:
+            self.file.seek(0)
+        self.base = self.file.tell()
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Descarta o que já foi consumido e lê mais um pedaço; False no fim do arquivo"""
+        consumed = self.buffer[:self.pos]
+        self.base += len(consumed.encode("utf-8"))
+        chunk = self.file.read(READ_BYTES)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return not self.eof
+
+    def offset(self):
+        return self.base + len(self.buffer[:self.pos].encode("utf-8"))
+
+    def peek(self):
+        """Próximo caractere depois de espaços em branco ('' no fim do arquivo)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, *chars):
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"JSON inválido perto do byte {self.offset()}: esperado {' ou '.join(chars)}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self._fill():
+                    raise ValueError(f"JSON inválido ou incompleto perto do byte {self.offset()}")
+                continue
+            # Um número no fim do buffer pode continuar no próximo pedaço
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+class JsonFormat:
+    """Exportação de projeto ({..., "pairs": [...]}) ou lista de registros, lida registro a registro.
+
+    A posição de retomada é o byte depois do último registro do bloco; as
+    chaves antes de "pairs" já estão na saída e as seguintes são copiadas no fim.
+    """
+
+    records_key = "pairs"
+
+    def __init__(self, input_path):
+        self.input_path = input_path
+        self.file = None
+        self.reader = None
+        self.container = None
+        self.records = 0
+        self.done = False
+        self.header = ""
+
+    def open(self, state):
+        self.file = open(self.input_path, "rb")
+        self.records = state.get("records", 0)
+        if "offset" in state:
+            # Retomada: dentro da lista de registros, logo depois do último registro concluído
+            self.container = state["container"]
+            self.reader = JsonReader(self.file, state["offset"])
+            return
+        self.reader = JsonReader(self.file)
+        opening = self.reader.expect("{", "[")
+        if opening == "[":
+            self.container = "array"
+            self.header = "["
+            return
+        self.container = "object"
+        parts = []
+        while True:
+            if self.reader.peek() == "}":
+                raise ValueError(f'Nenhuma lista "{self.records_key}" encontrada no JSON')
+            if parts:
+                self.reader.expect(",")
+            key = self.reader.value()
+            self.reader.expect(":")
+            if key == self.records_key and self.reader.peek() == "[":
+                self.reader.expect("[")
+                parts.append(f"{json.dumps(key)}: [")
+                break
+            parts.append(f"{json.dumps(key)}: {json.dumps(self.reader.value(), ensure_ascii=False)}")
+        self.header = "{" + ", ".join(parts)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def prefix(self):
+        return self.header
+
+    def read(self, count):
+        records = []
+        while len(records) < count and not self.done:
+            if self.reader.peek() == "]":
+                self.done = True
+                break
+            if self.records + len(records) > 0:
+                self.reader.expect(",")
+            records.append(self.reader.value())
+        return records
+
+    def text(self, record):
+        if isinstance(record, str):
+            return record
+        if isinstance(record, dict) and isinstance(record.get("source"), str):
+            return record["source"]
+        return ""
+
+    def render(self, record, translation):
+        if not isinstance(record, dict):
+            record = {"source": record}
+        record = dict(record, translation=translation)
+        separator = ",\n" if self.records > 0 else "\n"
+        self.records += 1
+        return separator + json.dumps(record, ensure_ascii=False)
+
+    def suffix(self):
+        """Fecha a lista e copia as chaves que vêm depois dela no objeto"""
+        self.reader.expect("]")
+        if self.container == "array":
+            return "\n]\n"
+        parts = []
+        while self.reader.peek() == ",":
+            self.reader.expect(",")
+            key = self.reader.value()
+            self.reader.expect(":")
+            parts.append(f"{json.dumps(key)}: {json.dumps(self.reader.value(), ensure_ascii=False)}")
+        self.reader.expect("}")
+        return "\n]" + "".join(f", {part}" for part in parts) + "}\n"
+
+    def state(self):
+        return {"offset": self.reader.offset(), "records": self.records, "container": self.container}
+
+
+def open_format(job):
+    input_path = job["input_path"]
+    if job["format"] == "json":
+        return JsonFormat(input_path)
+    return LinesFormat(input_path, column=job.get("column", 0), tabular=job["format"] == "tsv")
+
+
+class TranslationJobs:
+    """Tarefas persistidas em disco e a thread que as processa em ordem de chegada.
+
+    `translate(model_id, texts, use_corrections)` traduz um bloco e retorna
+    uma tradução por texto. Com vários processos (gunicorn) cada tarefa é
+    processada por quem obtiver o lock de arquivo dela.
+    """
+
+    def __init__(self, directory, translate, chunk_records=DEFAULT_CHUNK_RECORDS):
+        self.directory = directory
+        self.translate = translate
+        self.chunk_records = max(1, chunk_records)
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.current = None
+        self.processed = 0
+        self.resumed = 0
+
+    # --- armazenamento ---
+
+    def job_dir(self, job_id):
+        return os.path.join(self.directory, job_id)
+
+    def load(self, job_id):
+        """Estado de uma tarefa (ou None se não existir)"""
+        if not JOB_ID_PATTERN.match(job_id or ""):
+            return None
+        try:
+            with open(os.path.join(self.job_dir(job_id), "job.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, job):
+        job["updated_at"] = datetime.datetime.now().isoformat()
+        path = os.path.join(self.job_dir(job["id"]), "job.json")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def list(self):
+        jobs = []
+        if os.path.isdir(self.directory):
+            for job_id in os.listdir(self.directory):
+                job = self.load(job_id)
+                if job is not None:
+                    jobs.append(job)
+        return sorted(jobs, key=lambda job: job["created_at"])
+
+    def upload_path(self):
+        """Caminho temporário, na pasta das tarefas, para gravar um envio antes de `create(..., input_file=)`"""
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{UPLOAD_PREFIX}{uuid.uuid4().hex}")
+
+    def create(self, model_id, filename, chunks=None, fmt=None, column=0, use_corrections=True, input_file=None):
+        """Grava o arquivo enviado (iterável de bytes, ou `input_file` já em disco, que é movido) e enfileira a tarefa"""
+        job_id = uuid.uuid4().hex
+        directory = self.job_dir(job_id)
+        os.makedirs(directory)
+        input_path = os.path.join(directory, "input")
+        if input_file is not None:
+            os.replace(input_file, input_path)
+            size = os.path.getsize(input_path)
+        else:
+            size = 0
+            with open(input_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+        fmt = fmt or detect_format(input_path, filename)
+        stem = os.path.splitext(os.path.basename(filename or "documento"))[0] or "documento"
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "model_id": model_id,
+            "format": fmt,
+            "column": column,
+            "use_corrections": use_corrections,
+            "filename": filename,
+            "result_filename": f"{stem}.translated.{fmt}",
+            "input_path": input_path,
+            "output_path": os.path.join(directory, "output"),
+            "input_bytes": size,
+            "position": {},
+            "output_bytes": 0,
+            "records_done": 0,
+            "chunks_done": 0,
+            "runs": 0,
+            "error": None,
+            "created_at": datetime.datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None
+        }
+        self.save(job)
+        self.queue.put(job_id)
+        return job
+
+    def requeue(self, job_id):
+        """Recoloca na fila uma tarefa que falhou (continua do último bloco concluído)"""
+        job = self.load(job_id)
+        if job is None or job["status"] == "completed":
+            return job
+        if job["status"] == "failed":
+            job.update(status="queued", error=None)
+            self.save(job)
+        self.queue.put(job_id)
+        return job
+
+    # --- processamento ---
+
+    def run_job(self, job_id):
+        """Processa (ou continua) uma tarefa; False se outro processo já a está processando"""
+        lock_file = open(os.path.join(self.job_dir(job_id), "job.lock"), "w")
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+            job = self.load(job_id)
+            if job is None or job["status"] not in UNFINISHED_STATUSES:
+                return True
+            self._process(job)
+            return True
+        finally:
+            lock_file.close()
+
+    def _process(self, job):
+        resuming = job["chunks_done"] > 0
+        job.update(status="running", started_at=job["started_at"] or datetime.datetime.now().isoformat())
+        job["runs"] += 1
+        self.save(job)
+        if resuming:
+            with self.lock:
+                self.resumed += 1
+            print(f"[INFO] Retomando a tarefa {job['id']} do bloco {job['chunks_done']} "
+                  f"({job['records_done']} registros concluídos)")
+        with self.lock:
+            self.current = job["id"]
+
+        part_path = job["output_path"] + ".part"
+        handler = open_format(job)
+        try:
+            handler.open(job["position"])
+            with open(part_path, "ab") as output:
+                # Descarta o que foi gravado depois do último bloco concluído
+                output.truncate(job["output_bytes"])
+                if not resuming:
+                    output.write(handler.prefix().encode("utf-8"))
+                while not self.stop_event.is_set():
+                    records = handler.read(self.chunk_records)
+                    if not records:
+                        break
+                    translations = self.translate(job["model_id"], [handler.text(record) for record in records],
+                                                  job["use_corrections"])
+                    output.write("".join(handler.render(record, translation)
+                                         for record, translation in zip(records, translations)).encode("utf-8"))
+                    output.flush()
+                    os.fsync(output.fileno())
+                    job.update(position=handler.state(), output_bytes=output.tell(),
+                               records_done=job["records_done"] + len(records), chunks_done=job["chunks_done"] + 1)
+                    self.save(job)
+                if self.stop_event.is_set():
+                    # Encerramento: a tarefa continua do último bloco no próximo início
+                    job["status"] = "queued"
+                    self.save(job)
+                    return
+                output.write(handler.suffix().encode("utf-8"))
+                output.flush()
+                os.fsync(output.fileno())
+            os.replace(part_path, job["output_path"])
+            job.update(status="completed", output_bytes=os.path.getsize(job["output_path"]),
+                       finished_at=datetime.datetime.now().isoformat())
+            self.save(job)
+            with self.lock:
+                self.processed += 1
+            print(f"[INFO] Tarefa {job['id']} concluída: {job['records_done']} registros")
+        except Exception as e:
+            print(f"[DEBUG] Tarefa {job['id']} falhou no bloco {job['chunks_done']}: {e}")
+            job.update(status="failed", error=f"{type(e).__name__}: {e}")
+            self.save(job)
+        finally:
+            handler.close()
+            with self.lock:
+                self.current = None
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                job_id = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self.run_job(job_id)
+            except Exception as e:
+                print(f"[DEBUG] Erro ao processar a tarefa {job_id}: {e}")
+
+    def start(self):
+        """Recoloca na fila as tarefas não concluídas (retomada após reinício) e inicia a thread"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self._remove_stale_uploads()
+        for job in self.list():
+            if job["status"] in UNFINISHED_STATUSES:
+                self.queue.put(job["id"])
+        self.thread = threading.Thread(target=self._run, name="translation-jobs", daemon=True)
+        self.thread.start()
+
+    def _remove_stale_uploads(self):
+        if not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.startswith(UPLOAD_PREFIX) and now - os.path.getmtime(path) > UPLOAD_MAX_AGE:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def stop(self):
+        self.stop_event.set()
+
+    def public(self, job):
+        """Estado de uma tarefa para a API (sem caminhos internos)"""
+        hidden = ("input_path", "output_path", "position")
+        view = {key: value for key, value in job.items() if key not in hidden}
+        offset = job["position"].get("offset", 0)
+        view["bytes_done"] = job["input_bytes"] if job["status"] == "completed" else offset
+        view["progress"] = round(view["bytes_done"] / job["input_bytes"], 4) if job["input_bytes"] else 1.0
+        return view
+
+    def stats(self):
+        counts = {}
+        for job in self.list():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        with self.lock:
+            return {
+                'enabled': self.thread is not None and self.thread.is_alive(),
+                'directory': self.directory,
+                'chunk_records': self.chunk_records,
+                'queue_depth': self.queue.qsize(),
+                'current': self.current,
+                'processed': self.processed,
+                'resumed': self.resumed,
+                'jobs': counts
+            }